@@ -21,3 +21,26 @@ export async function draftDocument(templateName: string, userInput: string) {
     // For now, we'll simulate it or use the backend if it has a drafting endpoint
     return `Drafted document for ${templateName} based on: ${userInput}`;
 }
+
+export interface SearchQuery {
+    query: string;
+    dataset?: string;
+    limit?: number;
+}
+
+// Runs many related searches in one round trip; responses come back in request order
+export async function searchBatch(queries: SearchQuery[]) {
+    try {
+        const response = await api.post('/search/batch', {
+            requests: queries.map(q => ({
+                query: q.query,
+                dataset: q.dataset ?? 'all',
+                limit: q.limit ?? 5
+            }))
+        });
+        return response.data.responses;
+    } catch (error) {
+        console.error('Error running batch search:', error);
+        return queries.map(() => ({ results: [], total: 0, time_taken: 0 }));
+    }
+}
@@ -9,6 +9,9 @@ from app.models import Case
 from app.models import LawyerProfile
 from app.schemas import user as user_schemas
 from app.schemas import dashboard as dashboard_schemas
+from app.core.config import settings
+from app.services.search_service import search_service
+from app.services.inference_executor import InferenceOverloaded, inference_executor
 
 router = APIRouter()
 
@@ -53,3 +56,40 @@ def get_active_lawyers(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     return db.query(User).filter(User.role == "lawyer", User.is_active == True).all()
+
+@router.post("/admin/datasets/reload")
+def reload_datasets(
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not search_service.is_ready:
+        raise HTTPException(status_code=503, detail="Search service is still initializing")
+
+    # Runs in the threadpool; searches keep using the current index until the swap
+    return search_service.reload()
+
+@router.get("/admin/search/recall")
+async def search_recall(
+    k: int = 10,
+    sample: int = 200,
+    dataset: str = "all",
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """Recall@k of the configured index (ANN / quantized) against exact float32"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not 1 <= k <= settings.SEARCH_RECALL_MAX_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {settings.SEARCH_RECALL_MAX_K}")
+    if not 1 <= sample <= settings.SEARCH_RECALL_MAX_SAMPLE:
+        raise HTTPException(
+            status_code=400, detail=f"sample must be between 1 and {settings.SEARCH_RECALL_MAX_SAMPLE}"
+        )
+    if not search_service.is_ready:
+        raise HTTPException(status_code=503, detail="Search service is still initializing")
+    try:
+        return await inference_executor.run(search_service.evaluate_recall, k, sample, dataset)
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
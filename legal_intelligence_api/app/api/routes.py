@@ -1,16 +1,38 @@
+from typing import List
 from fastapi import APIRouter, HTTPException, Depends
-from app.models.search import SearchRequest, SearchResponse
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.search import (
+    SearchRequest, SearchResponse, BatchSearchRequest, BatchSearchResponse, SuggestResponse
+)
 from app.services.search_service import search_service
+from app.services.search_batcher import search_batcher
+from app.services.inference_executor import InferenceOverloaded, inference_executor
 import time
 
 router = APIRouter()
 
+def _check_dataset_ready(dataset: str) -> List[str]:
+    """Raise 503 until the requested dataset is searchable; returns datasets "all" skips"""
+    if search_service.index is None:
+        raise HTTPException(status_code=503, detail="Search service is initializing")
+    skipped = search_service.unavailable_datasets(dataset)
+    if dataset != "all" and skipped:
+        phase = search_service.dataset_status[dataset]["phase"]
+        raise HTTPException(status_code=503, detail=f"Dataset {dataset} is not searchable yet ({phase})")
+    return skipped
+
 @router.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    if not search_service.is_ready:
-        return {"status": "initializing"}
-    return {"status": "healthy"}
+    """Health check endpoint, with per-dataset indexing progress"""
+    datasets = {name: dict(status) for name, status in search_service.dataset_status.items()}
+    if search_service.is_ready:
+        status = "healthy"
+    elif search_service.index is not None:
+        status = "partial"
+    else:
+        status = "initializing"
+    return {"status": status, "datasets": datasets}
 
 @router.get("/datasets")
 async def list_datasets():
@@ -21,27 +43,123 @@ async def list_datasets():
             "name": name,
             "count": len(data)
         })
-    return {"datasets": datasets_info}
+    return {
+        "datasets": datasets_info,
+        "index_version": search_service.index_version,
+        "last_reload": search_service.last_reload
+    }
 
 @router.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     """Search across legal datasets"""
-    if not search_service.is_ready:
-        raise HTTPException(status_code=503, detail="Search service is initializing")
+    skipped = _check_dataset_ready(request.dataset)
     
     start_time = time.time()
     
     try:
-        results = search_service.search(
+        results = await search_batcher.search(
             query=request.query,
             dataset=request.dataset,
-            limit=request.limit
+            limit=request.limit,
+            mode=request.mode
         )
         
         return SearchResponse(
             results=results,
             total=len(results),
-            time_taken=time.time() - start_time
+            time_taken=time.time() - start_time,
+            skipped_datasets=skipped
+        )
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest):
+    """Run many searches with one encode call and one similarity matmul"""
+    if len(request.requests) > settings.SEARCH_BATCH_REQUEST_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SEARCH_BATCH_REQUEST_LIMIT} queries per batch"
+        )
+
+    skipped = [_check_dataset_ready(r.dataset) for r in request.requests]
+    start_time = time.time()
+
+    try:
+        batch_results = await inference_executor.run(
+            search_service.search_batch,
+            [r.query for r in request.requests],
+            [r.dataset for r in request.requests],
+            [r.limit for r in request.requests],
+            [r.mode for r in request.requests]
         )
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    time_taken = time.time() - start_time
+    responses = [
+        SearchResponse(results=results, total=len(results), time_taken=time_taken, skipped_datasets=missing)
+        for results, missing in zip(batch_results, skipped)
+    ]
+    return BatchSearchResponse(responses=responses, total=len(responses), time_taken=time_taken)
+
+@router.get("/search/suggest", response_model=SuggestResponse)
+async def search_suggest(q: str, dataset: str = "all", limit: int = 8):
+    """Typeahead suggestions from the prefix index; cheap enough for every keystroke"""
+    if limit > settings.SEARCH_SUGGEST_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SEARCH_SUGGEST_LIMIT} suggestions per request"
+        )
+    skipped = _check_dataset_ready(dataset)
+    start_time = time.time()
+    suggestions = search_service.suggest(q, dataset, limit)
+    return SuggestResponse(
+        suggestions=suggestions,
+        total=len(suggestions),
+        time_taken=time.time() - start_time,
+        skipped_datasets=skipped
+    )
+
+@router.get("/search/similar/{dataset}/{entry_id}", response_model=SearchResponse)
+async def search_similar(dataset: str, entry_id: str, limit: int = 5, scope: str = "all"):
+    """Entries related to a search result, using its stored vector (no inference)"""
+    _check_dataset_ready(dataset)
+    skipped = _check_dataset_ready(scope)
+    start_time = time.time()
+
+    try:
+        results = await run_in_threadpool(search_service.search_similar, dataset, entry_id, limit, scope)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return SearchResponse(
+        results=results,
+        total=len(results),
+        time_taken=time.time() - start_time,
+        skipped_datasets=skipped
+    )
+
+@router.get("/search/metrics")
+async def search_metrics():
+    """Request coalescing statistics (batch sizes, queue wait)"""
+    return {
+        "batching": search_batcher.metrics(),
+        "executor": {
+            "threads": inference_executor.max_workers,
+            "pending": inference_executor.pending,
+            "max_pending": inference_executor.max_pending
+        },
+        "cache": {
+            "index_version": search_service.index_version,
+            "embeddings": search_service.query_embedding_cache.stats(),
+            "results": search_service.query_result_cache.stats()
+        },
+        "embedding_build": search_service.build_stats
+    }
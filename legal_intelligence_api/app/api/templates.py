@@ -1,130 +1,169 @@
-
-from fastapi import APIRouter, HTTPException
-import os
-from typing import List, Dict
-from bs4 import BeautifulSoup
-import re
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import time
+from typing import List, Literal, Optional
+from app.core.config import settings
+from app.schemas.template import (
+    BatchRenderRequest, BatchRenderResponse, RenderRequest, RenderResponse,
+    TemplateCategory, TemplateInfo, TemplateSchema, TemplateSearchResponse
+)
+from app.services.inference_executor import InferenceOverloaded, inference_executor
+from app.services.search_service import search_service
+from app.services.template_cache import template_cache
+from app.services.template_catalog import template_catalog
+from app.services.template_executor import TemplatesOverloaded, template_executor
+from app.services.template_form import render_form
+# Re-exported: callers used to import the cleaner from here
+from app.services.template_parser import clean_html_content
 
 router = APIRouter()
 
-# Path to the templates directory (relative to this file)
-# CORRECT PATH: aiLegalEcosystem/legalTemplate/legalforms/t_forms
-TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../legalTemplate/legalforms/t_forms"))
-
-@router.get("/templates", response_model=List[Dict[str, str]])
-async def list_templates():
-    """List all available templates from t_forms"""
-    templates = []
-    
-    if not os.path.exists(TEMPLATE_DIR):
-        print(f"Warning: Template directory not found at {TEMPLATE_DIR}")
-        return []
+# aiLegalEcosystem/legalTemplate/legalforms/t_forms unless TEMPLATE_DIR is set
+TEMPLATE_DIR = str(settings.TEMPLATE_DIR)
+
 
-    # Files are directly in t_forms
+async def _current_catalog():
+    """The template catalog, (re)built first if the directory changed"""
+    if template_catalog.is_stale():
+        # Blocks on the parse of new/changed files only; a thread keeps the loop free
+        await run_in_threadpool(template_catalog.build, template_executor)
+    else:
+        # Edits in place are found by a per-file check off the loop; this
+        # request is served from the current catalog
+        template_catalog.check_in_background(template_executor)
+    return template_catalog
+
+
+@router.get("/templates", response_model=List[TemplateInfo])
+async def list_templates(
+    response: Response,
+    category: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1, le=500)
+):
+    """List templates from t_forms, sorted by title. Without page_size every
+    (matching) template is returned; X-Total-Count holds the number matching."""
     try:
-        files = os.listdir(TEMPLATE_DIR)
-        for file in files:
-            if file.endswith(".html"):
-                # Since all are in one folder, we'll categorize them as 'General' or infer from name
-                name = file.replace(".html", "").replace("-", " ").title()
-                
-                templates.append({
-                    "id": file.replace(".html", ""),
-                    "name": name,
-                    "category": "General", # or maybe infer category later
-                    "filename": file,
-                    "path": file # directly under TEMPLATE_DIR
-                })
+        catalog = await _current_catalog()
     except Exception as e:
         print(f"Error listing templates: {e}")
         return []
-        
-    return templates
-
-def clean_html_content(raw_html: str) -> str:
-    """
-    Parses the raw LegalZoom HTML to extract just the document text.
-    Converts custom tags like <field-source> into [Placeholders].
-    """
+
+    offset = (page - 1) * page_size if page_size else 0
+    items, total = catalog.page(category, offset, page_size)
+    response.headers["X-Total-Count"] = str(total)
+    return items
+
+@router.get("/templates/categories", response_model=List[TemplateCategory])
+async def list_template_categories():
+    """Template categories with the number of templates in each"""
+    catalog = await _current_catalog()
+    return catalog.categories()
+
+def _semantic_search(index, query: str, limit: int, category: Optional[str], mode: str):
+    """Search needing the embedding model: template vectors (encoded once) and the query's"""
+    encoder = search_service.encoder
+    index.ensure_embeddings(encoder)
+    query_vector = encoder.encode([query])[0]
+    return index.search(query, limit, category, mode, query_vector, settings.HYBRID_RRF_K)
+
+@router.get("/templates/search", response_model=TemplateSearchResponse)
+async def search_templates(
+    q: str,
+    limit: int = Query(10, ge=1),
+    category: Optional[str] = None,
+    mode: Optional[Literal["lexical", "semantic", "hybrid"]] = None
+):
+    """Rank templates by full text, optionally fused with semantic similarity.
+    Semantic ranking needs the search service's embedding model; without it
+    the default (hybrid) falls back to lexical."""
+    if limit > settings.TEMPLATE_SEARCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.TEMPLATE_SEARCH_LIMIT} results per request"
+        )
+    model_loaded = search_service.encoder is not None
+    if mode == "semantic" and not model_loaded:
+        raise HTTPException(status_code=503, detail="Embedding model is not loaded yet")
+    if mode is None or (mode == "hybrid" and not model_loaded):
+        mode = "hybrid" if model_loaded else "lexical"
+
+    start_time = time.time()
+    index = (await _current_catalog()).search_index
     try:
-        soup = BeautifulSoup(raw_html, 'html.parser')
-        
-        # 1. Target the main content area usually found in legalzoom templates
-        # They often use .sample-form, .info-form, or just the main content
-        content_div = soup.find('div', class_='sample-form') or \
-                      soup.find('div', class_='form-fill-container') or \
-                      soup.find('main') or \
-                      soup.find('body')
-        
-        if not content_div:
-            return "Error: Could not parse document structure."
-
-        # 2. Process custom tags BEFORE extracting text
-        
-        # Handle <field-source label="..."> -> [Label]
-        for tag in content_div.find_all('field-source'):
-            label = tag.get('label') or tag.get('title') or tag.get('fid') or "Field"
-            if label == "N/A":
-                 # Try to find a better label if available, or just use the FID
-                 label = tag.get('fid') or "Input"
-            
-            # Replace tag with placeholder text
-            tag.replace_with(f" **[{label}]** ")
-
-        # Handle <section-dep> (Conditional sections) - Just keep the content for now
-        # stripping the tags but keeping inner text
-        for tag in content_div.find_all('section-dep'):
-            tag.unwrap()
-
-        # 3. Clean up the text
-        # Get text, preserving some structure
-        text = content_div.get_text(separator="\n\n")
-        
-        # Remove excessive newlines
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        # Remove known "garbage" lines from web scraping
-        clean_lines = []
-        for line in text.splitlines():
-            line = line.strip()
-            # Skip empty lines or navigational text
-            if not line or line.lower() in ["skip to main content", "preview document"]:
-                continue
-            clean_lines.append(line)
-            
-        return "\n".join(clean_lines)
+        if mode == "lexical":
+            results = index.search(q, limit, category, mode)
+        else:
+            results = await inference_executor.run(_semantic_search, index, q, limit, category, mode)
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+    return TemplateSearchResponse(
+        results=results,
+        total=len(results),
+        time_taken=time.time() - start_time,
+        mode=mode
+    )
+
+async def _template_record(filename: str):
+    """Parsed template (cleaned text, field schema, render program), or the HTTP error"""
+    try:
+        return await template_cache.fetch_record(filename, template_executor)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Template not found: {filename}")
+    except TemplatesOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Timed out preparing template {filename}")
     except Exception as e:
-        print(f"Error cleaning HTML: {e}")
-        return f"Error processing template: {str(e)}"
+        print(f"DEBUG: Generic error {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _filename(template_id: str) -> str:
+    return template_id if template_id.endswith(".html") else f"{template_id}.html"
+
+def _conditions(pairs):
+    return [{"fid": fid, "value": value} for fid, value in pairs]
 
 @router.get("/templates/{filename}")
 async def get_template_content(filename: str):
     """Get the CLEANED and PARSED content of a template"""
-    file_path = os.path.join(TEMPLATE_DIR, filename)
+    return {"content": (await _template_record(filename))["content"]}
 
-    print(f"DEBUG: Attempting to open file at: {file_path}") 
+@router.get("/templates/{template_id}/schema", response_model=TemplateSchema)
+async def get_template_schema(template_id: str):
+    """Input fields of a template, with the sections that show them"""
+    record = await _template_record(_filename(template_id))
+    fields = [
+        dict(
+            field,
+            depends_on=[_conditions(pairs) for pairs in field["depends_on"]],
+            asked_if=_conditions(field["asked_if"])
+        )
+        for field in record["fields"]
+    ]
+    return TemplateSchema(id=template_id, fields=fields, total=len(fields))
 
-    if not os.path.exists(file_path):
-        print(f"DEBUG: File not found at {file_path}")
-        raise HTTPException(status_code=404, detail=f"Template not found at {file_path}")
-        
-    try:
-        # Try UTF-8 first
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_content = f.read()
-            clean_text = clean_html_content(raw_content)
-            return {"content": clean_text}
-    except UnicodeDecodeError:
-        # Fallback to Latin-1/Windows-1252
-        print(f"DEBUG: UTF-8 failed, trying latin-1 for {file_path}")
-        try:
-             with open(file_path, "r", encoding="latin-1") as f:
-                raw_content = f.read()
-                clean_text = clean_html_content(raw_content)
-                return {"content": clean_text}
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=f"Encoding error: {str(e)}")
-    except Exception as e:
-        print(f"DEBUG: Generic error {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/templates/{template_id}/render", response_model=RenderResponse)
+async def render_template(template_id: str, request: RenderRequest):
+    """Fill a template with field values (fid -> value). Sections whose
+    condition fails are dropped; unfilled fields keep their placeholder."""
+    record = await _template_record(_filename(template_id))
+    return RenderResponse(content=render_form(record["program"], request.values))
+
+@router.post("/templates/{template_id}/render/batch", response_model=BatchRenderResponse)
+async def render_template_batch(template_id: str, request: BatchRenderRequest):
+    """Render one template for many value sets, in request order"""
+    if len(request.values) > settings.TEMPLATE_RENDER_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.TEMPLATE_RENDER_BATCH_LIMIT} value sets per batch"
+        )
+    record = await _template_record(_filename(template_id))
+    start_time = time.time()
+    program = record["program"]
+    contents = await run_in_threadpool(lambda: [render_form(program, values) for values in request.values])
+    return BatchRenderResponse(contents=contents, total=len(contents), time_taken=time.time() - start_time)
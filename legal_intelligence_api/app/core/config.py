@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 import os
 
 class Settings:
@@ -9,8 +10,138 @@ class Settings:
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     DATA_DIR: Path = BASE_DIR / "data"
 
+    # Seconds between DATA_DIR polls for added/changed/removed JSON files
+    # (0 disables the watcher; POST /admin/datasets/reload always works)
+    DATA_WATCH_INTERVAL: float = float(os.getenv("DATA_WATCH_INTERVAL", "0"))
+
+    # "compiled": datasets are streamed once into memory-mapped files with
+    # an offset table and answers are decoded per hit; "json": keep the
+    # parsed JSON entries in memory
+    DATASET_FORMAT: str = os.getenv("DATASET_FORMAT", "compiled")
+    DATASET_STORE_DIR: Path = Path(os.getenv("DATASET_STORE_DIR", str(BASE_DIR / ".cache" / "datasets")))
+
     # Model Settings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    NORMALIZE_EMBEDDINGS: bool = True
+
+    # Encoder backend: "local" loads the model in every API process;
+    # "socket" sends texts to the encoder sidecar (encoder_server.py)
+    ENCODER_BACKEND: str = os.getenv("ENCODER_BACKEND", "local")
+    ENCODER_SOCKET: Path = Path(os.getenv("ENCODER_SOCKET", str(BASE_DIR / ".cache" / "encoder.sock")))
+    ENCODER_TIMEOUT: float = float(os.getenv("ENCODER_TIMEOUT", "30"))
+    ENCODER_CONNECT_TIMEOUT: float = float(os.getenv("ENCODER_CONNECT_TIMEOUT", "120"))
+
+    # Dataset embedding builds: texts are bucketed by length and batched up
+    # to EMBEDDING_BATCH_TOKENS padded tokens (at most EMBEDDING_MAX_BATCH_SIZE
+    # texts); EMBEDDING_BUILD_WORKERS > 0 spreads batches over that many
+    # processes, each with its own model copy
+    EMBEDDING_BUILD_WORKERS: int = int(os.getenv("EMBEDDING_BUILD_WORKERS", "0"))
+    EMBEDDING_BATCH_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_TOKENS", "8192"))
+    EMBEDDING_MAX_BATCH_SIZE: int = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "256"))
+
+    # Embedding cache (reused across restarts, keyed by model + dataset hash);
+    # BM25 postings and duplicate groups are kept there too
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+    EMBEDDING_CACHE_DIR: Path = Path(os.getenv("EMBEDDING_CACHE_DIR", str(BASE_DIR / ".cache" / "embeddings")))
+
+    # Prebuilt artifact from build_index.py; when set, the API opens it
+    # read-only instead of building from DATA_DIR, and refuses one built for
+    # another model or dimension. Checksums are verified unless disabled.
+    SEARCH_ARTIFACT_DIR: Optional[Path] = Path(os.environ["SEARCH_ARTIFACT_DIR"]) if os.getenv("SEARCH_ARTIFACT_DIR") else None
+    SEARCH_ARTIFACT_VERIFY: bool = os.getenv("SEARCH_ARTIFACT_VERIFY", "1") == "1"
+
+    # Shared index for multi-worker deployments: the first worker builds the
+    # index into SEARCH_SNAPSHOT_DIR and every worker memory-maps it, so the
+    # vectors and postings are held once in the page cache. Needs the
+    # embedding cache.
+    SEARCH_SHARED_INDEX: bool = os.getenv("SEARCH_SHARED_INDEX", "0") == "1"
+    SEARCH_SNAPSHOT_DIR: Path = Path(os.getenv("SEARCH_SNAPSHOT_DIR", str(BASE_DIR / ".cache" / "index")))
+
+    # Search index type: "exact" (brute force), "ivf" or "hnsw" (needs
+    # hnswlib). Approximate indexes are persisted next to the embedding cache.
+    SEARCH_INDEX_TYPE: str = os.getenv("SEARCH_INDEX_TYPE", "exact")
+    SEARCH_IVF_NLIST: int = int(os.getenv("SEARCH_IVF_NLIST", "0"))  # 0 = 4 * sqrt(rows)
+    SEARCH_IVF_NPROBE: int = int(os.getenv("SEARCH_IVF_NPROBE", "16"))
+    SEARCH_HNSW_M: int = int(os.getenv("SEARCH_HNSW_M", "16"))
+    SEARCH_HNSW_EF_CONSTRUCTION: int = int(os.getenv("SEARCH_HNSW_EF_CONSTRUCTION", "200"))
+    SEARCH_HNSW_EF_SEARCH: int = int(os.getenv("SEARCH_HNSW_EF_SEARCH", "64"))
+
+    # Retrieval mode when a request does not choose one: "semantic",
+    # "lexical" (BM25) or "hybrid" (reciprocal rank fusion of both). Only
+    # semantic scores are cosine similarities, which clients show as a
+    # relevance percentage, so the others are opt-in per request. Pure
+    # section/article lookups use lexical unless semantic is asked for.
+    SEARCH_DEFAULT_MODE: str = os.getenv("SEARCH_DEFAULT_MODE", "semantic")
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "50"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+
+    # Collapse paraphrased questions that share an answer into one index row
+    # (questions merged when answers match and question cosine >= threshold),
+    # so results are distinct answers and the index shrinks
+    SEARCH_DEDUP: bool = os.getenv("SEARCH_DEDUP", "1") == "1"
+    SEARCH_DEDUP_THRESHOLD: float = float(os.getenv("SEARCH_DEDUP_THRESHOLD", "0.85"))
+
+    # Stored vector format: "float32", "float16" or "int8" (per-row scales),
+    # optionally reduced to SEARCH_PCA_DIM dimensions first (0 = keep all).
+    # Check the trade-off with GET /admin/search/recall.
+    SEARCH_INDEX_DTYPE: str = os.getenv("SEARCH_INDEX_DTYPE", "float32")
+    SEARCH_PCA_DIM: int = int(os.getenv("SEARCH_PCA_DIM", "0"))
+    # Fixed query list (JSON array of strings) GET /admin/search/recall
+    # measures recall on; encoded once per process. Kept out of DATA_DIR.
+    SEARCH_RECALL_QUERIES: Path = Path(os.getenv(
+        "SEARCH_RECALL_QUERIES", str(BASE_DIR / "evaluation" / "recall_queries.json")
+    ))
+
+    # Search request coalescing: queries arriving within the window are
+    # encoded and scored together (flushes early at SEARCH_BATCH_MAX_SIZE)
+    SEARCH_BATCH_WINDOW_MS: float = float(os.getenv("SEARCH_BATCH_WINDOW_MS", "5"))
+    SEARCH_BATCH_MAX_SIZE: int = int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32"))
+
+    # Query caches: normalized query -> embedding and
+    # (query, dataset, limit) -> results, both LRU with a TTL
+    QUERY_EMBEDDING_CACHE_MB: int = int(os.getenv("QUERY_EMBEDDING_CACHE_MB", "32"))
+    QUERY_RESULT_CACHE_MB: int = int(os.getenv("QUERY_RESULT_CACHE_MB", "64"))
+    QUERY_CACHE_TTL_SECONDS: float = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+
+    # Largest number of queries accepted by POST /search/batch
+    SEARCH_BATCH_REQUEST_LIMIT: int = int(os.getenv("SEARCH_BATCH_REQUEST_LIMIT", "256"))
+    # Most suggestions one GET /search/suggest call may ask for
+    SEARCH_SUGGEST_LIMIT: int = int(os.getenv("SEARCH_SUGGEST_LIMIT", "20"))
+    # Largest k and query count GET /admin/search/recall accepts; each call
+    # scores every query against the whole index twice
+    SEARCH_RECALL_MAX_K: int = int(os.getenv("SEARCH_RECALL_MAX_K", "100"))
+    SEARCH_RECALL_MAX_SAMPLE: int = int(os.getenv("SEARCH_RECALL_MAX_SAMPLE", "500"))
+
+    # Inference executor: threads running model encode + scoring off the
+    # event loop, max queued searches before returning 503, and torch
+    # intra-op threads per forward pass (0 keeps torch's default)
+    INFERENCE_THREADS: int = int(os.getenv("INFERENCE_THREADS", "2"))
+    INFERENCE_MAX_PENDING: int = int(os.getenv("INFERENCE_MAX_PENDING", "256"))
+    TORCH_NUM_THREADS: int = int(os.getenv("TORCH_NUM_THREADS", "0"))
+
+    # Legal document templates (legalTemplate/legalforms/t_forms)
+    TEMPLATE_DIR: Path = Path(os.getenv(
+        "TEMPLATE_DIR", str(BASE_DIR.parent / "legalTemplate" / "legalforms" / "t_forms")
+    ))
+    # Cleaned template text: in-memory LRU budget, a persisted copy that
+    # survives restarts, and building the template catalog (which cleans
+    # every template) at startup rather than on the first listing
+    TEMPLATE_CACHE_MB: int = int(os.getenv("TEMPLATE_CACHE_MB", "32"))
+    TEMPLATE_CACHE_PERSIST: bool = os.getenv("TEMPLATE_CACHE_PERSIST", "1") == "1"
+    TEMPLATE_CACHE_DIR: Path = Path(os.getenv("TEMPLATE_CACHE_DIR", str(BASE_DIR / ".cache" / "templates")))
+    TEMPLATE_CACHE_WARMUP: bool = os.getenv("TEMPLATE_CACHE_WARMUP", "1") == "1"
+    # Worker processes for template file I/O and HTML cleaning, max queued
+    # template jobs before returning 503, and seconds before a job times out
+    TEMPLATE_WORKERS: int = int(os.getenv("TEMPLATE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    TEMPLATE_MAX_PENDING: int = int(os.getenv("TEMPLATE_MAX_PENDING", "64"))
+    TEMPLATE_TIMEOUT_SECONDS: float = float(os.getenv("TEMPLATE_TIMEOUT_SECONDS", "10"))
+    # Seconds between background checks of every template file's mtime/size
+    # for edits in place (added/removed files are noticed on every listing)
+    TEMPLATE_CATALOG_CHECK_SECONDS: float = float(os.getenv("TEMPLATE_CATALOG_CHECK_SECONDS", "1"))
+    # Most results one /templates/search request may ask for
+    TEMPLATE_SEARCH_LIMIT: int = int(os.getenv("TEMPLATE_SEARCH_LIMIT", "50"))
+    # Most value sets one /templates/{id}/render/batch request may render
+    TEMPLATE_RENDER_BATCH_LIMIT: int = int(os.getenv("TEMPLATE_RENDER_BATCH_LIMIT", "1000"))
 
     # Database
     SQLALCHEMY_DATABASE_URI: str = os.getenv(
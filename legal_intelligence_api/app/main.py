@@ -12,6 +12,10 @@ from app.api.admin import router as admin_router
 from app.api.messages import router as messages_router
 
 from app.services.search_service import search_service
+from app.services.search_batcher import search_batcher
+from app.services.inference_executor import inference_executor
+from app.services.template_catalog import template_catalog
+from app.services.template_executor import template_executor
 from app.db.base import Base
 from app.db.session import engine
 
@@ -50,7 +54,17 @@ async def startup_event():
     Base.metadata.create_all(bind=engine)
 
     # Initialize search service
+    inference_executor.start()
     search_service.initialize()
+    if settings.TEMPLATE_CACHE_WARMUP:
+        template_catalog.build_in_background(template_executor)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await search_batcher.stop()
+    inference_executor.shutdown()
+    template_executor.shutdown()
 
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
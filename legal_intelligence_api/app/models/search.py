@@ -1,12 +1,16 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class SearchRequest(BaseModel):
     query: str
     dataset: str = "all"
     limit: int = 5
+    # None uses the server default (settings.SEARCH_DEFAULT_MODE)
+    mode: Optional[Literal["semantic", "lexical", "hybrid"]] = None
 
 class SearchResult(BaseModel):
+    # Stable entry id, usable with /search/similar/{dataset}/{id}
+    id: str
     question: str
     answer: str
     score: float
@@ -16,3 +20,27 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     total: int
     time_taken: float
+    # Datasets not searched because they are still being indexed
+    skipped_datasets: List[str] = []
+
+class Suggestion(BaseModel):
+    text: str
+    kind: Literal["question", "section", "article"]
+    dataset: str
+    # Entry id of a question suggestion
+    id: Optional[str] = None
+    popularity: int
+
+class SuggestResponse(BaseModel):
+    suggestions: List[Suggestion]
+    total: int
+    time_taken: float
+    skipped_datasets: List[str] = []
+
+class BatchSearchRequest(BaseModel):
+    requests: List[SearchRequest]
+
+class BatchSearchResponse(BaseModel):
+    responses: List[SearchResponse]
+    total: int
+    time_taken: float
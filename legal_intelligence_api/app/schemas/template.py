@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+class TemplateInfo(BaseModel):
+    id: str
+    name: str
+    category: str
+    filename: str
+    path: str
+    field_count: int = 0
+    size: int = 0 # length of the cleaned text
+    content_hash: str = ""
+
+class TemplateCategory(BaseModel):
+    name: str
+    count: int
+
+class TemplateSearchResult(TemplateInfo):
+    score: float
+
+class TemplateSearchResponse(BaseModel):
+    results: List[TemplateSearchResult]
+    total: int
+    time_taken: float
+    mode: str # lexical, semantic or hybrid; what was actually used
+
+class FieldCondition(BaseModel):
+    fid: str
+    value: str # lowercased; compared case-insensitively
+
+class TemplateField(BaseModel):
+    fid: str
+    label: str
+    type: str # text, radio, datepicker, state, prefill (repeats an earlier answer), ...
+    question: Optional[str] = None
+    help: Optional[str] = None
+    options: List[str] = []
+    # Sections the field appears in: shown if any inner list fully holds; empty = always
+    depends_on: List[List[FieldCondition]] = []
+    # When the fill-in wizard asks for it (all must hold)
+    asked_if: List[FieldCondition] = []
+
+class TemplateSchema(BaseModel):
+    id: str
+    fields: List[TemplateField]
+    total: int
+
+class RenderRequest(BaseModel):
+    values: Dict[str, Any] = {}
+
+class RenderResponse(BaseModel):
+    content: str
+
+class BatchRenderRequest(BaseModel):
+    values: List[Dict[str, Any]]
+
+class BatchRenderResponse(BaseModel):
+    contents: List[str]
+    total: int
+    time_taken: float
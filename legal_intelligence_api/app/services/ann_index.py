@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.search_index import top_k
+
+ANN_FORMAT_VERSION = 1
+
+Hits = Tuple[np.ndarray, np.ndarray]
+Span = Optional[Tuple[int, int]]
+
+
+def _empty_hits() -> Hits:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+def _exact_span(matrix: np.ndarray, query: np.ndarray, span: Tuple[int, int], limit: int) -> Hits:
+    scores = matrix[span[0]:span[1]] @ query
+    best = top_k(scores, limit)
+    return best + span[0], scores[best]
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means cells, probe the nearest few.
+
+    Rows are bucketed under their closest centroid. A query scores the
+    centroids, visits the ``nprobe`` best cells and ranks only their rows
+    exactly, so cost grows with ``nprobe * N / nlist`` instead of ``N``.
+    Raising ``nprobe`` trades latency for recall.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, nlist: int = 0, nprobe: int = 16, iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.list_offsets: Optional[np.ndarray] = None
+        self.list_rows: Optional[np.ndarray] = None
+
+    def params(self) -> Dict[str, int]:
+        return {"nlist": self.nlist, "iterations": self.iterations, "seed": self.seed}
+
+    @staticmethod
+    def _assign(matrix: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        assignment = np.empty(len(matrix), dtype=np.int32)
+        for start in range(0, len(matrix), chunk):
+            block = matrix[start:start + chunk] @ centroids.T
+            assignment[start:start + chunk] = np.argmax(block, axis=1)
+        return assignment
+
+    def build(self, matrix: np.ndarray, ranges: Dict[str, Tuple[int, int]]):
+        n = len(matrix)
+        if self.nlist <= 0:
+            self.nlist = max(1, int(4 * np.sqrt(n)))
+        self.nlist = min(self.nlist, max(n, 1))
+
+        rng = np.random.default_rng(self.seed)
+        # Train on a sample; assignment of the full matrix is a single pass
+        sample = matrix[rng.choice(n, size=min(n, self.nlist * 64), replace=False)] if n else matrix
+        centroids = sample[rng.choice(len(sample), size=self.nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.nlist)
+            empty = counts == 0
+            # Re-seed empty cells so every list stays useful
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = self._assign(matrix, centroids)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=self.nlist)
+
+        self.centroids = centroids.astype(np.float32)
+        self.list_rows = order.astype(np.int64)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def search_batch(self, matrix: np.ndarray, queries: np.ndarray, spans: List[Span], limits: List[int]) -> List[Hits]:
+        nprobe = min(max(self.nprobe, 1), len(self.centroids))
+        cell_scores = queries @ self.centroids.T
+        probes = np.argpartition(-cell_scores, nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for i, (span, limit) in enumerate(zip(spans, limits)):
+            if span is None or span[0] == span[1] or limit <= 0:
+                results.append(_empty_hits())
+                continue
+            rows = np.concatenate([
+                self.list_rows[self.list_offsets[cell]:self.list_offsets[cell + 1]]
+                for cell in probes[i]
+            ])
+            rows = rows[(rows >= span[0]) & (rows < span[1])]
+            if len(rows) < limit:
+                # Too few candidates in the probed cells for this dataset
+                results.append(_exact_span(matrix, queries[i], span, limit))
+                continue
+            scores = matrix[rows] @ queries[i]
+            best = top_k(scores, limit)
+            results.append((rows[best], scores[best]))
+        return results
+
+    def save(self, path: Path):
+        np.save(path / "centroids.npy", self.centroids)
+        np.save(path / "list_offsets.npy", self.list_offsets)
+        np.save(path / "list_rows.npy", self.list_rows)
+
+    def load(self, path: Path, dim: int):
+        self.centroids = np.load(path / "centroids.npy")
+        self.list_offsets = np.load(path / "list_offsets.npy")
+        self.list_rows = np.load(path / "list_rows.npy", mmap_mode="r")
+        self.nlist = len(self.centroids)
+
+
+class HNSWIndex:
+    """Graph index via hnswlib, one graph per dataset.
+
+    Separate graphs keep per-dataset searches exact in their filtering;
+    ``dataset="all"`` queries every graph and merges the hits. ``ef_search``
+    is the recall/latency knob.
+    """
+
+    kind = "hnsw"
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        import hnswlib  # optional dependency, only needed for this index type
+        self._hnswlib = hnswlib
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graphs: Dict[Tuple[int, int], object] = {}
+
+    def params(self) -> Dict[str, int]:
+        return {"m": self.m, "ef_construction": self.ef_construction}
+
+    def build(self, matrix: np.ndarray, ranges: Dict[str, Tuple[int, int]]):
+        for start, end in ranges.values():
+            if start == end:
+                continue
+            graph = self._hnswlib.Index(space="ip", dim=matrix.shape[1])
+            graph.init_index(max_elements=end - start, ef_construction=self.ef_construction, M=self.m)
+            graph.add_items(matrix[start:end], np.arange(start, end))
+            graph.set_ef(self.ef_search)
+            self.graphs[(start, end)] = graph
+
+    def _query(self, graph, query: np.ndarray, span: Tuple[int, int], limit: int) -> Hits:
+        k = min(limit, span[1] - span[0])
+        graph.set_ef(max(self.ef_search, k))
+        labels, distances = graph.knn_query(query.reshape(1, -1), k=k)
+        # hnswlib's inner-product distance is 1 - dot
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def search_batch(self, matrix: np.ndarray, queries: np.ndarray, spans: List[Span], limits: List[int]) -> List[Hits]:
+        results = []
+        for query, span, limit in zip(queries, spans, limits):
+            if span is None or span[0] == span[1] or limit <= 0:
+                results.append(_empty_hits())
+                continue
+            parts = [
+                self._query(graph, query, (start, end), limit)
+                for (start, end), graph in self.graphs.items()
+                if start >= span[0] and end <= span[1]
+            ]
+            if not parts:
+                results.append(_exact_span(matrix, query, span, limit))
+                continue
+            rows = np.concatenate([p[0] for p in parts])
+            scores = np.concatenate([p[1] for p in parts])
+            best = top_k(scores, limit)
+            results.append((rows[best], scores[best]))
+        return results
+
+    def save(self, path: Path):
+        spans = []
+        for i, ((start, end), graph) in enumerate(self.graphs.items()):
+            graph.save_index(str(path / f"graph_{i}.bin"))
+            spans.append([start, end])
+        with open(path / "graphs.json", "w", encoding="utf-8") as f:
+            json.dump(spans, f)
+
+    def load(self, path: Path, dim: int):
+        with open(path / "graphs.json", "r", encoding="utf-8") as f:
+            spans = json.load(f)
+        for i, (start, end) in enumerate(spans):
+            graph = self._hnswlib.Index(space="ip", dim=dim)
+            graph.load_index(str(path / f"graph_{i}.bin"), max_elements=end - start)
+            graph.set_ef(self.ef_search)
+            self.graphs[(start, end)] = graph
+
+
+def create_ann_index(kind: str, settings):
+    """Instantiate an (unbuilt) ANN index of the configured type"""
+    if kind == "ivf":
+        return IVFIndex(nlist=settings.SEARCH_IVF_NLIST, nprobe=settings.SEARCH_IVF_NPROBE)
+    if kind == "hnsw":
+        return HNSWIndex(
+            m=settings.SEARCH_HNSW_M,
+            ef_construction=settings.SEARCH_HNSW_EF_CONSTRUCTION,
+            ef_search=settings.SEARCH_HNSW_EF_SEARCH
+        )
+    raise ValueError(f"Unknown search index type: {kind}")
+
+
+def ann_fingerprint(ann, dataset_hashes: Dict[str, str], model_name: str, storage: Dict[str, object]) -> str:
+    """Identity of a built ANN index: data, model, storage and build parameters"""
+    payload = json.dumps({
+        "version": ANN_FORMAT_VERSION,
+        "kind": ann.kind,
+        "model": model_name,
+        "storage": storage,
+        "params": ann.params(),
+        "datasets": list(dataset_hashes.items()),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_or_build_ann(ann, matrix: np.ndarray, ranges: Dict[str, Tuple[int, int]], cache_dir: Optional[Path], fingerprint: str):
+    """Reuse a persisted ANN index when its fingerprint matches, else build and save it"""
+    path = Path(cache_dir) / "ann" / f"{ann.kind}-{fingerprint}" if cache_dir is not None else None
+    if path is not None and (path / "DONE").exists():
+        try:
+            ann.load(path, matrix.shape[1])
+            print(f"Loaded {ann.kind} index from {path}")
+            return ann
+        except Exception as e:
+            print(f"Could not load {ann.kind} index, rebuilding: {e}")
+
+    ann.build(matrix, ranges)
+    if path is not None:
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            ann.save(path)
+            # Marker written last so a half-written index is never reused
+            (path / "DONE").write_text(str(os.getpid()))
+        except OSError as e:
+            print(f"Could not persist {ann.kind} index: {e}")
+    return ann
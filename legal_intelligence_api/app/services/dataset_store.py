@@ -0,0 +1,226 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+
+# Bump whenever the compiled layout changes
+STORE_FORMAT_VERSION = 1
+
+MAGIC = b"LQADS\0\0\0"
+# magic, format version, entry count, offset table position, meta length
+HEADER = struct.Struct("<8sIQQI")
+HEADER_SIZE = 512
+
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the file.
+
+    Reads ``chunk_size`` characters at a time and decodes one element at a
+    time, so memory stays bounded by the largest single element.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, started = "", 0, False
+        while True:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+            if not started:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos == len(buf):
+                    if eof:
+                        raise ValueError(f"{path} is empty")
+                    continue
+                if buf[pos] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                pos += 1
+                started = True
+
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos == len(buf):
+                    break
+                if buf[pos] == "]":
+                    return
+                try:
+                    item, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # Element straddles the chunk boundary, read more
+                    break
+                yield item
+
+            if eof:
+                raise ValueError(f"Unexpected end of JSON array in {path}")
+
+
+def entries_hash(items: Iterable[Any]) -> str:
+    """Hash of every entry's question and answer, in order.
+
+    Identifies everything built from the text (BM25 postings, duplicate
+    groups), where ``EmbeddingCache.content_hash`` covers the questions only.
+    """
+    digest = hashlib.sha256()
+    for item in items:
+        for field in ("question", "answer"):
+            text = item.get(field, "") if isinstance(item, dict) else ""
+            digest.update(str(text).encode("utf-8"))
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def read_header(path: Path) -> Tuple[int, int, Dict[str, Any]]:
+    """(entry count, offset table position, meta) without touching the body"""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER.size:
+        raise ValueError(f"{path} is truncated")
+    magic, version, count, offsets_pos, meta_len = HEADER.unpack_from(raw)
+    if magic != MAGIC or version != STORE_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a compiled dataset (version {STORE_FORMAT_VERSION})")
+    meta = json.loads(raw[HEADER.size:HEADER.size + meta_len].decode("utf-8"))
+    return count, offsets_pos, meta
+
+
+def write_compiled(items: Iterable[Any], target: Path, meta: Optional[Dict[str, Any]] = None) -> int:
+    """Write QA entries into the compiled format.
+
+    Layout: a fixed header (counts, offset table position, JSON meta), then
+    the UTF-8 text of every entry's question and answer back to back, then
+    ``2 * count + 1`` little-endian uint64 offsets. Entry ``i``'s question is
+    ``[off[2i], off[2i+1])`` and its answer ``[off[2i+1], off[2i+2])``,
+    relative to the start of the text block. Written to a temporary file and
+    renamed into place, so readers never see a partial file.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    offsets = [0]
+    digest = hashlib.sha256()
+    entries_digest = hashlib.sha256()
+    position = 0
+
+    try:
+        with open(tmp, "wb") as out:
+            out.write(b"\0" * HEADER_SIZE)
+            for item in items:
+                for field in ("question", "answer"):
+                    text = item.get(field, "") if isinstance(item, dict) else ""
+                    encoded = str(text).encode("utf-8")
+                    out.write(encoded)
+                    position += len(encoded)
+                    offsets.append(position)
+                    # Same hash entries_hash gives the entries
+                    entries_digest.update(encoded)
+                    entries_digest.update(b"\0")
+                    if field == "question":
+                        # Same hash EmbeddingCache.content_hash gives the questions
+                        digest.update(encoded)
+                        digest.update(b"\0")
+
+            count = (len(offsets) - 1) // 2
+            padding = -(HEADER_SIZE + position) % 8
+            out.write(b"\0" * padding)
+            offsets_pos = HEADER_SIZE + position + padding
+            out.write(np.asarray(offsets, dtype="<u8").tobytes())
+
+            meta = json.dumps(dict(
+                meta or {}, content_hash=digest.hexdigest(), entries_hash=entries_digest.hexdigest()
+            )).encode("utf-8")
+            if HEADER.size + len(meta) > HEADER_SIZE:
+                raise ValueError(f"Header metadata too large for {target}")
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, STORE_FORMAT_VERSION, count, offsets_pos, len(meta)) + meta)
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
+
+
+def compile_dataset(source: Path, target: Path, signature: Optional[Tuple[int, int]] = None) -> int:
+    """Stream a JSON array of QA entries from ``source`` into a compiled file"""
+    return write_compiled(iter_json_array(source), target, {
+        "source": source.name,
+        "signature": list(signature) if signature else None,
+    })
+
+
+class CompiledDataset:
+    """Read-only, memory-mapped view of a compiled dataset.
+
+    Behaves like the list of ``{"question", "answer"}`` dicts it replaces,
+    but entries are decoded only when indexed, so the resident cost of a
+    dataset is its offset table plus whatever pages searches touch.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count, offsets_pos, self.meta = read_header(self.path)
+        self.content_hash: Optional[str] = self.meta.get("content_hash")
+        # Missing in files compiled before it was recorded
+        self.entries_hash: Optional[str] = self.meta.get("entries_hash")
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=2 * self.count + 1, offset=offsets_pos)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _text(self, slot: int) -> str:
+        start = HEADER_SIZE + int(self._offsets[slot])
+        end = HEADER_SIZE + int(self._offsets[slot + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def question(self, i: int) -> str:
+        return self._text(2 * i)
+
+    def answer(self, i: int) -> str:
+        return self._text(2 * i + 1)
+
+    def __getitem__(self, i: int) -> Dict[str, str]:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return {"question": self.question(i), "answer": self.answer(i)}
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for i in range(self.count):
+            yield {"question": self.question(i), "answer": self.answer(i)}
+
+
+class DatasetStore:
+    """Compiles DATA_DIR JSON files once and opens them memory-mapped.
+
+    A compiled file is reused while the source file's (mtime, size)
+    signature matches the one recorded in its header.
+    """
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+
+    def path_for(self, name: str) -> Path:
+        return self.store_dir / f"{name}.qads"
+
+    def open(self, name: str, source: Path, signature: Tuple[int, int]) -> CompiledDataset:
+        path = self.path_for(name)
+        try:
+            _, _, meta = read_header(path)
+            fresh = meta.get("signature") == list(signature)
+        except (OSError, ValueError):
+            fresh = False
+
+        if not fresh:
+            count = compile_dataset(source, path, signature)
+            print(f"Compiled dataset: {name} with {count} entries")
+        return CompiledDataset(path)
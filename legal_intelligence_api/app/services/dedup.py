@@ -0,0 +1,52 @@
+import hashlib
+from typing import Dict, List
+import numpy as np
+
+
+def _answer_key(answer: str) -> bytes:
+    return hashlib.blake2b(" ".join(answer.lower().split()).encode("utf-8"), digest_size=16).digest()
+
+
+def group_duplicates(data, vectors: np.ndarray, threshold: float = 0.85) -> List[np.ndarray]:
+    """Cluster entries that are paraphrases of one question with one answer.
+
+    Two entries are merged when their answers are identical (ignoring case
+    and whitespace) and their question vectors have cosine similarity of at
+    least ``threshold``; clusters are the connected components. Requiring
+    both keeps short shared answers such as "Yes" or "The President" from
+    merging unrelated questions, and only compares entries within the same
+    answer bucket, so the cost stays near linear.
+
+    Returns member positions per group (ascending), ordered by first member;
+    the first member is the group's representative.
+    """
+    n = len(data)
+    parent = np.arange(n)
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[bytes, List[int]] = {}
+    for i, item in enumerate(data):
+        answer = item.get("answer", "")
+        if answer.strip():
+            buckets.setdefault(_answer_key(answer), []).append(i)
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        block = np.asarray(vectors[members], dtype=np.float32)
+        block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+        similar = np.triu(block @ block.T >= threshold, k=1)
+        for a, b in zip(*np.nonzero(similar)):
+            ra, rb = find(members[a]), find(members[b])
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [np.asarray(members, dtype=np.int64) for members in groups.values()]
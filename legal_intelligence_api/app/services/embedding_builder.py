@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+# MiniLM truncates inputs at 256 word pieces, so longer texts cost the same
+MAX_SEQ_TOKENS = 256
+
+_worker_encoder = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap word-piece count estimate (~4 characters per token plus [CLS]/[SEP])"""
+    return min(len(text) // 4 + 2, MAX_SEQ_TOKENS)
+
+
+def plan_batches(texts: List[str], token_budget: int = 8192, max_batch_size: int = 256) -> List[np.ndarray]:
+    """Group text indices into length-bucketed batches.
+
+    Texts are sorted longest first so each batch pads to similar lengths,
+    and each batch gets as many texts as fit ``token_budget`` padded tokens:
+    short questions go through in large batches, long ones in small ones.
+    Longest first also means peak memory is hit by the first batch.
+    """
+    lengths = np.fromiter((estimate_tokens(t) for t in texts), dtype=np.int32, count=len(texts))
+    order = np.argsort(-lengths, kind="stable")
+    batches = []
+    start = 0
+    while start < len(order):
+        longest = int(lengths[order[start]])
+        size = max(1, min(token_budget // longest, max_batch_size))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def _init_worker(model_name: str, normalize: bool, torch_threads: int):
+    global _worker_encoder
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    from app.services.encoder import LocalEncoder
+    _worker_encoder = LocalEncoder(model_name, normalize=normalize)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_encoder.encode(texts, batch_size=len(texts))
+
+
+class EmbeddingBuilder:
+    """Encodes whole datasets in length-bucketed, adaptively sized batches.
+
+    With ``workers`` > 0 the batches are spread over a pool of processes,
+    each with its own model copy and ``cpu_count // workers`` torch threads;
+    otherwise they go through the service's encoder one after another.
+    The pool is started on first use and released by ``close()``.
+    """
+
+    def __init__(self, encoder, model_name: str, normalize: bool = True, workers: int = 0,
+                 token_budget: int = 8192, max_batch_size: int = 256):
+        self.encoder = encoder
+        self.model_name = model_name
+        self.normalize = normalize
+        self.workers = workers
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            print(f"Starting {self.workers} embedding workers ({torch_threads} threads each)")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: forking a process that already holds torch state is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.normalize, torch_threads)
+            )
+        return self._pool
+
+    def encode(self, texts: List[str], progress: Optional[Callable[[int], None]] = None) -> Tuple[np.ndarray, float]:
+        """Encode texts in input order; returns (float32 matrix, seconds taken).
+
+        ``progress(rows_done)`` is called after every batch.
+        """
+        start = time.perf_counter()
+        batches = plan_batches(texts, self.token_budget, self.max_batch_size)
+        batch_texts = [[texts[i] for i in batch] for batch in batches]
+
+        if self.workers > 0 and len(batches) > 1:
+            results = self._get_pool().map(_encode_in_worker, batch_texts)
+        else:
+            results = (self.encoder.encode(chunk, batch_size=len(chunk)) for chunk in batch_texts)
+
+        matrix = None
+        done = 0
+        for batch, vectors in zip(batches, results):
+            if matrix is None:
+                matrix = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            matrix[batch] = vectors
+            done += len(batch)
+            if progress is not None:
+                progress(done)
+        if matrix is None:
+            # No texts: keep the (0, dim) shape so callers can stack and persist it
+            matrix = np.empty((0, self.encoder.dim), dtype=np.float32)
+        return matrix, time.perf_counter() - start
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
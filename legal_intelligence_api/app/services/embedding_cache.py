@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+import numpy as np
+
+# Bump whenever the on-disk layout or the way vectors are produced changes
+CACHE_FORMAT_VERSION = 1
+
+
+class EmbeddingCache:
+    """Versioned on-disk store of dataset embeddings.
+
+    Each dataset is kept as a ``.npy`` matrix plus a small ``.json`` sidecar
+    describing how it was produced. An entry is only reused when the model
+    name, normalization setting, cache version and content hash all match,
+    and is memory-mapped on load so a warm start does not copy the vectors.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str, normalize: bool = True):
+        self.model_name = model_name
+        self.normalize = normalize
+        model_slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.cache_dir = Path(cache_dir) / model_slug
+
+    @staticmethod
+    def content_hash(texts: Iterable[str]) -> str:
+        """Hash of the exact texts that get encoded for a dataset"""
+        digest = hashlib.sha256()
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _paths(self, dataset: str):
+        return (
+            self.cache_dir / f"{dataset}.npy",
+            self.cache_dir / f"{dataset}.json",
+        )
+
+    def _expected_meta(self, content_hash: str) -> dict:
+        return {
+            "version": CACHE_FORMAT_VERSION,
+            "model": self.model_name,
+            "normalize": self.normalize,
+            "content_hash": content_hash,
+        }
+
+    def load(self, dataset: str, content_hash: str) -> Optional[np.ndarray]:
+        """Return the cached matrix (memory-mapped) or None on a miss"""
+        matrix_path, meta_path = self._paths(dataset)
+        if not matrix_path.exists() or not meta_path.exists():
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable embedding cache for {dataset}: {e}")
+            return None
+
+        expected = self._expected_meta(content_hash)
+        if any(meta.get(key) != value for key, value in expected.items()):
+            return None
+
+        try:
+            embeddings = np.load(matrix_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring corrupt embedding cache for {dataset}: {e}")
+            return None
+
+        if embeddings.shape != (meta.get("count"), meta.get("dim")):
+            return None
+        return embeddings
+
+    def save(self, dataset: str, content_hash: str, embeddings: np.ndarray):
+        """Persist a dataset matrix atomically so readers never see partial files"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        matrix_path, meta_path = self._paths(dataset)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2:
+            raise ValueError(f"Expected a 2-d embedding matrix for {dataset}, got shape {embeddings.shape}")
+
+        meta = self._expected_meta(content_hash)
+        meta.update({"count": int(embeddings.shape[0]), "dim": int(embeddings.shape[1])})
+
+        # Drop the old sidecar first and write the new one last: a matrix
+        # without matching metadata is treated as a miss, never a stale hit.
+        if meta_path.exists():
+            meta_path.unlink()
+
+        tmp_matrix = matrix_path.with_name(f".{matrix_path.name}.{os.getpid()}.tmp")
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, embeddings)
+        os.replace(tmp_matrix, matrix_path)
+
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
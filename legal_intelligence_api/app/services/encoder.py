@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Every frame is a 4-byte big-endian length followed by that many bytes.
+# A request is one JSON frame: {"op": "encode", "texts": [...]} or
+# {"op": "info"}. A reply is a JSON header frame ({"model", "dim", "count"}
+# or {"error"}), followed for "encode" by one frame of raw float32 rows.
+FRAME = struct.Struct(">I")
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Encoder connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(FRAME.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (size,) = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Encoder frame too large: {size} bytes")
+    return _recv_exact(sock, size)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Encoder frame too large: {size} bytes")
+    return await reader.readexactly(size)
+
+
+def _write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    writer.write(FRAME.pack(len(payload)) + payload)
+
+
+class LocalEncoder:
+    """Encodes with a SentenceTransformer loaded in this process"""
+
+    kind = "local"
+
+    def __init__(self, model_name: str, normalize: bool = True):
+        # Imported here so API processes using the sidecar never load torch
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.normalize = normalize
+        self.model = SentenceTransformer(model_name)
+
+    @property
+    def dim(self) -> int:
+        return int(self.model.get_sentence_embedding_dimension())
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts into float32 numpy vectors"""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=max(batch_size, 1),
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+
+class SocketEncoder:
+    """Client for the encoder sidecar (encoder_server.py) on a Unix socket.
+
+    Each calling thread keeps its own connection; the sidecar batches
+    requests from every connection, so concurrent API workers share one
+    model and one set of forward passes.
+    """
+
+    kind = "socket"
+
+    def __init__(self, socket_path: Path, model_name: str, timeout: float = 30.0):
+        self.socket_path = str(socket_path)
+        self.model_name = model_name
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        payload = json.dumps(request).encode("utf-8")
+        # One retry on a fresh connection, e.g. after the sidecar restarted
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, payload)
+                header = json.loads(recv_frame(sock).decode("utf-8"))
+                body = recv_frame(sock) if request["op"] == "encode" and "error" not in header else None
+                break
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt:
+                    raise
+        if "error" in header:
+            raise RuntimeError(f"Encoder sidecar error: {header['error']}")
+        if header.get("model") != self.model_name:
+            raise RuntimeError(
+                f"Encoder sidecar serves {header.get('model')}, expected {self.model_name}"
+            )
+        return header, body
+
+    def info(self) -> Dict[str, Any]:
+        return self._call({"op": "info"})[0]
+
+    @property
+    def dim(self) -> int:
+        return int(self.info()["dim"])
+
+    def wait_ready(self, timeout: float):
+        """Block until the sidecar answers, e.g. while it is still loading"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.info()
+            except (OSError, ConnectionError) as e:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Encoder sidecar not reachable at {self.socket_path}: {e}")
+                time.sleep(1.0)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        # Batch size is the sidecar's decision; it coalesces across callers
+        header, body = self._call({"op": "encode", "texts": list(texts)})
+        return np.frombuffer(body, dtype=np.float32).reshape(header["count"], header["dim"])
+
+
+def create_encoder(settings):
+    """Encoder backend selected by ENCODER_BACKEND"""
+    if settings.ENCODER_BACKEND == "local":
+        return LocalEncoder(settings.EMBEDDING_MODEL, normalize=settings.NORMALIZE_EMBEDDINGS)
+    if settings.ENCODER_BACKEND == "socket":
+        encoder = SocketEncoder(settings.ENCODER_SOCKET, settings.EMBEDDING_MODEL, settings.ENCODER_TIMEOUT)
+        encoder.wait_ready(settings.ENCODER_CONNECT_TIMEOUT)
+        return encoder
+    raise ValueError(f"Unknown encoder backend: {settings.ENCODER_BACKEND}")
+
+
+class EncoderServer:
+    """Sidecar owning the model, serving encode requests on a Unix socket.
+
+    Requests from all connections are queued; the batch loop waits up to
+    ``window_ms`` after the first one, encodes up to ``max_batch_texts``
+    texts in a single forward pass on a worker thread, and splits the rows
+    back to the callers.
+    """
+
+    def __init__(self, encoder: LocalEncoder, socket_path: Path, window_ms: float = 5.0,
+                 max_batch_texts: int = 256):
+        self.encoder = encoder
+        self.socket_path = Path(socket_path)
+        self.window = window_ms / 1000.0
+        self.max_batch_texts = max_batch_texts
+        self.dim = int(encoder.encode(["warm up"]).shape[1])
+        self._queue: Optional[asyncio.Queue] = None
+        self.batches = 0
+        self.texts = 0
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = json.loads((await _read_frame(reader)).decode("utf-8"))
+                header: Dict[str, Any] = {"model": self.encoder.model_name, "dim": self.dim}
+                body = None
+                if request.get("op") == "encode":
+                    future = asyncio.get_running_loop().create_future()
+                    await self._queue.put((request.get("texts", []), future))
+                    try:
+                        vectors = await future
+                        header["count"] = len(vectors)
+                        body = np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+                    except Exception as e:
+                        header = {"error": str(e)}
+                elif request.get("op") == "info":
+                    header.update({"batches": self.batches, "texts": self.texts})
+                else:
+                    header = {"error": f"Unknown op: {request.get('op')}"}
+
+                _write_frame(writer, json.dumps(header).encode("utf-8"))
+                if body is not None:
+                    _write_frame(writer, body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self.window
+            while count < self.max_batch_texts:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = await loop.run_in_executor(None, self.encoder.encode, texts) if texts else None
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for item_texts, future in batch:
+                end = start + len(item_texts)
+                if not future.done():
+                    future.set_result(vectors[start:end] if vectors is not None else np.empty((0, self.dim), np.float32))
+                start = end
+
+    async def serve(self):
+        self._queue = asyncio.Queue()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o660)
+        print(f"Encoder sidecar serving {self.encoder.model_name} on {self.socket_path}")
+        batcher = asyncio.create_task(self._batch_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
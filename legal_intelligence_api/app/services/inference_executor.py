@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+
+class InferenceOverloaded(RuntimeError):
+    """Raised when more inference jobs are queued than the executor allows"""
+
+
+class InferenceExecutor:
+    """Dedicated, bounded thread pool for model inference and scoring.
+
+    Async routes hand CPU-bound work to this pool instead of running it on
+    the event loop, so /health and friends stay responsive while searches
+    run. Threads are enough here: torch and numpy release the GIL inside
+    their kernels. At most ``max_pending`` jobs may be queued or running;
+    beyond that callers get ``InferenceOverloaded`` instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64, torch_threads: int = 0):
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max(max_pending, self.max_workers)
+        self.torch_threads = torch_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._configure_torch()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference"
+        )
+
+    def _configure_torch(self):
+        if self.torch_threads <= 0:
+            return
+        try:
+            import torch
+            torch.set_num_threads(self.torch_threads)
+            print(f"Torch intra-op threads set to {self.torch_threads}")
+        except Exception as e:
+            print(f"Could not configure torch threads: {e}")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` on the pool and await its result"""
+        if self._pending >= self.max_pending:
+            raise InferenceOverloaded("Too many search requests in flight, try again shortly")
+        self.start()
+
+        # Counted on the event loop thread only, so no lock is needed
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_THREADS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+    torch_threads=settings.TORCH_NUM_THREADS
+)
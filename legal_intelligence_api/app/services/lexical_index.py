@@ -0,0 +1,214 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.search_index import top_k
+
+Hits = Tuple[np.ndarray, np.ndarray]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# "Section 438", "sec. 41A", "Article 21", "art 370" -> sec_438, art_21, ...
+REFERENCE_RE = re.compile(r"\b(section|sections|sec|s|article|articles|art)\.?\s*(\d+[a-z]*)\b")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i if in is it its
+me of on or shall should that the their there this to under what when where
+which who whom why will with within
+""".split())
+
+# Words that only name the statute; a query made of these plus a section
+# reference is a pure lookup and can skip the embedding model entirely.
+ACT_WORDS = frozenset("""
+ipc crpc cr pc code penal criminal procedure indian india constitution act
+bns bnss evidence
+""".split())
+
+
+def _reference_tokens(text: str) -> List[str]:
+    tokens = []
+    for kind, number in REFERENCE_RE.findall(text):
+        prefix = "art" if kind.startswith("art") else "sec"
+        tokens.append(f"{prefix}_{number}")
+    return tokens
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens plus compound section/article reference tokens"""
+    text = text.lower()
+    # "section 438" indexes as "438" + "sec_438"; the very common word
+    # "section" itself adds nothing once the reference token exists
+    plain = REFERENCE_RE.sub(r" \2 ", text)
+    tokens = [t for t in TOKEN_RE.findall(plain) if t not in STOPWORDS]
+    return tokens + _reference_tokens(text)
+
+
+def is_reference_lookup(query: str) -> bool:
+    """True for queries like "What is Section 302 IPC?" or "Article 21"."""
+    text = query.lower()
+    if not _reference_tokens(text):
+        return False
+    stripped = REFERENCE_RE.sub(" ", text)
+    rest = [t for t in TOKEN_RE.findall(stripped) if t not in STOPWORDS and t not in ACT_WORDS]
+    return not rest
+
+
+def reciprocal_rank_fusion(rankings: List[Hits], limit: int, k: int = 60) -> Hits:
+    """Fuse ranked row lists by RRF.
+
+    Scores are scaled so a row ranked first in every list scores 1.0.
+    """
+    fused: Dict[int, float] = {}
+    for rows, _ in rankings:
+        for rank, row in enumerate(rows):
+            fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (k + rank + 1)
+    if not fused:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    rows = np.fromiter(fused.keys(), dtype=np.int64, count=len(fused))
+    scores = np.fromiter(fused.values(), dtype=np.float32, count=len(fused))
+    scores *= (k + 1) / max(len(rankings), 1)
+    best = top_k(scores, limit)
+    return rows[best], scores[best]
+
+
+class LexicalIndex:
+    """BM25 inverted index over question and answer text.
+
+    Postings are stored CSR-style: for term ``t`` the rows containing it
+    are ``rows[offsets[t]:offsets[t + 1]]`` (ascending) with matching term
+    frequencies in ``freqs``. Global row numbers follow dataset order, so
+    they line up with ``SearchIndex`` rows and a dataset filter is a
+    ``searchsorted`` on each posting list. With ``groups`` a row is one
+    group of near-duplicates, indexed as all member questions plus the
+    shared answer, matching ``SearchIndex(embeddings, groups)``.
+    """
+
+    def __init__(self, datasets: Dict[str, List[Dict[str, Any]]], k1: float = 1.2, b: float = 0.75,
+                 groups: Optional[Dict[str, List[np.ndarray]]] = None):
+        self.k1 = k1
+        self.b = b
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        self.vocabulary: Dict[str, int] = {}
+
+        term_rows: List[List[int]] = []
+        term_freqs: List[List[int]] = []
+        lengths: List[int] = []
+
+        row = 0
+        for name, data in datasets.items():
+            start = row
+            for text in self._documents(data, groups[name] if groups else None):
+                tokens = tokenize(text)
+                lengths.append(len(tokens))
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, count in counts.items():
+                    term_id = self.vocabulary.get(token)
+                    if term_id is None:
+                        term_id = len(term_rows)
+                        self.vocabulary[token] = term_id
+                        term_rows.append([])
+                        term_freqs.append([])
+                    term_rows[term_id].append(row)
+                    term_freqs[term_id].append(count)
+                row += 1
+            self.ranges[name] = (start, row)
+
+        sizes = np.array([len(r) for r in term_rows], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.rows = np.fromiter((r for rows in term_rows for r in rows), dtype=np.int32, count=int(sizes.sum()))
+        self.freqs = np.fromiter((f for freqs in term_freqs for f in freqs), dtype=np.uint32, count=int(sizes.sum()))
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+
+        self.num_docs = row
+        self.avg_length = float(self.doc_lengths.mean()) if row else 0.0
+        # BM25 idf, precomputed per term
+        self.idf = np.log(1.0 + (self.num_docs - sizes + 0.5) / (sizes + 0.5)).astype(np.float32)
+
+    @staticmethod
+    def _documents(data, groups: Optional[List[np.ndarray]]):
+        if groups is None:
+            for item in data:
+                yield f"{item.get('question', '')} {item.get('answer', '')}"
+            return
+        for members in groups:
+            items = [data[int(i)] for i in members]
+            questions = " ".join(item.get('question', '') for item in items)
+            yield f"{questions} {items[0].get('answer', '')}"
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def save(self, path: Path):
+        for name in ("offsets", "rows", "freqs", "doc_lengths", "idf"):
+            np.save(path / f"lexical_{name}.npy", getattr(self, name))
+        with open(path / "lexical.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "ranges": self.ranges,
+                "num_docs": self.num_docs,
+                "avg_length": self.avg_length,
+                "vocabulary": self.vocabulary,
+            }, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        """Open saved postings memory-mapped"""
+        with open(path / "lexical.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls({}, k1=meta["k1"], b=meta["b"])
+        index.ranges = {name: tuple(span) for name, span in meta["ranges"].items()}
+        index.num_docs = meta["num_docs"]
+        index.avg_length = meta["avg_length"]
+        index.vocabulary = meta["vocabulary"]
+        for name in ("offsets", "rows", "freqs", "doc_lengths", "idf"):
+            setattr(index, name, np.load(path / f"lexical_{name}.npy", mmap_mode="r"))
+        return index
+
+    def row_range(self, dataset: str) -> Optional[Tuple[int, int]]:
+        if dataset == "all":
+            return (0, self.num_docs)
+        return self.ranges.get(dataset)
+
+    def search(self, query: str, dataset: str = "all", limit: int = 5) -> Hits:
+        """Return (global rows, BM25 scores) of the best matches, best first"""
+        span = self.row_range(dataset)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if span is None or span[0] == span[1] or limit <= 0:
+            return empty
+
+        row_parts, score_parts = [], []
+        for token in dict.fromkeys(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            lo, hi = self.offsets[term_id], self.offsets[term_id + 1]
+            rows = self.rows[lo:hi]
+            if span != (0, self.num_docs):
+                a, z = np.searchsorted(rows, span)
+                rows = rows[a:z]
+                freqs = self.freqs[lo + a:lo + z]
+            else:
+                freqs = self.freqs[lo:hi]
+            if not len(rows):
+                continue
+
+            tf = freqs.astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[rows] / self.avg_length)
+            row_parts.append(rows)
+            score_parts.append(self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + norm))
+
+        if not row_parts:
+            return empty
+
+        rows = np.concatenate(row_parts)
+        scores = np.concatenate(score_parts)
+        if len(row_parts) > 1:
+            rows, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores).astype(np.float32)
+
+        best = top_k(scores, limit)
+        return rows[best].astype(np.int64), scores[best]
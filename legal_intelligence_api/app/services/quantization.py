@@ -0,0 +1,108 @@
+from typing import Optional
+import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+class PCAProjection:
+    """Linear projection onto the top principal components of the corpus.
+
+    Projected vectors are re-normalized so scores stay cosine similarities.
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+
+    @classmethod
+    def fit(cls, matrix: np.ndarray, dim: int, sample_size: int = 50000, seed: int = 0) -> "PCAProjection":
+        rng = np.random.default_rng(seed)
+        n = len(matrix)
+        sample = matrix[rng.choice(n, size=min(n, sample_size), replace=False)] if n > sample_size else matrix
+        sample = np.asarray(sample, dtype=np.float32)
+        mean = sample.mean(axis=0)
+        # Right singular vectors of the centred sample are the principal axes
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(mean, vt[:dim].T)
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        projected = (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components
+        norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+        return projected / np.maximum(norms, 1e-12)
+
+
+class QuantizedMatrix:
+    """Row-major embedding matrix stored as float16 or int8.
+
+    int8 rows carry a float32 scale each (``row ~= codes * scale``). Rows are
+    only decoded to float32 a block at a time while scoring, so the resident
+    footprint is 2x (float16) or ~4x (int8) smaller than float32. Indexing
+    returns decoded float32 rows, so callers that slice or gather rows
+    (ANN indexes, exact span scoring) work unchanged.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def from_float(cls, matrix: np.ndarray, dtype: str) -> "QuantizedMatrix":
+        if dtype == "float16":
+            return cls(np.ascontiguousarray(matrix, dtype=np.float16))
+        if dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales = np.maximum(scales, 1e-12).astype(np.float32)
+            codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+            return cls(np.ascontiguousarray(codes), scales)
+        raise ValueError(f"Unsupported storage dtype: {dtype}")
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def dtype(self):
+        return self.codes.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        block = self.codes[key].astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales[key]
+            block *= scales[..., None] if np.ndim(scales) else scales
+        return block
+
+    def dot(self, queries: np.ndarray, lo: int, hi: int, block_rows: int = 32768) -> np.ndarray:
+        """Scores ``queries @ rows[lo:hi].T`` decoding one block at a time"""
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.empty((queries.shape[0], hi - lo), dtype=np.float32)
+        for start in range(lo, hi, block_rows):
+            end = min(start + block_rows, hi)
+            codes = self.codes[start:end].astype(np.float32)
+            block = queries @ codes.T
+            if self.scales is not None:
+                block *= self.scales[start:end]
+            out[:, start - lo:end - lo] = block
+        return out
+
+
+def recall_at_k(candidate_rows, baseline_rows, k: int) -> float:
+    """Mean fraction of the exact top-k that a candidate ranking recovered"""
+    total, found = 0, 0
+    for candidate, baseline in zip(candidate_rows, baseline_rows):
+        expected = set(int(r) for r in baseline[:k])
+        if not expected:
+            continue
+        found += len(expected.intersection(int(r) for r in candidate[:k]))
+        total += len(expected)
+    return found / total if total else 1.0
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+import numpy as np
+
+from app.services.ann_index import create_ann_index
+from app.services.dataset_store import CompiledDataset, write_compiled
+from app.services.lexical_index import LexicalIndex
+from app.services.search_index import SearchIndex
+
+# Bump whenever the artifact layout changes
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+class ArtifactMismatch(RuntimeError):
+    """Raised when a prebuilt search artifact does not fit this API"""
+
+
+def _sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_artifact(path: Path, datasets: Dict[str, Any], embeddings: Dict[str, np.ndarray],
+                   hashes: Dict[str, str], index: SearchIndex, model_name: str, normalize: bool) -> Dict[str, Any]:
+    """Write a self-contained search artifact and return its manifest.
+
+    Layout::
+
+        datasets/<name>.qads     compiled question/answer store
+        embeddings/<name>.npy    L2-normalized float32 question vectors
+        index/                   SearchIndex + LexicalIndex files
+        ann/                     IVF/HNSW index, when one is attached
+        manifest.json            model, dims, storage and sha256 of every file
+
+    Built in a sibling temporary directory and moved into place at the end.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    for sub in ("datasets", "embeddings", "index"):
+        (tmp / sub).mkdir(parents=True)
+
+    dim = 0
+    for name, data in datasets.items():
+        target = tmp / "datasets" / f"{name}.qads"
+        if isinstance(data, CompiledDataset):
+            shutil.copyfile(data.path, target)
+        else:
+            write_compiled(data, target, {"source": f"{name}.json"})
+
+        matrix = np.asarray(embeddings[name], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.save(tmp / "embeddings" / f"{name}.npy", matrix / np.maximum(norms, 1e-12))
+        dim = dim or (matrix.shape[1] if len(matrix) else 0)
+
+    index.save(tmp / "index")
+    index.lexical.save(tmp / "index")
+    if index.ann is not None:
+        (tmp / "ann").mkdir()
+        index.ann.save(tmp / "ann")
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "created_at": time.time(),
+        "model": model_name,
+        "dim": int(dim),
+        "normalize": normalize,
+        "storage": index.storage_params(),
+        "ann": index.ann.kind if index.ann is not None else None,
+        "datasets": {
+            name: {"count": len(data), "content_hash": hashes[name]}
+            for name, data in datasets.items()
+        },
+        "files": {
+            str(file.relative_to(tmp)): _sha256(file)
+            for file in sorted(tmp.rglob("*")) if file.is_file()
+        },
+    }
+    with open(tmp / MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    if path.exists():
+        old = path.with_name(f".{path.name}.{os.getpid()}.old")
+        os.replace(path, old)
+        shutil.rmtree(old, ignore_errors=True)
+    os.replace(tmp, path)
+    return manifest
+
+
+def read_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        with open(Path(path) / MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactMismatch(f"No readable manifest in {path}: {e}")
+
+
+def load_artifact(path: Path, model_name: str, dim: int, normalize: bool, ann_settings=None,
+                  verify: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, np.ndarray], SearchIndex]:
+    """Open an artifact read-only after checking its manifest.
+
+    Returns (manifest, datasets, embeddings, index); everything is
+    memory-mapped. Raises ``ArtifactMismatch`` if the artifact was built
+    for another model, dimension or format, or a checksum does not match.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    expected = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model": model_name,
+        "dim": dim,
+        "normalize": normalize,
+    }
+    for key, value in expected.items():
+        if manifest.get(key) != value:
+            raise ArtifactMismatch(
+                f"Artifact {path} has {key}={manifest.get(key)!r}, this API needs {value!r}"
+            )
+
+    if verify:
+        for relative, checksum in manifest["files"].items():
+            file = path / relative
+            if not file.is_file() or _sha256(file) != checksum:
+                raise ArtifactMismatch(f"Artifact file {relative} is missing or corrupt")
+
+    datasets: Dict[str, Any] = {}
+    embeddings: Dict[str, np.ndarray] = {}
+    for name in manifest["datasets"]:
+        datasets[name] = CompiledDataset(path / "datasets" / f"{name}.qads")
+        embeddings[name] = np.load(path / "embeddings" / f"{name}.npy", mmap_mode="r")
+
+    index = SearchIndex.load(path / "index")
+    index.lexical = LexicalIndex.load(path / "index")
+    index.datasets = datasets
+    index.embeddings = embeddings
+    if manifest.get("ann") and ann_settings is not None:
+        ann = create_ann_index(manifest["ann"], ann_settings)
+        ann.load(path / "ann", index.dim)
+        index.ann = ann
+    return manifest, datasets, embeddings, index
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.models.search import SearchResult
+from app.services.inference_executor import InferenceExecutor, InferenceOverloaded, inference_executor
+from app.services.search_service import SearchService, search_service
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class _PendingSearch:
+    __slots__ = ("query", "dataset", "limit", "mode", "future", "enqueued_at")
+
+    def __init__(self, query: str, dataset: str, limit: int, mode: Optional[str], future: asyncio.Future):
+        self.query = query
+        self.dataset = dataset
+        self.limit = limit
+        self.mode = mode
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class SearchBatcher:
+    """Coalesces concurrent /search calls into batched model passes.
+
+    Requests are queued; a single worker task waits up to ``window_ms`` after
+    the first arrival (or until ``max_batch_size`` requests are waiting), then
+    encodes the whole batch in one ``model.encode`` call, scores it with one
+    similarity matmul and resolves each caller's future with its own results.
+
+    Batches run on the inference executor, at most one per executor thread;
+    while every thread is busy new requests keep queueing and form the next,
+    larger batch. More than ``max_queue`` waiting requests are rejected.
+    """
+
+    def __init__(self, service: SearchService, executor: InferenceExecutor,
+                 window_ms: float = 5.0, max_batch_size: int = 32, max_queue: int = 64):
+        self.service = service
+        self.executor = executor
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_queue = max(max_queue, self.max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight = set()
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.batches = 0
+        self.queries = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram: Dict[str, int] = {
+            self._bucket_label(i): 0 for i in range(len(BATCH_SIZE_BUCKETS) + 1)
+        }
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @staticmethod
+    def _bucket_label(i: int) -> str:
+        if i == len(BATCH_SIZE_BUCKETS):
+            return f">{BATCH_SIZE_BUCKETS[-1]}"
+        return f"<={BATCH_SIZE_BUCKETS[i]}"
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            # The queue belongs to the loop the worker runs on
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def search(self, query: str, dataset: str = "all", limit: int = 5,
+                     mode: Optional[str] = None) -> List[SearchResult]:
+        """Queue a search and wait for the batch it lands in to finish"""
+        cached = self.service.cached_search(query, dataset, limit, mode)
+        if cached is not None:
+            return cached
+        if not self.service.needs_model(query, mode):
+            # Pure lexical lookups skip batching but still run off the event loop
+            results = await self.executor.run(self.service.search_batch, [query], [dataset], [limit], [mode])
+            return results[0]
+
+        self._ensure_worker()
+        if self._queue.qsize() >= self.max_queue:
+            raise InferenceOverloaded("Too many search requests queued, try again shortly")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingSearch(query, dataset, limit, mode, future))
+        return await future
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self) -> List[_PendingSearch]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            # Drain anything already queued without yielding to the timer
+            while not self._queue.empty() and len(batch) < self.max_batch_size:
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        slots = asyncio.Semaphore(self.executor.max_workers)
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free inference thread before sealing the next batch
+            await slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                slots.release()
+                raise
+            self._record(batch)
+
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _dispatch(self, batch: List[_PendingSearch]):
+        try:
+            results = await self.executor.run(
+                self.service.search_batch,
+                [p.query for p in batch],
+                [p.dataset for p in batch],
+                [p.limit for p in batch],
+                [p.mode for p in batch]
+            )
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    def _record(self, batch: List[_PendingSearch]):
+        now = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.queries += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+
+        bucket = next((i for i, upper in enumerate(BATCH_SIZE_BUCKETS) if size <= upper), len(BATCH_SIZE_BUCKETS))
+        self.batch_size_histogram[self._bucket_label(bucket)] += 1
+
+        for pending in batch:
+            wait = now - pending.enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def metrics(self) -> Dict[str, object]:
+        """Batch size and queue wait statistics since startup"""
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "queries": self.queries,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_histogram": dict(self.batch_size_histogram),
+            "avg_queue_wait_ms": 1000.0 * self.total_wait / self.queries if self.queries else 0.0,
+            "max_queue_wait_ms": 1000.0 * self.max_wait,
+        }
+
+
+# Global instance
+search_batcher = SearchBatcher(
+    search_service,
+    inference_executor,
+    window_ms=settings.SEARCH_BATCH_WINDOW_MS,
+    max_batch_size=settings.SEARCH_BATCH_MAX_SIZE,
+    max_queue=settings.INFERENCE_MAX_PENDING
+)
@@ -0,0 +1,276 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.quantization import PCAProjection, QuantizedMatrix
+
+
+def entry_id(item: Dict[str, str]) -> str:
+    """Stable id of a QA entry: a hash of its question and answer.
+
+    Unlike a position it survives reloads, rebuilds and reordered files.
+    """
+    text = f"{item.get('question', '')}\0{item.get('answer', '')}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class SearchIndex:
+    """Unified dense index over every loaded dataset.
+
+    All dataset embeddings are stacked into one pre-normalized, C-contiguous
+    float32 matrix so a query against ``"all"`` is a single matrix-vector
+    product. Rows of a dataset are contiguous, so per-dataset searches just
+    score the ``ranges[name]`` slice, and ``dataset_ids`` maps any row back
+    to the dataset it came from.
+
+    With ``groups`` (see ``dedup.group_duplicates``) a dataset contributes
+    one row per group of near-duplicate entries, scored by the normalized
+    mean of the members' vectors; ``members(row)`` lists the entries behind
+    a row and ``locate`` returns the group's representative.
+    """
+
+    def __init__(self, embeddings: Dict[str, np.ndarray], groups: Optional[Dict[str, List[np.ndarray]]] = None):
+        # Set by SearchService when the index is published
+        self.version = 0
+        # Optional approximate index (IVF/HNSW); exact brute force when None
+        self.ann = None
+        # BM25 index over the same rows, for lexical and hybrid search
+        self.lexical = None
+        # Dataset entries the rows point into, swapped together with the index
+        self.datasets: Dict[str, list] = {}
+        # Typeahead prefix index per dataset (suggest_index.SuggestIndex)
+        self.suggest: Dict[str, object] = {}
+        # Per-entry vectors the rows were built from, for lookups by entry id
+        self.embeddings: Dict[str, np.ndarray] = {}
+        # dataset -> entry id -> position, built on first use
+        self._entry_positions: Dict[str, Dict[str, int]] = {}
+        # Storage format, see compress()
+        self.storage = "float32"
+        self.projection: Optional[PCAProjection] = None
+        self.dataset_names: List[str] = list(embeddings.keys())
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        # CSR row -> member entries, only when deduplicated
+        self.group_offsets: Optional[np.ndarray] = None
+        self.group_members: Optional[np.ndarray] = None
+
+        counts = [len(groups[name]) if groups else len(embeddings[name]) for name in self.dataset_names]
+        total = int(sum(counts))
+        dim = next((m.shape[1] for m in embeddings.values() if len(m)), 0)
+
+        self.matrix = np.empty((total, dim), dtype=np.float32)
+        self.dataset_ids = np.repeat(
+            np.arange(len(self.dataset_names), dtype=np.int32), counts
+        )
+
+        if groups:
+            sizes = [len(members) for name in self.dataset_names for members in groups[name]]
+            self.group_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+            self.group_members = np.concatenate(
+                [members for name in self.dataset_names for members in groups[name]] or [np.empty(0)]
+            ).astype(np.int32)
+
+        start = 0
+        for name, count in zip(self.dataset_names, counts):
+            end = start + count
+            if count and groups:
+                vectors = np.asarray(embeddings[name], dtype=np.float32)
+                vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                lo, hi = self.group_offsets[start], self.group_offsets[end]
+                offsets = self.group_offsets[start:end] - lo
+                self.matrix[start:end] = np.add.reduceat(vectors[self.group_members[lo:hi]], offsets, axis=0)
+            elif count:
+                self.matrix[start:end] = embeddings[name]
+            self.ranges[name] = (start, end)
+            start = end
+
+        # Pre-normalize once so scoring is a plain dot product
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        np.divide(self.matrix, np.maximum(norms, 1e-12), out=self.matrix)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def compress(self, dtype: str = "float32", pca_dim: int = 0):
+        """Shrink the stored vectors: optional PCA, then float16/int8 codes.
+
+        Must run before an ANN index is attached, since that is built from
+        the stored (possibly reduced) vectors.
+        """
+        if pca_dim and 0 < pca_dim < self.dim and len(self):
+            self.projection = PCAProjection.fit(self.matrix, pca_dim)
+            self.matrix = self.projection.transform(self.matrix)
+        if dtype != "float32":
+            self.matrix = QuantizedMatrix.from_float(self.matrix, dtype)
+        self.storage = dtype
+
+    def storage_params(self) -> Dict[str, object]:
+        return {
+            "dtype": self.storage,
+            "pca_dim": self.projection.dim if self.projection is not None else 0,
+            "rows": len(self),
+        }
+
+    def save(self, path: Path):
+        """Write the stored vectors and row layout as plain .npy files"""
+        if isinstance(self.matrix, QuantizedMatrix):
+            np.save(path / "codes.npy", self.matrix.codes)
+            if self.matrix.scales is not None:
+                np.save(path / "scales.npy", self.matrix.scales)
+        else:
+            np.save(path / "matrix.npy", self.matrix)
+        if self.projection is not None:
+            np.save(path / "pca_mean.npy", self.projection.mean)
+            np.save(path / "pca_components.npy", self.projection.components)
+        np.save(path / "dataset_ids.npy", self.dataset_ids)
+        if self.group_members is not None:
+            np.save(path / "group_offsets.npy", self.group_offsets)
+            np.save(path / "group_members.npy", self.group_members)
+        with open(path / "index.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "storage": self.storage,
+                "dataset_names": self.dataset_names,
+                "ranges": self.ranges,
+            }, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Open a saved index memory-mapped; pages are shared by every process"""
+        with open(path / "index.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls({})
+        index.storage = meta["storage"]
+        index.dataset_names = meta["dataset_names"]
+        index.ranges = {name: tuple(span) for name, span in meta["ranges"].items()}
+        index.dataset_ids = np.load(path / "dataset_ids.npy", mmap_mode="r")
+        if (path / "group_members.npy").exists():
+            index.group_offsets = np.load(path / "group_offsets.npy", mmap_mode="r")
+            index.group_members = np.load(path / "group_members.npy", mmap_mode="r")
+        if (path / "codes.npy").exists():
+            scales_path = path / "scales.npy"
+            index.matrix = QuantizedMatrix(
+                np.load(path / "codes.npy", mmap_mode="r"),
+                np.load(scales_path, mmap_mode="r") if scales_path.exists() else None
+            )
+        else:
+            index.matrix = np.load(path / "matrix.npy", mmap_mode="r")
+        if (path / "pca_mean.npy").exists():
+            index.projection = PCAProjection(
+                np.load(path / "pca_mean.npy"), np.load(path / "pca_components.npy")
+            )
+        return index
+
+    def _prepare_queries(self, query_embeddings: np.ndarray) -> np.ndarray:
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.maximum(norms, 1e-12)
+        if self.projection is not None:
+            queries = self.projection.transform(queries)
+        return queries
+
+    def _scores(self, queries: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        if isinstance(self.matrix, QuantizedMatrix):
+            return self.matrix.dot(queries, lo, hi)
+        return queries @ self.matrix[lo:hi].T
+
+    def row_range(self, dataset: str) -> Optional[Tuple[int, int]]:
+        """Row span for a dataset ("all" covers the whole matrix)"""
+        if dataset == "all":
+            return (0, len(self))
+        return self.ranges.get(dataset)
+
+    def locate(self, row: int) -> Tuple[str, int]:
+        """Map a global row to (dataset name, position within that dataset)"""
+        name = self.dataset_names[self.dataset_ids[row]]
+        if self.group_members is not None:
+            return name, int(self.group_members[self.group_offsets[row]])
+        return name, int(row - self.ranges[name][0])
+
+    def position_of(self, dataset: str, entry: str) -> Optional[int]:
+        """Position of the entry with id ``entry`` in ``dataset``, or None"""
+        positions = self._entry_positions.get(dataset)
+        if positions is None:
+            if dataset not in self.datasets:
+                return None
+            positions = {}
+            for i, item in enumerate(self.datasets[dataset]):
+                # Identical entries share an id; the first one answers for it
+                positions.setdefault(entry_id(item), i)
+            self._entry_positions[dataset] = positions
+        return positions.get(entry)
+
+    def members(self, row: int) -> np.ndarray:
+        """Positions of every dataset entry a row stands for"""
+        if self.group_members is not None:
+            return np.asarray(self.group_members[self.group_offsets[row]:self.group_offsets[row + 1]])
+        return np.array([self.locate(row)[1]])
+
+    def groups(self) -> Optional[Dict[str, List[np.ndarray]]]:
+        """The ``groups`` this index was built with, e.g. to build a baseline"""
+        if self.group_members is None:
+            return None
+        return {
+            name: [self.members(row) for row in range(start, end)]
+            for name, (start, end) in self.ranges.items()
+        }
+
+    def search(self, query_embedding: np.ndarray, dataset: str = "all", limit: int = 5,
+               exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (global rows, cosine scores) of the best matches, best first"""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.search_batch(query, [dataset], [limit], exact=exact)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, datasets: List[str], limits: List[int],
+                     exact: bool = False) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score many queries with one matrix multiply.
+
+        Each query may target a different dataset and limit; its top-k is
+        taken from its own row range of the shared score matrix. When an
+        ANN index is attached it is used instead, unless ``exact`` is set.
+        """
+        queries = self._prepare_queries(query_embeddings)
+
+        spans = [self.row_range(name) for name in datasets]
+        if self.ann is not None and not exact:
+            return self.ann.search_batch(self.matrix, queries, spans, limits)
+
+        wanted = [span for span in spans if span is not None and span[0] < span[1]]
+        if not wanted or len(self) == 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in datasets]
+
+        # Only score the rows some query actually needs
+        lo = min(span[0] for span in wanted)
+        hi = max(span[1] for span in wanted)
+        scores = self._scores(queries, lo, hi)
+
+        results = []
+        for i, (span, limit) in enumerate(zip(spans, limits)):
+            if span is None or span[0] == span[1] or limit <= 0:
+                results.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)))
+                continue
+            row_scores = scores[i, span[0] - lo:span[1] - lo]
+            best = top_k(row_scores, limit)
+            results.append((best + span[0], row_scores[best]))
+        return results
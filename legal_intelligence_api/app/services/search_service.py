@@ -1,22 +1,74 @@
 import json
+import threading
 import time
-from typing import List, Dict, Any
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer, util
 from app.core.config import settings
-from app.models.search import SearchResult
+from app.models.search import SearchResult, Suggestion
+from app.services.dataset_store import DatasetStore, entries_hash
+from app.services.dedup import group_duplicates
+from app.services.embedding_builder import EmbeddingBuilder
+from app.services.embedding_cache import EmbeddingCache
+from app.services.encoder import create_encoder
+from app.services.search_index import SearchIndex, entry_id
+from app.services.ann_index import create_ann_index, ann_fingerprint, load_or_build_ann
+from app.services.query_cache import LRUCache, normalize_query
+from app.services.lexical_index import LexicalIndex, is_reference_lookup, reciprocal_rank_fusion
+from app.services.quantization import recall_at_k
+from app.services.search_artifact import ArtifactMismatch, load_artifact, read_manifest, write_artifact
+from app.services.suggest_index import SuggestIndex
+from app.services.text_index_cache import load_or_build_suggest, load_or_build_text_index, text_index_key
+from app.services.shared_index import build_lock, load_or_build_snapshot, snapshot_key
+
+SEARCH_MODES = ("semantic", "lexical", "hybrid")
+
+
+def _results_size(results: List[SearchResult]) -> int:
+    """Rough memory footprint of a cached result list"""
+    return sum(len(r.question) + len(r.answer) + 200 for r in results) + 64
 
 class SearchService:
     def __init__(self):
-        self.model = None
+        self.encoder = None
         self.datasets: Dict[str, List[Dict[str, Any]]] = {}
-        self.embeddings: Dict[str, Any] = {}
+        self.embeddings: Dict[str, np.ndarray] = {}
+        self.embedding_cache = None
+        self.dataset_store = DatasetStore(settings.DATASET_STORE_DIR) if settings.DATASET_FORMAT == "compiled" else None
+        self.dataset_hashes: Dict[str, str] = {}
+        # dataset -> hash of its questions and answers (see entries_hash)
+        self.entry_hashes: Dict[str, str] = {}
+        self.index: SearchIndex = None
+        self.index_version = 0
+        self.last_reload: Optional[float] = None
         self.is_ready = False
+        self._file_signatures: Dict[str, tuple] = {}
+        self._reload_lock = threading.Lock()
+        self._builder: Optional[EmbeddingBuilder] = None
+        # dataset -> (entries, SuggestIndex built from them)
+        self._suggest_cache: Dict[str, tuple] = {}
+        # dataset -> sentences, seconds and sentences/s of its last encode
+        self.build_stats: Dict[str, Dict[str, float]] = {}
+        self.artifact_manifest: Optional[Dict[str, Any]] = None
+        # (path, mtime) of SEARCH_RECALL_QUERIES -> its encoded queries
+        self._recall_queries: Optional[tuple] = None
+        # dataset -> phase (queued/encoding/indexing/ready/failed) and progress
+        self.dataset_status: Dict[str, Dict[str, Any]] = {}
+
+        # normalized query -> embedding, and (query, dataset, limit) -> results
+        self.query_embedding_cache = LRUCache(
+            settings.QUERY_EMBEDDING_CACHE_MB * 1024 * 1024,
+            settings.QUERY_CACHE_TTL_SECONDS,
+            sizeof=lambda vector: vector.nbytes
+        )
+        self.query_result_cache = LRUCache(
+            settings.QUERY_RESULT_CACHE_MB * 1024 * 1024,
+            settings.QUERY_CACHE_TTL_SECONDS,
+            sizeof=_results_size
+        )
 
     def initialize(self):
         """Initialize in background"""
-        import threading
         print("Starting Search Service initialization in background...")
         thread = threading.Thread(target=self._initialize_sync)
         thread.daemon = True
@@ -27,85 +79,736 @@ class SearchService:
         try:
             print("Initializing Search Service...")
             
-            # Load Model
+            # Load Model (in-process, or connect to the encoder sidecar)
             try:
-                print(f"Loading model: {settings.EMBEDDING_MODEL}")
-                self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
+                print(f"Loading model: {settings.EMBEDDING_MODEL} ({settings.ENCODER_BACKEND} encoder)")
+                self.encoder = create_encoder(settings)
             except Exception as e:
                 print(f"Error loading model: {e}")
                 return
 
-            # Load Datasets
-            self._load_datasets()
-            
-            # Generate Embeddings
-            self._generate_embeddings()
-            
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self.embedding_cache = EmbeddingCache(
+                    settings.EMBEDDING_CACHE_DIR,
+                    settings.EMBEDDING_MODEL,
+                    normalize=settings.NORMALIZE_EMBEDDINGS
+                )
+
+            # Load datasets, embed them and build the unified index
+            # (or open the prebuilt artifact from build_index.py)
+            try:
+                self.reload()
+            except ArtifactMismatch as e:
+                print(f"Refusing search artifact: {e}")
+                return
+
             self.is_ready = True
             print("Search Service Ready!")
+
+            if settings.DATA_WATCH_INTERVAL > 0 and settings.SEARCH_ARTIFACT_DIR is None:
+                self._start_watcher()
         except Exception as e:
             print(f"Unexpected error in Search Service initialization: {e}")
 
+    def reload(self) -> Dict[str, Any]:
+        """(Re)build the index from DATA_DIR and swap it in atomically.
+
+        Unchanged files are not re-read, unchanged datasets keep their
+        vectors, and changed datasets only encode questions that did not
+        exist before. Searches already running keep using the index they
+        started with; new ones see the new index once it is published.
+        """
+        if settings.SEARCH_ARTIFACT_DIR is not None:
+            return self._load_artifact(settings.SEARCH_ARTIFACT_DIR)
+
+        with self._reload_lock:
+            start = time.time()
+            if self.index is not None and self._scan_data_dir() == self._file_signatures:
+                return {
+                    "index_version": self.index.version,
+                    "added": [],
+                    "removed": [],
+                    "encoded": 0,
+                    "rows": len(self.index),
+                    "time_taken": time.time() - start,
+                }
+            datasets, signatures = self._load_datasets()
+            for name, data in datasets.items():
+                if self.index is None or name not in self.index.ranges:
+                    self._set_status(name, "queued", rows=len(data))
+
+            # In shared mode the first worker to take the lock encodes and
+            # builds; the others find the embedding cache and snapshot ready
+            shared = settings.SEARCH_SHARED_INDEX and self.embedding_cache is not None
+            # On the very first build, the datasets embedded so far are
+            # published before each one that has to be encoded, so small
+            # datasets are searchable while big ones encode. A warm start
+            # (every dataset cached) publishes once, at the end.
+            progressive = self.index is None and not shared
+            with build_lock(settings.SEARCH_SNAPSHOT_DIR) if shared else nullcontext():
+                embeddings, hashes, encoded = self._generate_embeddings(
+                    datasets,
+                    before_encode=self._publish_partial if progressive else None
+                )
+                # Postings and duplicate groups also depend on the answers
+                entry_hashes = self._entry_hashes(datasets)
+                for name in self.unavailable_datasets():
+                    if name in datasets:
+                        self._set_status(name, "indexing")
+                if shared:
+                    key = snapshot_key(entry_hashes, settings.EMBEDDING_MODEL, {
+                        "dtype": settings.SEARCH_INDEX_DTYPE,
+                        "pca_dim": settings.SEARCH_PCA_DIM,
+                        "dedup": settings.SEARCH_DEDUP_THRESHOLD if settings.SEARCH_DEDUP else None,
+                    })
+                    index, built = load_or_build_snapshot(
+                        settings.SEARCH_SNAPSHOT_DIR, key, lambda: self._build_index(datasets, embeddings)
+                    )
+                    print(f"{'Built' if built else 'Opened'} shared index snapshot {key}")
+                else:
+                    index = self._build_index(datasets, embeddings)
+                index.datasets = datasets
+                index.embeddings = embeddings
+                index.suggest = self._suggest_indexes(datasets)
+                self._attach_ann(index, entry_hashes)
+
+            previous = set(self.datasets)
+            for name in previous - set(datasets):
+                self.dataset_status.pop(name, None)
+            self.datasets = datasets
+            self.embeddings = embeddings
+            self.dataset_hashes = hashes
+            self.entry_hashes = entry_hashes
+            self._file_signatures = signatures
+            self._install_index(index)
+            self.last_reload = time.time()
+            print(f"Built search index with {len(index)} rows (version {index.version})")
+
+            return {
+                "index_version": index.version,
+                "added": sorted(set(datasets) - previous),
+                "removed": sorted(previous - set(datasets)),
+                "encoded": encoded,
+                "rows": len(index),
+                "time_taken": time.time() - start,
+            }
+
+    def _load_artifact(self, path) -> Dict[str, Any]:
+        """Open a prebuilt artifact read-only and publish it, if it changed"""
+        with self._reload_lock:
+            start = time.time()
+            manifest = read_manifest(path)
+            if self.index is not None and manifest == self.artifact_manifest:
+                return {"index_version": self.index.version, "rows": len(self.index), "time_taken": 0.0}
+
+            dim = int(self._encode(["dimension check"]).shape[1])
+            manifest, datasets, embeddings, index = load_artifact(
+                path,
+                settings.EMBEDDING_MODEL,
+                dim,
+                settings.NORMALIZE_EMBEDDINGS,
+                ann_settings=settings,
+                verify=settings.SEARCH_ARTIFACT_VERIFY
+            )
+            index.suggest = self._suggest_indexes(datasets)
+            self.datasets = datasets
+            self.embeddings = embeddings
+            self.dataset_hashes = {name: meta["content_hash"] for name, meta in manifest["datasets"].items()}
+            self.artifact_manifest = manifest
+            self._install_index(index)
+            self.last_reload = time.time()
+            print(f"Opened search artifact {path} with {len(index)} rows (version {index.version})")
+            return {"index_version": index.version, "rows": len(index), "time_taken": time.time() - start}
+
+    def build_artifact(self, path) -> Dict[str, Any]:
+        """Build everything from DATA_DIR and write it as an artifact (see build_index.py)"""
+        datasets, _ = self._load_datasets()
+        embeddings, hashes, _ = self._generate_embeddings(datasets)
+        index = self._build_index(datasets, embeddings)
+        self._attach_ann(index, self._entry_hashes(datasets))
+        return write_artifact(
+            path, datasets, embeddings, hashes, index,
+            settings.EMBEDDING_MODEL, settings.NORMALIZE_EMBEDDINGS
+        )
+
+    def _publish_partial(self, datasets, embeddings: Dict[str, np.ndarray]):
+        """Serve the datasets embedded so far while the rest are still encoding"""
+        if not embeddings or (self.index is not None and set(embeddings) <= set(self.index.ranges)):
+            return
+        ready = {name: data for name, data in datasets.items() if name in embeddings}
+        for name in ready:
+            if self.index is None or name not in self.index.ranges:
+                self._set_status(name, "indexing")
+        index = self._build_index(ready, embeddings)
+        index.datasets = ready
+        index.embeddings = {name: embeddings[name] for name in ready}
+        index.suggest = self._suggest_indexes(ready)
+        self._install_index(index)
+        print(f"Serving {len(ready)}/{len(datasets)} datasets (version {index.version})")
+
+    def _suggest_indexes(self, datasets) -> Dict[str, SuggestIndex]:
+        """Typeahead index per dataset, rebuilt only for datasets that were reloaded.
+
+        Indexes are persisted next to the embedding cache, so a warm start
+        loads them; a rebuilt index keeps the search counts of the old one.
+        """
+        indexes = {}
+        cache_dir = self.embedding_cache.cache_dir if self.embedding_cache is not None else None
+        hashes = self._entry_hashes(datasets)
+        for name, data in datasets.items():
+            cached = self._suggest_cache.get(name)
+            if cached is None or cached[0] is not data:
+                start = time.time()
+                suggest_index, built = load_or_build_suggest(cache_dir, name, hashes[name], lambda: SuggestIndex(data))
+                if cached is not None:
+                    suggest_index.inherit(cached[1])
+                print(f"{'Built' if built else 'Loaded'} suggestions for {name}: "
+                      f"{len(suggest_index)} entries in {time.time() - start:.1f}s")
+                cached = (data, suggest_index)
+            self._suggest_cache[name] = cached
+            indexes[name] = cached[1]
+        for name in set(self._suggest_cache) - set(datasets):
+            del self._suggest_cache[name]
+        return indexes
+
+    def _record_selection(self, index: SearchIndex, dataset: str, entry: str):
+        """Count a search or selection of an entry towards its suggestion's popularity"""
+        suggest_index = index.suggest.get(dataset)
+        if suggest_index is None:
+            return
+        position = index.position_of(dataset, entry)
+        if position is not None:
+            suggest_index.record(position)
+
+    def _set_status(self, name: str, phase: str, **fields):
+        status = dict(self.dataset_status.get(name, {}), phase=phase, **fields)
+        if phase != "encoding":
+            status.pop("eta_seconds", None)
+        self.dataset_status[name] = status
+
+    def _report_progress(self, name: str, done: int, total: int, started: float):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self._set_status(
+            name, "encoding",
+            rows_encoded=done,
+            rows_to_encode=total,
+            eta_seconds=round((total - done) / rate, 1) if rate > 0 else None
+        )
+
+    def unavailable_datasets(self, dataset: str = "all") -> List[str]:
+        """Known datasets the current index cannot answer for yet"""
+        index = self.index
+        served = index.ranges if index is not None else {}
+        names = list(self.dataset_status) if dataset == "all" else [dataset]
+        return [name for name in names if name in self.dataset_status and name not in served]
+
+    def _build_index(self, datasets, embeddings: Dict[str, np.ndarray]) -> SearchIndex:
+        """Unified dense index plus BM25 postings over every dataset.
+
+        Duplicate groups and postings are persisted next to the embedding
+        cache, keyed by the entries, so a warm start only loads them.
+        """
+        dedup = settings.SEARCH_DEDUP_THRESHOLD if settings.SEARCH_DEDUP else None
+        cache_dir = self.embedding_cache.cache_dir if self.embedding_cache is not None else None
+        key = text_index_key(self._entry_hashes(datasets), dedup)
+        start = time.time()
+        groups, lexical, built = load_or_build_text_index(
+            cache_dir, key, lambda: self._build_text_index(datasets, embeddings)
+        )
+        if not built:
+            print(f"Loaded lexical index and groups {key} in {time.time() - start:.1f}s")
+
+        # Row order must follow ``datasets`` for both indexes
+        index = SearchIndex({name: embeddings[name] for name in datasets}, groups)
+        index.lexical = lexical
+        index.compress(settings.SEARCH_INDEX_DTYPE, settings.SEARCH_PCA_DIM)
+        return index
+
+    def _build_text_index(self, datasets, embeddings: Dict[str, np.ndarray]):
+        """Duplicate groups (with SEARCH_DEDUP) and the BM25 index over them"""
+        groups = None
+        if settings.SEARCH_DEDUP:
+            dedup_start = time.time()
+            groups = {
+                name: group_duplicates(data, embeddings[name], settings.SEARCH_DEDUP_THRESHOLD)
+                for name, data in datasets.items()
+            }
+            entries = sum(len(data) for data in datasets.values())
+            rows = sum(len(g) for g in groups.values())
+            print(f"Collapsed {entries} entries into {rows} groups in {time.time() - dedup_start:.1f}s")
+
+        lexical_start = time.time()
+        lexical = LexicalIndex(datasets, groups=groups)
+        print(f"Built lexical index with {len(lexical.vocabulary)} terms in {time.time() - lexical_start:.1f}s")
+        return groups, lexical
+
+    def _scan_data_dir(self) -> Dict[str, tuple]:
+        """(mtime, size) of every JSON file in DATA_DIR, keyed by dataset name"""
+        if not settings.DATA_DIR.exists():
+            return {}
+        signatures = {}
+        for json_file in sorted(settings.DATA_DIR.glob("*.json")):
+            try:
+                stat = json_file.stat()
+            except OSError:
+                continue
+            signatures[json_file.stem] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _start_watcher(self):
+        """Poll DATA_DIR and reload when JSON files are added, changed or removed"""
+        def watch():
+            while True:
+                time.sleep(settings.DATA_WATCH_INTERVAL)
+                try:
+                    if self._scan_data_dir() != self._file_signatures:
+                        print("Dataset change detected, reloading...")
+                        self.reload()
+                except Exception as e:
+                    print(f"Dataset reload failed: {e}")
+
+        thread = threading.Thread(target=watch, name="dataset-watcher")
+        thread.daemon = True
+        thread.start()
+
     def _load_datasets(self):
-        """Load all JSON datasets from data directory"""
+        """Load all JSON datasets from data directory, reusing unchanged ones"""
+        datasets: Dict[str, List[Dict[str, Any]]] = {}
         if not settings.DATA_DIR.exists():
             print(f"Warning: Data directory not found at {settings.DATA_DIR}")
-            return
+            return datasets, {}
+
+        signatures = self._scan_data_dir()
+        for dataset_name, signature in signatures.items():
+            if dataset_name in self.datasets and self._file_signatures.get(dataset_name) == signature:
+                datasets[dataset_name] = self.datasets[dataset_name]
+                continue
 
-        for json_file in settings.DATA_DIR.glob("*.json"):
-            dataset_name = json_file.stem
+            json_file = settings.DATA_DIR / f"{dataset_name}.json"
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.datasets[dataset_name] = data
-                    print(f"Loaded dataset: {dataset_name} with {len(data)} entries")
+                if self.dataset_store is not None:
+                    data = self.dataset_store.open(dataset_name, json_file, signature)
+                else:
+                    with open(json_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                datasets[dataset_name] = data
+                print(f"Loaded dataset: {dataset_name} with {len(data)} entries")
             except Exception as e:
                 print(f"Error loading {json_file}: {e}")
+                self._set_status(dataset_name, "failed", error=str(e))
+                # Keep serving the last good copy of a file that fails to parse
+                if dataset_name in self.datasets:
+                    datasets[dataset_name] = self.datasets[dataset_name]
 
-    def _generate_embeddings(self):
-        """Generate embeddings for all datasets"""
-        print("Generating embeddings... This may take a moment.")
-        for name, data in self.datasets.items():
-            # We'll embed the questions for search
-            questions = [item.get('question', '') for item in data]
-            
-            # Encode
-            embeddings = self.model.encode(questions, convert_to_tensor=True)
-            self.embeddings[name] = embeddings
-            print(f"Generated embeddings for {name}")
+        return datasets, signatures
 
-    def search(self, query: str, dataset: str = "all", limit: int = 5) -> List[SearchResult]:
-        """Perform semantic search"""
-        if not self.is_ready:
+    def _generate_embeddings(self, datasets: Dict[str, List[Dict[str, Any]]], before_encode=None):
+        """Embed every dataset, reusing previous vectors and the on-disk cache.
+
+        Datasets are embedded smallest first; ``before_encode(datasets,
+        embeddings)`` is called before each one that misses every cache and
+        has to be encoded, with the datasets done so far. Returns (embeddings in
+        ``datasets`` order, content hashes, number of questions encoded).
+        """
+        embeddings: Dict[str, np.ndarray] = {}
+        hashes: Dict[str, str] = {}
+        encoded = 0
+        self._builder = EmbeddingBuilder(
+            self.encoder,
+            settings.EMBEDDING_MODEL,
+            normalize=settings.NORMALIZE_EMBEDDINGS,
+            # Worker processes load their own model; not useful with the sidecar
+            workers=settings.EMBEDDING_BUILD_WORKERS if settings.ENCODER_BACKEND == "local" else 0,
+            token_budget=settings.EMBEDDING_BATCH_TOKENS,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE
+        )
+        try:
+            for name in sorted(datasets, key=lambda n: len(datasets[n])):
+                encoded += self._embed_dataset(
+                    name, datasets[name], embeddings, hashes,
+                    before_encode=(lambda: before_encode(datasets, embeddings)) if before_encode else None
+                )
+        finally:
+            self._builder.close()
+            self._builder = None
+
+        embeddings = {name: embeddings[name] for name in datasets}
+        return embeddings, {name: hashes[name] for name in datasets}, encoded
+
+    def _entry_hashes(self, datasets) -> Dict[str, str]:
+        """Hash of each dataset's questions and answers, reused for unchanged datasets"""
+        hashes = {}
+        for name, data in datasets.items():
+            if data is self.datasets.get(name) and name in self.entry_hashes:
+                hashes[name] = self.entry_hashes[name]
+            else:
+                # Compiled datasets carry it in their header
+                hashes[name] = getattr(data, 'entries_hash', None) or entries_hash(data)
+        return hashes
+
+    def _embed_dataset(self, name: str, data, embeddings: Dict[str, np.ndarray], hashes: Dict[str, str],
+                       before_encode=None) -> int:
+        """Vectors for one dataset into ``embeddings``; returns how many were encoded"""
+        # Compiled datasets carry the question hash in their header
+        content_hash = getattr(data, 'content_hash', None)
+        if content_hash is None:
+            content_hash = EmbeddingCache.content_hash(item.get('question', '') for item in data)
+        hashes[name] = content_hash
+        if self.dataset_hashes.get(name) == content_hash and name in self.embeddings:
+            embeddings[name] = self.embeddings[name]
+            return 0
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.load(name, content_hash)
+            if cached is not None:
+                embeddings[name] = cached
+                print(f"Loaded cached embeddings for {name}")
+                return 0
+
+        if before_encode is not None:
+            before_encode()
+
+        # We'll embed the questions for search
+        questions = [item.get('question', '') for item in data]
+        start = time.time()
+        matrix, count = self._embed_changed(name, questions)
+
+        if self.embedding_cache is not None:
+            # A cache problem must never fail indexing; keep the in-memory matrix
+            try:
+                self.embedding_cache.save(name, content_hash, matrix)
+                # Re-open memory-mapped so the page cache backs the vectors
+                cached = self.embedding_cache.load(name, content_hash)
+                if cached is not None:
+                    matrix = cached
+            except Exception as e:
+                print(f"Could not write embedding cache for {name}: {e}")
+
+        embeddings[name] = matrix
+        print(f"Generated embeddings for {name} ({count} encoded) in {time.time() - start:.1f}s")
+        return count
+
+    def _embed_changed(self, name: str, questions: List[str]):
+        """Vectors for a dataset, encoding only questions the old copy lacked"""
+        old_vectors = self.embeddings.get(name)
+        old_rows: Dict[str, int] = {}
+        if old_vectors is not None:
+            for row, item in enumerate(self.datasets.get(name, [])):
+                old_rows.setdefault(item.get('question', ''), row)
+
+        new_questions = list(dict.fromkeys(q for q in questions if q not in old_rows))
+        if not old_rows:
+            print(f"Generating embeddings for {name}... This may take a moment.")
+            return self._encode_corpus(name, questions), len(questions)
+
+        new_vectors = dict(zip(new_questions, self._encode_corpus(name, new_questions))) if new_questions else {}
+        dim = old_vectors.shape[1]
+        matrix = np.empty((len(questions), dim), dtype=np.float32)
+        for row, question in enumerate(questions):
+            old_row = old_rows.get(question)
+            matrix[row] = old_vectors[old_row] if old_row is not None else new_vectors[question]
+        return matrix, len(new_questions)
+
+    def _encode_corpus(self, name: str, texts: List[str]) -> np.ndarray:
+        """Encode dataset texts through the bucketed builder and record throughput"""
+        started = time.perf_counter()
+        self._report_progress(name, 0, len(texts), started)
+        matrix, seconds = self._builder.encode(
+            texts, progress=lambda done: self._report_progress(name, done, len(texts), started)
+        )
+        rate = len(texts) / seconds if seconds > 0 else 0.0
+        self.build_stats[name] = {
+            "sentences": len(texts),
+            "seconds": round(seconds, 3),
+            "sentences_per_second": round(rate, 1),
+        }
+        print(f"Encoded {len(texts)} sentences for {name} at {rate:.0f} sentences/s")
+        return matrix
+
+    def _encode(self, texts):
+        """Encode text(s) into float32 numpy vectors"""
+        return self.encoder.encode(texts)
+
+    def _attach_ann(self, index: SearchIndex, hashes: Dict[str, str]):
+        """Build (or load) the configured approximate index for a SearchIndex.
+
+        ``hashes`` are entry hashes: rows are duplicate groups, which can
+        change with the answers while the questions stay the same.
+        """
+        kind = settings.SEARCH_INDEX_TYPE
+        if kind == "exact" or len(index) == 0:
+            return
+        try:
+            ann = create_ann_index(kind, settings)
+            start = time.time()
+            fingerprint = ann_fingerprint(ann, hashes, settings.EMBEDDING_MODEL, dict(
+                index.storage_params(),
+                dedup=settings.SEARCH_DEDUP_THRESHOLD if settings.SEARCH_DEDUP else None
+            ))
+            cache_dir = self.embedding_cache.cache_dir if self.embedding_cache is not None else None
+            index.ann = load_or_build_ann(ann, index.matrix, index.ranges, cache_dir, fingerprint)
+            print(f"Prepared {kind} index in {time.time() - start:.1f}s")
+        except Exception as e:
+            # Brute force stays available as the exact fallback
+            print(f"Could not prepare {kind} index, using exact search: {e}")
+
+    def _install_index(self, index: SearchIndex):
+        """Publish a new index and drop every query cached against the old one"""
+        self.index_version += 1
+        index.version = self.index_version
+        self.index = index
+        for name, (start, end) in index.ranges.items():
+            self._set_status(name, "ready", rows=end - start)
+        self.query_embedding_cache.clear()
+        self.query_result_cache.clear()
+
+    def search(self, query: str, dataset: str = "all", limit: int = 5, mode: Optional[str] = None) -> List[SearchResult]:
+        """Perform semantic, lexical or hybrid search"""
+        return self.search_batch([query], [dataset], [limit], [mode])[0]
+
+    def resolve_mode(self, query: str, mode: Optional[str] = None) -> str:
+        """Pick the retrieval mode.
+
+        Pure section/article lookups ("Section 438", "Article 21") are
+        answered from the inverted index without the model, unless the
+        caller explicitly asked for semantic search.
+        """
+        resolved = mode or settings.SEARCH_DEFAULT_MODE
+        if resolved not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {resolved}")
+        if mode != "semantic" and is_reference_lookup(query):
+            return "lexical"
+        return resolved
+
+    def cached_search(self, query: str, dataset: str = "all", limit: int = 5,
+                      mode: Optional[str] = None) -> Optional[List[SearchResult]]:
+        """Results from the result cache, else None; cheap enough for the event loop"""
+        index = self.index
+        if index is None:
+            return None
+        key = (normalize_query(query), dataset, limit, self.resolve_mode(query, mode), index.version)
+        # A miss here is counted by search_batch when the query actually runs
+        results = self.query_result_cache.get(key, count_miss=False)
+        if results is None:
+            return None
+        if results:
+            self._record_selection(index, results[0].dataset, results[0].id)
+        return list(results)
+
+    def needs_model(self, query: str, mode: Optional[str] = None) -> bool:
+        """False for queries answered from the inverted index alone"""
+        return self.resolve_mode(query, mode) != "lexical"
+
+    def search_batch(self, queries: List[str], datasets: List[str], limits: List[int],
+                     modes: Optional[List[Optional[str]]] = None) -> List[List[SearchResult]]:
+        """Search many queries with one encode call and one similarity matmul"""
+        index = self.index
+        if index is None:
             raise RuntimeError("Search service is not initialized")
+        if not queries:
+            return []
 
-        query_embedding = self.model.encode(query, convert_to_tensor=True)
-        results = []
+        modes = [self.resolve_mode(q, m) for q, m in zip(queries, modes or [None] * len(queries))]
+        keys = [
+            (normalize_query(q), ds, limit, mode, index.version)
+            for q, ds, limit, mode in zip(queries, datasets, limits, modes)
+        ]
+        results = [self.query_result_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(results) if cached is None]
 
-        target_datasets = self.datasets.keys() if dataset == "all" else [dataset]
+        # Dense retrieval for everything that is not purely lexical; hybrid
+        # queries fetch a deeper candidate list to fuse with BM25.
+        dense = {}
+        needs_model = [i for i in missing if modes[i] != "lexical"]
+        if needs_model:
+            query_embeddings = self._embed_queries([keys[i][0] for i in needs_model])
+            hits = index.search_batch(
+                query_embeddings,
+                [datasets[i] for i in needs_model],
+                [self._candidate_depth(limits[i], modes[i]) for i in needs_model]
+            )
+            dense = dict(zip(needs_model, hits))
 
-        for ds_name in target_datasets:
-            if ds_name not in self.datasets:
+        for i in missing:
+            if modes[i] == "semantic":
+                rows, scores = dense[i]
+            else:
+                depth = self._candidate_depth(limits[i], modes[i])
+                lexical = index.lexical.search(queries[i], datasets[i], depth)
+                if modes[i] == "lexical":
+                    # Scale BM25 so the best hit scores 1.0, like cosine results
+                    rows, scores = lexical
+                    if len(scores):
+                        scores = scores / max(float(scores[0]), 1e-12)
+                else:
+                    rows, scores = reciprocal_rank_fusion(
+                        [dense[i], lexical], depth, k=settings.HYBRID_RRF_K
+                    )
+            results[i] = self._to_results(index, rows, scores, limits[i])
+            self.query_result_cache.put(keys[i], results[i])
+
+        # The best hit is taken as what the query asked for
+        for found in results:
+            if found:
+                self._record_selection(index, found[0].dataset, found[0].id)
+        return [list(r) for r in results]
+
+    def suggest(self, prefix: str, dataset: str = "all", limit: int = 8) -> List[Suggestion]:
+        """Typeahead completions for ``prefix``, most popular first; no inference"""
+        index = self.index
+        if index is None:
+            raise RuntimeError("Search service is not initialized")
+        names = list(index.suggest) if dataset == "all" else [dataset]
+        found = []
+        for name in names:
+            suggest_index = index.suggest.get(name)
+            if suggest_index is None:
                 continue
+            for slot, value in suggest_index.suggest(prefix, limit):
+                found.append((value, name, suggest_index, slot))
+        found.sort(key=lambda hit: -hit[0])
+        return [
+            Suggestion(dataset=name, **suggest_index.describe(slot))
+            for _, name, suggest_index, slot in found[:limit]
+        ]
 
-            # Calculate cosine similarity
-            cos_scores = util.cos_sim(query_embedding, self.embeddings[ds_name])[0]
-            
-            # Get top k results
-            top_results = torch.topk(cos_scores, k=min(limit, len(cos_scores)))
-            
-            for score, idx in zip(top_results.values, top_results.indices):
-                item = self.datasets[ds_name][idx]
-                results.append(SearchResult(
-                    question=item.get('question', ''),
-                    answer=item.get('answer', ''),
-                    score=float(score),
-                    dataset=ds_name
-                ))
-
-        # Sort combined results by score
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:limit]
+    def search_similar(self, dataset: str, entry: str, limit: int = 5, scope: str = "all") -> List[SearchResult]:
+        """Entries most similar to a stored one, scored with its stored vector.
+
+        Needs no model inference. The entry itself, the paraphrases grouped
+        with it and (with SEARCH_DEDUP) hits repeating its answer are left out.
+        Raises KeyError if ``entry`` is not an id in ``dataset``.
+        """
+        index = self.index
+        if index is None:
+            raise RuntimeError("Search service is not initialized")
+        position = index.position_of(dataset, entry)
+        if position is None:
+            raise KeyError(f"No entry {entry} in dataset {dataset}")
+
+        # Opening an entry's related results counts as selecting it
+        self._record_selection(index, dataset, entry)
+        source = index.datasets[dataset][position]
+        rows, scores = index.search(
+            index.embeddings[dataset][position], scope, self._candidate_depth(limit, "semantic") + 1
+        )
+        keep = [
+            i for i, row in enumerate(rows)
+            if not (index.locate(row)[0] == dataset and position in index.members(row))
+        ]
+        exclude = {" ".join(source.get('answer', '').lower().split())}
+        return self._to_results(index, rows[keep], scores[keep], limit, exclude)
+
+    @staticmethod
+    def _candidate_depth(limit: int, mode: str) -> int:
+        if mode == "semantic":
+            # Headroom for hits dropped as duplicate answers
+            return 2 * limit if settings.SEARCH_DEDUP else limit
+        return max(limit, settings.HYBRID_CANDIDATES)
+
+    def evaluate_recall(self, k: int = 10, sample_size: int = 200, dataset: str = "all") -> Dict[str, Any]:
+        """Recall@k of the live index (ANN and/or compressed) vs exact float32.
+
+        Queries are the first ``sample_size`` of the checked-in
+        SEARCH_RECALL_QUERIES list, encoded once and reused. Stored question
+        vectors would each find their own row first and inflate recall.
+        """
+        if not self.is_ready:
+            raise RuntimeError("Search service is not initialized")
+
+        index = self.index
+        baseline = SearchIndex(index.embeddings, index.groups())
+        span = baseline.row_range(dataset)
+        if span is None or span[0] == span[1]:
+            raise ValueError(f"Unknown or empty dataset: {dataset}")
+
+        queries = self._recall_query_vectors()[:sample_size]
+        count = len(queries)
+
+        start = time.perf_counter()
+        exact = baseline.search_batch(queries, [dataset] * count, [k] * count, exact=True)
+        exact_time = time.perf_counter() - start
+        start = time.perf_counter()
+        live = index.search_batch(queries, [dataset] * count, [k] * count)
+        live_time = time.perf_counter() - start
+
+        return {
+            "k": k,
+            "queries": int(count),
+            "dataset": dataset,
+            "query_set": settings.SEARCH_RECALL_QUERIES.name,
+            "recall": recall_at_k([rows for rows, _ in live], [rows for rows, _ in exact], k),
+            "index_type": settings.SEARCH_INDEX_TYPE if index.ann is not None else "exact",
+            "storage": index.storage_params(),
+            "index_bytes": int(index.nbytes),
+            "baseline_bytes": int(baseline.nbytes),
+            "index_ms_per_query": 1000.0 * live_time / max(count, 1),
+            "baseline_ms_per_query": 1000.0 * exact_time / max(count, 1),
+        }
+
+    def _recall_query_vectors(self) -> np.ndarray:
+        """Encoded SEARCH_RECALL_QUERIES, re-encoded only when the file changes"""
+        path = settings.SEARCH_RECALL_QUERIES
+        try:
+            key = (str(path), path.stat().st_mtime_ns)
+        except OSError:
+            raise ValueError(f"Recall query list not found at {path}")
+        if self._recall_queries is None or self._recall_queries[0] != key:
+            with open(path, "r", encoding="utf-8") as f:
+                texts = [text for text in json.load(f) if isinstance(text, str) and text.strip()]
+            if not texts:
+                raise ValueError(f"Recall query list {path} is empty")
+            vectors = np.asarray(self._encode(texts), dtype=np.float32).reshape(len(texts), -1)
+            self._recall_queries = (key, vectors)
+        return self._recall_queries[1]
+
+    def _embed_queries(self, normalized_queries: List[str]) -> np.ndarray:
+        """Embeddings for normalized queries, encoding only cache misses once each"""
+        vectors: Dict[str, np.ndarray] = {}
+        to_encode = []
+        for query in dict.fromkeys(normalized_queries):
+            cached = self.query_embedding_cache.get(query)
+            if cached is not None:
+                vectors[query] = cached
+            else:
+                to_encode.append(query)
+
+        if to_encode:
+            for query, vector in zip(to_encode, self._encode(to_encode)):
+                # Copy so a cached row does not pin the whole batch matrix
+                vector = vector.copy()
+                vectors[query] = vector
+                self.query_embedding_cache.put(query, vector)
+
+        return np.stack([vectors[q] for q in normalized_queries])
+
+    def _to_results(self, index: SearchIndex, rows, scores, limit: int,
+                    exclude: Optional[set] = None) -> List[SearchResult]:
+        """Materialize the best ``limit`` hits into SearchResult models.
+
+        With SEARCH_DEDUP, hits repeating an earlier hit's answer (or one of
+        the normalized answers in ``exclude``) are skipped.
+        """
+        results = []
+        seen = set(exclude or ())
+        for row, score in zip(rows, scores):
+            if len(results) >= limit:
+                break
+            ds_name, idx = index.locate(row)
+            item = index.datasets[ds_name][idx]
+            if settings.SEARCH_DEDUP:
+                answer_key = " ".join(item.get('answer', '').lower().split())
+                if answer_key in seen:
+                    continue
+                seen.add(answer_key)
+            results.append(SearchResult(
+                id=entry_id(item),
+                question=item.get('question', ''),
+                answer=item.get('answer', ''),
+                score=float(score),
+                dataset=ds_name
+            ))
+        return results
 
 # Global instance
 search_service = SearchService()
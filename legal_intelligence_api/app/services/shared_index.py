@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from app.services.lexical_index import LexicalIndex
+from app.services.search_index import SearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, each worker builds its own
+    fcntl = None
+
+SNAPSHOT_FORMAT_VERSION = 1
+# Older snapshots are pruned; workers that still map them keep their pages
+SNAPSHOTS_KEPT = 2
+
+
+def snapshot_key(dataset_hashes: Dict[str, str], model_name: str, storage: Dict[str, object]) -> str:
+    """Identity of a built index: dataset contents, model and storage format.
+
+    ``dataset_hashes`` must cover answers as well as questions (see
+    dataset_store.entries_hash), since the postings and groups do.
+    """
+    payload = json.dumps({
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "model": model_name,
+        "storage": storage,
+        "datasets": list(dataset_hashes.items()),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def build_lock(snapshot_dir: Path):
+    """Exclusive lock across worker processes while a snapshot is built"""
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    with open(snapshot_dir / ".lock", "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _prune(snapshot_dir: Path, keep: Path):
+    snapshots = sorted(
+        (p for p in snapshot_dir.iterdir() if p.is_dir() and (p / "DONE").exists() and p != keep),
+        key=lambda p: (p / "DONE").stat().st_mtime,
+        reverse=True
+    )
+    for old in snapshots[SNAPSHOTS_KEPT - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def load_or_build_snapshot(snapshot_dir: Path, key: str, build: Callable[[], SearchIndex]) -> Tuple[SearchIndex, bool]:
+    """Open the shared index for ``key``, building it first if no worker has.
+
+    Call with ``build_lock`` held. The first process builds the index and
+    saves it; every process, the builder included, then memory-maps the
+    saved files, so the matrices and postings live once in the page cache
+    instead of once per worker. Returns (index, whether this call built it).
+    """
+    path = snapshot_dir / key
+    built = False
+    if not (path / "DONE").exists():
+        index = build()
+        tmp = snapshot_dir / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        index.save(tmp)
+        index.lexical.save(tmp)
+        # Marker written last so a half-written snapshot is never opened
+        (tmp / "DONE").write_text(str(os.getpid()))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        _prune(snapshot_dir, path)
+        built = True
+
+    index = SearchIndex.load(path)
+    index.lexical = LexicalIndex.load(path)
+    return index, built
@@ -0,0 +1,260 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from app.services.lexical_index import REFERENCE_RE, STOPWORDS, TOKEN_RE
+from app.services.search_index import entry_id
+
+# Keys are stored as fixed-width bytes; longer prefixes are verified on the text
+KEY_BYTES = 48
+# A question is also reachable from this many of its later content words
+MAX_SUFFIX_KEYS = 8
+# Ranges wider than 1/WIDE_RANGE of all keys are served from the global ranking
+WIDE_RANGE = 16
+_CHUNK = 1024
+
+
+def normalize_prefix(text: str) -> str:
+    """Lowercase word tokens joined by single spaces, with "sec."/"art" spelled out"""
+    text = REFERENCE_RE.sub(
+        lambda m: f" {'article' if m.group(1).startswith('art') else 'section'} {m.group(2)} ",
+        text.lower()
+    )
+    return " ".join(TOKEN_RE.findall(text))
+
+
+def _key(text: str) -> bytes:
+    return text.encode("utf-8")[:KEY_BYTES]
+
+
+class SuggestIndex:
+    """Sorted prefix array for typeahead over one dataset.
+
+    Suggestions are the dataset's distinct questions plus every section
+    and article they or their answers cite ("Section 438", "Article 21").
+    A question is keyed by its normalized text and by the suffixes starting
+    at its first few content words, so "anticipatory b" finds "What is
+    anticipatory bail?"; a citation is keyed by its name and its number.
+
+    Popularity is how often a suggestion occurs in the data (the number of
+    entries asking the same question, or citing the same section) plus how
+    often searches and selections hit its entries (see ``record``). Matching
+    keys form one contiguous range of the sorted array. A narrow range is
+    ranked directly; a wide one (short prefixes like "w") is answered by
+    walking all keys in ranking order and keeping those inside the range,
+    which finds ``limit`` hits within the first few hundred keys. Recorded
+    suggestions are few, so they are ranked separately and merged in.
+    """
+
+    ARRAYS = ("weights", "keys", "owners", "values", "ranking", "entry_slots")
+    LISTS = ("texts", "kinds", "ids", "normalized")
+
+    def __init__(self, data: Iterable[Dict[str, Any]]):
+        texts: List[str] = []
+        kinds: List[str] = []
+        ids: List[Optional[str]] = []
+        weights: List[float] = []
+        normalized: List[str] = []
+        slots: Dict[Tuple[str, str], int] = {}
+
+        def add(kind: str, text: str, norm: str, item_id: Optional[str]) -> Tuple[int, bool]:
+            slot = slots.get((kind, norm))
+            if slot is not None:
+                weights[slot] += 1
+                return slot, False
+            slot = slots[(kind, norm)] = len(texts)
+            texts.append(text)
+            kinds.append(kind)
+            ids.append(item_id)
+            weights.append(1.0)
+            normalized.append(norm)
+            return slot, True
+
+        keys: List[bytes] = []
+        owners: List[int] = []
+        starts: List[bool] = []
+        # Entry position -> its question's suggestion (-1: no question)
+        entry_slots: List[int] = []
+
+        def add_key(text: str, slot: int, start: bool):
+            keys.append(_key(text))
+            owners.append(slot)
+            starts.append(start)
+
+        for item in data:
+            question = " ".join(str(item.get("question", "")).split())
+            norm = normalize_prefix(question)
+            entry_slots.append(-1)
+            if norm:
+                slot, new = add("question", question, norm, entry_id(item))
+                entry_slots[-1] = slot
+                if new:
+                    add_key(norm, slot, True)
+                    words = norm.split(" ")
+                    offset, suffixes = len(words[0]) + 1, 0
+                    for word in words[1:]:
+                        if suffixes >= MAX_SUFFIX_KEYS:
+                            break
+                        if word not in STOPWORDS and word not in ("section", "article"):
+                            add_key(norm[offset:], slot, False)
+                            suffixes += 1
+                        offset += len(word) + 1
+
+            cited = f"{item.get('question', '')} {item.get('answer', '')}".lower()
+            for kind, number in sorted(set(REFERENCE_RE.findall(cited))):
+                kind = "article" if kind.startswith("art") else "section"
+                name = f"{kind} {number}"
+                slot, new = add(kind, f"{kind.capitalize()} {number.upper()}", name, None)
+                if new:
+                    add_key(name, slot, True)
+                    add_key(number, slot, False)
+
+        self.texts = texts
+        self.kinds = kinds
+        self.ids = ids
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.normalized = normalized
+
+        keys = np.asarray(keys, dtype=f"S{KEY_BYTES}")
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.owners = np.asarray(owners, dtype=np.int32)[order]
+        # Popularity, then whole-text over mid-text matches, then shorter text
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.float64, count=len(texts))
+        self.values = (
+            self.weights[self.owners]
+            + 0.5 * np.asarray(starts, dtype=np.float64)[order]
+            - np.minimum(lengths[self.owners], 400.0) / 1000.0
+        )
+        self.ranking = np.argsort(-self.values, kind="stable")
+        self.entry_slots = np.asarray(entry_slots, dtype=np.int32)
+        self._reset_counts()
+
+    def _reset_counts(self):
+        # Searches and selections per suggestion, since this process built or loaded it
+        self.hits = np.zeros(len(self.texts), dtype=np.float64)
+        self._recorded_keys: Optional[np.ndarray] = None
+
+    def save(self, path: Path):
+        for name in self.ARRAYS:
+            np.save(path / f"suggest_{name}.npy", getattr(self, name))
+        with open(path / "suggest.json", "w", encoding="utf-8") as f:
+            json.dump({name: getattr(self, name) for name in self.LISTS}, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "SuggestIndex":
+        index = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(index, name, np.load(path / f"suggest_{name}.npy"))
+        with open(path / "suggest.json", "r", encoding="utf-8") as f:
+            for name, value in json.load(f).items():
+                setattr(index, name, value)
+        index._reset_counts()
+        return index
+
+    def record(self, position: int):
+        """Count a search or selection that hit the entry at ``position``"""
+        if not 0 <= position < len(self.entry_slots):
+            return
+        slot = int(self.entry_slots[position])
+        if slot < 0:
+            return
+        self.hits[slot] += 1
+        if self.hits[slot] == 1:
+            self._recorded_keys = None
+
+    def inherit(self, previous: "SuggestIndex"):
+        """Carry the counts of the index this one replaces over to the same texts"""
+        recorded = np.flatnonzero(previous.hits)
+        if not len(recorded):
+            return
+        slots = {(kind, norm): slot for slot, (kind, norm) in enumerate(zip(self.kinds, self.normalized))}
+        for old in recorded.tolist():
+            slot = slots.get((previous.kinds[old], previous.normalized[old]))
+            if slot is not None:
+                self.hits[slot] += previous.hits[old]
+        self._recorded_keys = None
+
+    def _recorded(self) -> np.ndarray:
+        """Key positions (ascending) of suggestions with recorded hits"""
+        keys = self._recorded_keys
+        if keys is None:
+            keys = self._recorded_keys = np.flatnonzero(self.hits[self.owners] > 0)
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Tuple[int, float]]:
+        """(suggestion, ranking value) pairs whose text starts with ``prefix``, best first"""
+        norm = normalize_prefix(prefix)
+        if not norm or limit <= 0 or not len(self.keys):
+            return []
+        # A trailing space means the last word is complete: "section 305 "
+        # matches "Section 305" and "section 305 ipc", not "section 3050"
+        complete = prefix[-1:].isspace()
+        key = _key(norm)
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        upper = _key(f"{norm} ") if complete else key
+        hi = int(np.searchsorted(self.keys, upper + b"\xff", side="left"))
+        if lo >= hi:
+            return []
+
+        # Keys are truncated, so long prefixes are checked on the text
+        needle = f" {norm} " if complete else f" {norm}"
+
+        def matches(owner: int) -> bool:
+            return len(key) < KEY_BYTES or needle in f" {self.normalized[owner]} "
+
+        found: Dict[int, float] = {}
+        recorded = self._recorded()
+        a, z = np.searchsorted(recorded, [lo, hi])
+        candidates = recorded[a:z]
+        recorded_owners = set(self.owners[candidates].tolist())
+        if len(candidates):
+            values = self.values[candidates] + self.hits[self.owners[candidates]]
+            for i in np.argsort(-values, kind="stable").tolist():
+                owner = int(self.owners[candidates[i]])
+                if owner not in found and matches(owner):
+                    found[owner] = float(values[i])
+                    if len(found) >= limit:
+                        break
+
+        unrecorded = 0
+        for pos in self._ranked(lo, hi, limit):
+            owner = int(self.owners[pos])
+            if owner in found or owner in recorded_owners:
+                continue
+            if matches(owner):
+                found[owner] = float(self.values[pos])
+                unrecorded += 1
+                if unrecorded >= limit:
+                    break
+        return sorted(found.items(), key=lambda hit: -hit[1])[:limit]
+
+    def _ranked(self, lo: int, hi: int, limit: int) -> Iterator[int]:
+        """Key positions in ``[lo, hi)``, best first"""
+        if (hi - lo) * WIDE_RANGE >= len(self.keys):
+            for start in range(0, len(self.ranking), _CHUNK):
+                chunk = self.ranking[start:start + _CHUNK]
+                yield from chunk[(chunk >= lo) & (chunk < hi)].tolist()
+            return
+        values = -self.values[lo:hi]
+        # Most prefixes are settled by the first few keys; sort the rest only if needed
+        head = min(len(values), 4 * limit)
+        if head < len(values):
+            top = np.argpartition(values, head - 1)[:head]
+            top = top[np.lexsort((top, values[top]))]
+            yield from (lo + top).tolist()
+            # Repeats are skipped by the caller
+            yield from (lo + np.argsort(values, kind="stable")).tolist()
+        else:
+            yield from (lo + np.argsort(values, kind="stable")).tolist()
+
+    def describe(self, slot: int) -> Dict[str, Any]:
+        return {
+            "text": self.texts[slot],
+            "kind": self.kinds[slot],
+            "id": self.ids[slot],
+            "popularity": int(self.weights[slot] + self.hits[slot]),
+        }
@@ -0,0 +1,157 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.query_cache import LRUCache
+from app.services.template_parser import parse_template, read_template
+
+# Bump whenever parse_template's output changes, so persisted copies are redone
+CLEAN_FORMAT_VERSION = 3
+
+Signature = Tuple[str, int, int]
+Record = Dict[str, Any]
+
+
+def _read_persisted(target: Path) -> Optional[Record]:
+    try:
+        with open(target, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _persist(target: Path, record: Record, filename: str):
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Older copies of the same template (previous mtime/size)
+        for stale in target.parent.glob(f"{filename}.*.json"):
+            stale.unlink(missing_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, target)
+    except OSError as e:
+        print(f"Warning: could not persist cleaned template {target.name}: {e}")
+
+
+def load_cleaned(path: Path, persisted: Optional[Path]) -> Tuple[Record, Optional[float]]:
+    """Parsed record (cleaned text plus metadata, see parse_template) of the
+    template at ``path`` and its parse time, None when it came from the
+    persisted copy. Top-level so worker processes can run it.
+    """
+    if persisted is not None:
+        record = _read_persisted(persisted)
+        if record is not None:
+            return record, None
+    start = time.perf_counter()
+    record = parse_template(read_template(path))
+    seconds = time.perf_counter() - start
+    if persisted is not None:
+        _persist(persisted, record, path.name)
+    return record, seconds
+
+
+class TemplateCache:
+    """Parsed templates keyed by (filename, mtime, size).
+
+    A fetch checks the in-memory LRU, then the copy persisted under
+    ``cache_dir``, and only then parses the HTML. A template edited on disk
+    gets a new signature and is re-parsed on its next fetch; an unchanged
+    one is parsed once, across restarts too.
+    """
+
+    def __init__(self, template_dir: Path, max_bytes: int, cache_dir: Optional[Path] = None):
+        self.template_dir = Path(template_dir)
+        self.cache_dir = Path(cache_dir) / f"v{CLEAN_FORMAT_VERSION}" if cache_dir else None
+        # No TTL: entries are only replaced when the file's signature changes
+        # The render program holds about as much text again as the content
+        self.memory = LRUCache(max_bytes, 0, sizeof=lambda record: 2 * len(record["content"]) + 256)
+        self.parses = 0
+        self.disk_hits = 0
+        self.parse_seconds = 0.0
+
+    def path_for(self, filename: str) -> Path:
+        """Template path, refusing anything outside ``template_dir``"""
+        if not filename or Path(filename).name != filename or filename.startswith("."):
+            raise FileNotFoundError(filename)
+        return self.template_dir / filename
+
+    def signature(self, filename: str) -> Signature:
+        stat = self.path_for(filename).stat()
+        return filename, stat.st_mtime_ns, stat.st_size
+
+    def _persisted_path(self, key: Signature) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        filename, mtime_ns, size = key
+        return self.cache_dir / f"{filename}.{mtime_ns}.{size}.json"
+
+    def cached(self, key: Signature) -> Optional[Record]:
+        return self.memory.get(key)
+
+    def _store(self, key: Signature, loaded: Tuple[Record, Optional[float]]) -> Record:
+        record, parse_seconds = loaded
+        if parse_seconds is None:
+            self.disk_hits += 1
+        else:
+            self.parses += 1
+            self.parse_seconds += parse_seconds
+        self.memory.put(key, record)
+        return record
+
+    def record(self, filename: str) -> Record:
+        """Parsed template; raises FileNotFoundError if there is none"""
+        key = self.signature(filename)
+        record = self.cached(key)
+        if record is not None:
+            return record
+        return self._store(key, load_cleaned(self.path_for(filename), self._persisted_path(key)))
+
+    def get(self, filename: str) -> str:
+        """Cleaned text of a template; raises FileNotFoundError if there is none"""
+        return self.record(filename)["content"]
+
+    async def fetch_record(self, filename: str, executor) -> Record:
+        """``record`` with the file read and HTML cleaning run on ``executor``"""
+        key = self.signature(filename)
+        record = self.cached(key)
+        if record is None:
+            loaded = await executor.run(load_cleaned, self.path_for(filename), self._persisted_path(key))
+            record = self._store(key, loaded)
+        return record
+
+    async def fetch(self, filename: str, executor) -> str:
+        """``get`` with the file read and HTML cleaning run on ``executor``"""
+        return (await self.fetch_record(filename, executor))["content"]
+
+    def load_many(self, keys: List[Signature], executor=None) -> List[Record]:
+        """Records for many templates, loading misses in parallel on ``executor``"""
+        records: List[Optional[Record]] = [self.cached(key) for key in keys]
+        missing = [i for i, record in enumerate(records) if record is None]
+        paths = [self.path_for(keys[i][0]) for i in missing]
+        persisted = [self._persisted_path(keys[i]) for i in missing]
+        if executor is not None and len(missing) > 1:
+            loaded = executor.map(load_cleaned, paths, persisted)
+        else:
+            loaded = [load_cleaned(path, target) for path, target in zip(paths, persisted)]
+        for i, result in zip(missing, loaded):
+            records[i] = self._store(keys[i], result)
+        return records
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "parses": self.parses,
+            "parse_seconds": self.parse_seconds,
+        }
+
+
+# Global instance
+template_cache = TemplateCache(
+    settings.TEMPLATE_DIR,
+    settings.TEMPLATE_CACHE_MB * 1024 * 1024,
+    settings.TEMPLATE_CACHE_DIR if settings.TEMPLATE_CACHE_PERSIST else None
+)
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.template_cache import Signature, TemplateCache, template_cache
+from app.services.template_search import TemplateSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# First match wins; keywords are whole words of the template's title and id
+CATEGORY_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("Affidavits", ("affidavit",)),
+    ("Bills of Sale & Receipts", ("bill of sale", "receipt", "invoice")),
+    ("Landlord & Tenant", ("rent", "quit", "vacate", "lease", "sublease", "landlord", "tenant", "right to possession")),
+    ("Promissory Notes & Debt", ("promissory", "loan", "debt", "guarantee", "late payment", "returned check",
+                                 "security agreement")),
+    ("Non-Disclosure", ("non disclosure",)),
+    ("Employment", ("employee", "employment", "job", "applicant", "resignation", "time off", "drug test",
+                    "adverse action", "harassment", "vacation policy", "email use policy", "whistleblower")),
+    ("Intellectual Property", ("copyright", "patent", "trademark", "intellectual property", "work made for hire",
+                               "reprint", "reproduce", "domain name")),
+    ("Releases & Waivers", ("release", "waiver", "rescission")),
+    ("Business Agreements", ("agreement", "contract", "letter of intent", "partnership", "sponsorship")),
+    ("Letters & Notices", ("letter", "notice", "cease and desist")),
+]
+DEFAULT_CATEGORY = "General"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def infer_category(title: str, template_id: str) -> str:
+    text = " " + " ".join(_WORD_RE.findall(f"{title} {template_id}".lower())) + " "
+    for category, keywords in CATEGORY_RULES:
+        if any(f" {keyword} " in text for keyword in keywords):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def _title(record: Dict[str, Any], template_id: str) -> str:
+    """The title the page gives the form, else one derived from the filename"""
+    title = record.get("title")
+    if not title:
+        return template_id.replace("-", " ").title()
+    if title.endswith(" Template") and not template_id.endswith("-template"):
+        title = title[:-len(" Template")]
+    return title
+
+
+class TemplateCatalog:
+    """Metadata of every template, served from memory.
+
+    Built once from the parsed templates (see TemplateCache) and rebuilt
+    when a template is added, removed or edited. Adding or removing a file
+    changes the directory's mtime, which ``is_stale`` checks with a single
+    stat. Edits in place leave it alone, so ``check_in_background`` compares
+    each file's (name, mtime, size) signature on a thread, at most every
+    ``check_interval`` seconds, and rebuilds if one changed. Unchanged
+    files reuse their previous entry. Entries are sorted by title with a
+    list per category, so a page is a slice. Each build also indexes the
+    cleaned text for ``/templates/search``.
+    """
+
+    def __init__(self, cache: TemplateCache, check_interval: float = 1.0):
+        self.cache = cache
+        self.check_interval = check_interval
+        self.entries: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self.search_index = TemplateSearchIndex([], [])
+        self.built_at: Optional[float] = None
+        self._dir_mtime: Optional[int] = None
+        self._signatures: Dict[str, Signature] = {}
+        self._checked_at = 0.0
+        self._checking = False
+        self._build_lock = threading.Lock()
+
+    def _directory_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.cache.template_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _files_changed(self) -> bool:
+        for key in self._signatures.values():
+            try:
+                if self.cache.signature(key[0]) != key:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def is_stale(self) -> bool:
+        """True before the first build and after a file was added or removed"""
+        return self.built_at is None or self._directory_mtime() != self._dir_mtime
+
+    def check_in_background(self, executor=None) -> Optional[threading.Thread]:
+        """Look for templates edited in place without blocking the caller.
+
+        Stats every known template on a thread and rebuilds if one changed;
+        at most one check runs at a time, at most every ``check_interval``
+        seconds. Returns the thread, or None when no check was due.
+        """
+        now = time.monotonic()
+        if self._checking or now - self._checked_at < self.check_interval:
+            return None
+        self._checked_at = now
+        self._checking = True
+
+        def check():
+            try:
+                if self._files_changed():
+                    self.build(executor)
+            except Exception as e:
+                logger.error("Template catalog refresh failed: %s", e)
+            finally:
+                self._checking = False
+
+        thread = threading.Thread(target=check, name="template-catalog-check")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _scan(self) -> Tuple[Optional[int], List[Signature]]:
+        """Directory mtime and the signature of every template in it"""
+        dir_mtime = self._directory_mtime()
+        keys: List[Signature] = []
+        if dir_mtime is None:
+            logger.warning("Template directory not found at %s", self.cache.template_dir)
+            return dir_mtime, keys
+        for filename in sorted(os.listdir(self.cache.template_dir)):
+            if filename.endswith(".html"):
+                try:
+                    keys.append(self.cache.signature(filename))
+                except OSError as e:
+                    logger.error("Error reading template %s: %s", filename, e)
+        return dir_mtime, keys
+
+    def build(self, executor=None) -> int:
+        """(Re)build from the template directory; returns the number of templates"""
+        with self._build_lock:
+            start = time.time()
+            dir_mtime, keys = self._scan()
+            if self.built_at is not None and dir_mtime == self._dir_mtime and \
+                    keys == list(self._signatures.values()):
+                # Another caller rebuilt while we waited for the lock
+                self._checked_at = time.monotonic()
+                return len(self.entries)
+
+            # Unchanged templates come from the cache (memory or persisted
+            # copy) for the search index; only changed ones are parsed
+            records = self.cache.load_many(keys, executor)
+            changed = 0
+            documents = []
+            for key, record in zip(keys, records):
+                if self._signatures.get(key[0]) == key:
+                    entry = self.by_id[key[0][:-len(".html")]]
+                else:
+                    entry = self._entry(key[0], record)
+                    changed += 1
+                documents.append((entry, record["content"]))
+            documents.sort(key=lambda doc: (doc[0]["name"].lower(), doc[0]["id"]))
+            entries = [entry for entry, _ in documents]
+            search_index = TemplateSearchIndex(entries, [content for _, content in documents])
+
+            by_category: Dict[str, List[Dict[str, Any]]] = {}
+            for entry in entries:
+                by_category.setdefault(entry["category"], []).append(entry)
+
+            # Publish by swapping references, so readers never see a half-built catalog
+            self.by_id = {entry["id"]: entry for entry in entries}
+            self.by_category = by_category
+            self.entries = entries
+            self.search_index = search_index
+            self._signatures = {key[0]: key for key in keys}
+            self._dir_mtime = dir_mtime
+            self._checked_at = time.monotonic()
+            self.built_at = time.time()
+            logger.info("Template catalog: %d templates (%d refreshed) in %.1fs",
+                        len(entries), changed, time.time() - start)
+            return len(entries)
+
+    def build_in_background(self, executor=None):
+        thread = threading.Thread(target=self.build, args=(executor,))
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def _entry(filename: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        template_id = filename[:-len(".html")]
+        title = _title(record, template_id)
+        content = record["content"]
+        return {
+            "id": template_id,
+            "name": title,
+            "category": infer_category(title, template_id),
+            "filename": filename,
+            "path": filename,  # directly under TEMPLATE_DIR
+            "field_count": record.get("field_count", 0),
+            "size": len(content),
+            "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
+        }
+
+    def page(self, category: Optional[str] = None, offset: int = 0,
+             limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """(entries of one page, total matching) for an optional category"""
+        entries = self.entries
+        if category:
+            entries = self.by_category.get(category, [])
+        end = len(entries) if limit is None else offset + limit
+        return entries[offset:end], len(entries)
+
+    def categories(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": name, "count": len(entries)}
+            for name, entries in sorted(self.by_category.items())
+        ]
+
+
+# Global instance
+template_catalog = TemplateCatalog(template_cache, settings.TEMPLATE_CATALOG_CHECK_SECONDS)
@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional
+from app.core.config import settings
+
+
+class TemplatesOverloaded(RuntimeError):
+    """Raised when more template jobs are queued than the executor allows"""
+
+
+class TemplateExecutor:
+    """Bounded process pool for template file I/O and HTML cleaning.
+
+    BeautifulSoup is pure Python and holds the GIL, so a thread pool would
+    not let parses run in parallel or keep the event loop responsive;
+    worker processes do both. At most ``max_pending`` jobs may be queued or
+    running (beyond that callers get ``TemplatesOverloaded``), and a job
+    taking longer than ``timeout`` seconds raises ``asyncio.TimeoutError``
+    to its caller while the worker finishes it in the background (its slot
+    stays taken until then). A pool broken by a dying worker is replaced.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64, timeout: float = 10.0):
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max(max_pending, self.max_workers)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # spawn: forking a process that already holds torch state is unsafe
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a pool whose worker died (e.g. OOM-killed)"""
+        if self._executor is broken:
+            print("Template worker pool broke; starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, executor: ProcessPoolExecutor, future: asyncio.Future):
+        self._pending -= 1
+        # Also sees jobs nobody awaits any more (timed out); retrieving the
+        # error keeps asyncio from logging it as never retrieved
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._restart(executor)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` in a worker process and await its result"""
+        if self._pending >= self.max_pending:
+            raise TemplatesOverloaded("Too many template requests in flight, try again shortly")
+
+        loop = asyncio.get_running_loop()
+        executor = self.start()
+        try:
+            future = loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            executor = self.start()
+            future = loop.run_in_executor(executor, fn, *args)
+
+        # The slot is held until the worker is done with the job, not until
+        # the caller gives up, so timed-out jobs still count against
+        # max_pending. Counted on the event loop thread only, so no lock.
+        self._pending += 1
+        future.add_done_callback(functools.partial(self._release, executor))
+        # shield: a timeout must not cancel the job's future and free its slot early
+        return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+
+    def map(self, fn: Callable[..., Any], *iterables: Iterable) -> List[Any]:
+        """Blocking ``map`` over the pool, for catalog builds and other batch jobs"""
+        args = [list(iterable) for iterable in iterables]
+        executor = self.start()
+        try:
+            return list(executor.map(fn, *args))
+        except BrokenProcessPool:
+            # Retry once on a fresh pool; a second failure is the job's fault
+            self._restart(executor)
+            executor = self.start()
+            try:
+                return list(executor.map(fn, *args))
+            except BrokenProcessPool:
+                self._restart(executor)
+                raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+template_executor = TemplateExecutor(
+    max_workers=settings.TEMPLATE_WORKERS,
+    max_pending=settings.TEMPLATE_MAX_PENDING,
+    timeout=settings.TEMPLATE_TIMEOUT_SECONDS
+)
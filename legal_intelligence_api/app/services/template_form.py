@@ -0,0 +1,249 @@
+import re
+from typing import Any, Dict, List, Optional
+from bs4 import Comment, NavigableString, Tag
+
+# Compiled form: a flat list of ops rendered by one loop, no HTML involved.
+#   [TEXT, text]                      literal text ("\n" ends a block)
+#   [FIELD, fid, placeholder]         the value of a field
+#   [SECTION, any_of, end]            jump to ``end`` unless a condition holds
+# ``any_of`` lists alternatives, each a list of [fid, value] that must all
+# hold; lists rather than tuples so compiled forms persist as JSON.
+TEXT, FIELD, SECTION = 0, 1, 2
+
+BLOCK_TAGS = frozenset("""
+address article blockquote dd div dl dt footer h1 h2 h3 h4 h5 h6 header hr li
+main ol p section table tbody td th thead tr ul
+""".split())
+SKIPPED_TAGS = frozenset(["script", "style", "noscript", "template", "button"])
+# Navigation text left over from the scraped pages (see clean_html_content)
+GARBAGE_LINES = frozenset(["skip to main content", "preview document"])
+
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+# Answers that only pick which sections appear; the page never prints them
+CHOICE_TYPES = frozenset(["radio", "checkbox"])
+
+Condition = List[List[str]]
+
+
+def _label(tag: Tag) -> str:
+    """Placeholder label, as clean_html_content writes it"""
+    label = tag.get('label') or tag.get('title') or tag.get('fid') or "Field"
+    if label == "N/A":
+        label = tag.get('fid') or "Input"
+    return label
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    if not value or value == "N/A":
+        return None
+    return " ".join(value.split())
+
+
+def parse_section_condition(secid: str, secval: str) -> List[Condition]:
+    """Alternatives of a <section-dep>: "," separates alternatives, "+"
+    joins conditions that must all hold (secid="a+b" secval="yes+no")."""
+    ids = secid.split(",")
+    values = secval.split(",")
+    if len(ids) != len(values) and len(values) == 1 and len(values[0].split("+")) == len(ids):
+        # secid="a,b" secval="no+yes": both must hold
+        ids, values = ["+".join(ids)], values
+    alternatives = []
+    for i, value in enumerate(values):
+        # A few pages list one id for several values (secid="n,n" secval="2,3,4")
+        fids = ids[min(i, len(ids) - 1)].split("+")
+        pairs = [
+            [fid.strip(), part.strip().lower()]
+            for fid, part in zip(fids, value.split("+"))
+            if fid.strip()
+        ]
+        if pairs and pairs not in alternatives:
+            alternatives.append(pairs)
+    return alternatives
+
+
+def parse_field_dep(dep: Optional[str]) -> Condition:
+    """The wizard's ``dep="fid=value"`` (";" joins several) on a field"""
+    if not dep:
+        return []
+    pairs = []
+    for part in dep.split(";"):
+        fid, _, value = part.partition("=")
+        if fid.strip():
+            pairs.append([fid.strip(), value.strip().lower()])
+    return pairs
+
+
+def _and(left: List[Condition], right: List[Condition]) -> List[Condition]:
+    """Conjunction of two alternative lists (an empty list always holds)"""
+    if not left:
+        return right
+    if not right:
+        return left
+    return [a + [pair for pair in b if pair not in a] for a in left for b in right]
+
+
+class _Compiler:
+    def __init__(self):
+        self.ops: List[list] = []
+        self.fields: Dict[str, Dict[str, Any]] = {}
+        self._question: Optional[str] = None
+        self._help: Optional[str] = None
+        # Ops before this index belong to a closed section; text must not merge into them
+        self._sealed = 0
+
+    def text(self, text: str):
+        if len(self.ops) > self._sealed and self.ops[-1][0] == TEXT:
+            self.ops[-1][1] += text
+        else:
+            self.ops.append([TEXT, text])
+
+    def block(self):
+        if len(self.ops) > self._sealed and self.ops[-1][0] == TEXT and self.ops[-1][1].endswith("\n"):
+            return
+        self.text("\n")
+
+    def children(self, tag: Tag, conditions: List[Condition]):
+        for child in tag.children:
+            self.node(child, conditions)
+
+    def node(self, node, conditions: List[Condition]):
+        if isinstance(node, Comment):
+            return
+        if isinstance(node, NavigableString):
+            text = _SPACES_RE.sub(" ", str(node).replace("\n", " "))
+            if text:
+                self.text(text)
+            return
+        if not isinstance(node, Tag) or node.name in SKIPPED_TAGS:
+            return
+        if node.name == "field-source":
+            self.field(node, conditions)
+        elif node.name == "section-dep":
+            any_of = parse_section_condition(node.get("secid", ""), node.get("secval", ""))
+            if not any_of:
+                self.children(node, conditions)
+                return
+            start = len(self.ops)
+            self.ops.append([SECTION, any_of, None])
+            self.children(node, _and(conditions, any_of))
+            self.ops[start][2] = self._sealed = len(self.ops)
+        elif node.name == "br":
+            self.text("\n")
+        elif node.name in BLOCK_TAGS:
+            self.block()
+            self.children(node, conditions)
+            self.block()
+        else:
+            self.children(node, conditions)
+
+    def field(self, tag: Tag, conditions: List[Condition]):
+        kind = tag.get("type")
+        if kind == "break":
+            # Wizard step: its title is the question for the next field
+            self._question = _text(tag.get("title"))
+            self._help = _text(tag.get("label"))
+            return
+        fid = tag.get("fid")
+        if not fid:
+            return
+        if kind not in CHOICE_TYPES:
+            self.ops.append([FIELD, fid, f"**[{_label(tag)}]**"])
+
+        field = self.fields.get(fid)
+        if field is None:
+            field = self.fields[fid] = {
+                "fid": fid,
+                "label": (_text(tag.get("label")) or _text(tag.get("q")) or self._question
+                          or fid.replace("_", " ").capitalize()),
+                "type": kind or "text",
+                "question": _text(tag.get("q")) or self._question,
+                "help": self._help,
+                "options": [o.strip() for o in tag.get("options", "").split(",") if o.strip()],
+                "depends_on": conditions,
+                "asked_if": parse_field_dep(tag.get("dep")),
+            }
+        else:
+            # Shown wherever any occurrence is; "prefill" repeats an earlier answer
+            if kind != "prefill" and field["type"] == "prefill":
+                field["type"] = kind or "text"
+            if field["depends_on"]:
+                field["depends_on"] = [] if not conditions else field["depends_on"] + [
+                    c for c in conditions if c not in field["depends_on"]
+                ]
+        self._question = self._help = None
+
+
+def compile_form(content_div: Tag) -> Dict[str, Any]:
+    """Field schema and render program of a template's content element.
+
+    Must run before clean_html_content's tag replacement, on the same
+    element, so the schema and the cleaned text come from one parse.
+    """
+    compiler = _Compiler()
+    compiler.children(content_div, [])
+    return {"fields": list(compiler.fields.values()), "program": compiler.ops}
+
+
+def _choices(value: Any) -> List[str]:
+    if value is None or value is False:
+        return []
+    if value is True:
+        return ["yes", "true"]
+    if isinstance(value, (list, tuple, set)):
+        return [str(v).strip().lower() for v in value]
+    return [str(value).strip().lower()]
+
+
+def _holds(any_of: List[Condition], choices: Dict[str, List[str]]) -> bool:
+    return any(
+        all(value in choices.get(fid, ()) for fid, value in pairs)
+        for pairs in any_of
+    )
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(v) for v in value)
+    if value is True:
+        return "Yes"
+    if value is False:
+        return "No"
+    return str(value)
+
+
+def render_form(program: List[list], values: Dict[str, Any]) -> str:
+    """Text of a compiled form filled with ``values`` (fid -> value).
+
+    Sections whose condition does not hold are left out; a field with no
+    value keeps its ``**[Label]**`` placeholder.
+    """
+    choices = {fid: _choices(value) for fid, value in values.items()}
+    formatted: Dict[str, str] = {}
+    out: List[str] = []
+    i, n = 0, len(program)
+    while i < n:
+        op = program[i]
+        kind = op[0]
+        if kind == TEXT:
+            out.append(op[1])
+        elif kind == FIELD:
+            fid = op[1]
+            if fid not in formatted:
+                value = values.get(fid)
+                if value is None or value == "":
+                    out.append(op[2])
+                    i += 1
+                    continue
+                formatted[fid] = _format(value)
+            out.append(formatted[fid])
+        elif not _holds(op[1], choices):
+            i = op[2]
+            continue
+        i += 1
+
+    lines = []
+    for line in "".join(out).split("\n"):
+        line = " ".join(line.split())
+        if line and line.lower() not in GARBAGE_LINES:
+            lines.append(line)
+    return "\n".join(lines)
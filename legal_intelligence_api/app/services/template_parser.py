@@ -0,0 +1,111 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+from bs4 import BeautifulSoup
+from app.services.template_form import compile_form
+
+# The form page embeds its settings as JSON in <div id="app" v-init-json='{"title": ...}'>
+_EMBEDDED_TITLE_RE = re.compile(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+# Placeholder titles some pages carry instead of the form's name
+_GENERIC_TITLES = {"", "legal form", "fill out your legal form"}
+
+
+def read_template(path: Path) -> str:
+    """Raw template HTML; a few files are Latin-1/Windows-1252 rather than UTF-8"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except UnicodeDecodeError:
+        print(f"DEBUG: UTF-8 failed, trying latin-1 for {path}")
+        with open(path, "r", encoding="latin-1") as f:
+            return f.read()
+
+
+def _embedded_title(soup) -> Optional[str]:
+    app = soup.find(id="app")
+    match = _EMBEDDED_TITLE_RE.search(app.get("v-init-json", "")) if app else None
+    if not match:
+        return None
+    try:
+        title = json.loads(f'"{match.group(1)}"')
+    except ValueError:
+        title = match.group(1)
+    title = " ".join(title.split("|")[0].split())
+    return None if title.lower() in _GENERIC_TITLES else title
+
+
+def clean_html_content(raw_html: str) -> str:
+    """
+    Parses the raw LegalZoom HTML to extract just the document text.
+    Converts custom tags like <field-source> into [Placeholders].
+    """
+    return parse_template(raw_html)["content"]
+
+
+def parse_template(raw_html: str) -> Dict[str, Any]:
+    """Cleaned text (see clean_html_content) plus catalog metadata, from one parse:
+    the form's title, if the page names it, its number of distinct input fields,
+    and its field schema and render program (see compile_form).
+    """
+    title, field_count, form = None, 0, {"fields": [], "program": []}
+    try:
+        soup = BeautifulSoup(raw_html, 'html.parser')
+        title = _embedded_title(soup)
+        
+        # 1. Target the main content area usually found in legalzoom templates
+        # They often use .sample-form, .info-form, or just the main content
+        content_div = soup.find('div', class_='sample-form') or \
+                      soup.find('div', class_='form-fill-container') or \
+                      soup.find('main') or \
+                      soup.find('body')
+        
+        if not content_div:
+            return {"content": "Error: Could not parse document structure.", "title": title, "field_count": 0, **form}
+
+        # "break" fields are headings/questions of the fill-in wizard, not inputs
+        field_count = len({
+            tag.get('fid') for tag in content_div.find_all('field-source')
+            if tag.get('fid') and tag.get('type') != 'break'
+        })
+        form = compile_form(content_div)
+
+        # 2. Process custom tags BEFORE extracting text
+        
+        # Handle <field-source label="..."> -> [Label]
+        for tag in content_div.find_all('field-source'):
+            label = tag.get('label') or tag.get('title') or tag.get('fid') or "Field"
+            if label == "N/A":
+                 # Try to find a better label if available, or just use the FID
+                 label = tag.get('fid') or "Input"
+            
+            # Replace tag with placeholder text
+            tag.replace_with(f" **[{label}]** ")
+
+        # Handle <section-dep> (Conditional sections) - Just keep the content for now
+        # stripping the tags but keeping inner text
+        for tag in content_div.find_all('section-dep'):
+            tag.unwrap()
+
+        # 3. Clean up the text
+        # Get text, preserving some structure
+        text = content_div.get_text(separator="\n\n")
+        
+        # Remove excessive newlines
+        text = re.sub(r'\n\s*\n', '\n\n', text)
+        
+        # Remove known "garbage" lines from web scraping
+        clean_lines = []
+        for line in text.splitlines():
+            line = line.strip()
+            # Skip empty lines or navigational text
+            if not line or line.lower() in ["skip to main content", "preview document"]:
+                continue
+            clean_lines.append(line)
+            
+        return {"content": "\n".join(clean_lines), "title": title, "field_count": field_count, **form}
+
+    except Exception as e:
+        print(f"Error cleaning HTML: {e}")
+        return {"content": f"Error processing template: {str(e)}", "title": title, "field_count": field_count,
+                **form}
@@ -0,0 +1,103 @@
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.services.lexical_index import Hits, LexicalIndex, reciprocal_rank_fusion
+from app.services.search_index import top_k
+
+TEMPLATE_SEARCH_MODES = ("lexical", "semantic", "hybrid")
+# Title and category are repeated so they outweigh a passing mention in the body
+TITLE_WEIGHT = 3
+# MiniLM reads ~256 tokens; the opening of a form says what it is
+EMBED_CHARS = 1500
+
+
+def _embedding_text(entry: Dict[str, Any], content: str) -> str:
+    return f"{entry['name']}. {content[:EMBED_CHARS]}"
+
+
+class TemplateSearchIndex:
+    """Full-text (BM25) and optional semantic search over templates.
+
+    Row ``i`` is ``entries[i]`` of the catalog build that created it. The
+    inverted index is built with the catalog; template embeddings are
+    computed on first use of semantic ranking, since the embedding model
+    may load after the catalog, and kept until the next catalog build.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], contents: List[str]):
+        self.entries = entries
+        documents = [
+            {
+                "question": " ".join([f"{entry['name']} {entry['category']}"] * TITLE_WEIGHT),
+                "answer": content,
+            }
+            for entry, content in zip(entries, contents)
+        ]
+        self.lexical = LexicalIndex({"templates": documents})
+        self._embedding_texts = [_embedding_text(e, c) for e, c in zip(entries, contents)]
+        self.embeddings: Optional[np.ndarray] = None
+        self._embed_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def ensure_embeddings(self, encoder) -> np.ndarray:
+        """Template embeddings, encoded once with ``encoder``"""
+        with self._embed_lock:
+            if self.embeddings is None:
+                vectors = np.asarray(encoder.encode(self._embedding_texts), dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                self.embeddings = vectors / np.maximum(norms, 1e-12)
+            return self.embeddings
+
+    def _allowed(self, category: Optional[str]) -> Optional[np.ndarray]:
+        if not category:
+            return None
+        return np.array([entry["category"] == category for entry in self.entries], dtype=bool)
+
+    def _lexical_hits(self, query: str, allowed: Optional[np.ndarray], depth: int) -> Hits:
+        # Every scored row when filtering, so the filter cannot empty the top-k
+        rows, scores = self.lexical.search(query, "all", len(self) if allowed is not None else depth)
+        if allowed is not None:
+            keep = allowed[rows]
+            rows, scores = rows[keep][:depth], scores[keep][:depth]
+        return rows, scores
+
+    def _semantic_hits(self, query_vector: np.ndarray, allowed: Optional[np.ndarray], depth: int) -> Hits:
+        vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        scores = self.embeddings @ vector
+        if allowed is not None:
+            scores = np.where(allowed, scores, -np.inf)
+        best = top_k(scores, min(depth, int(allowed.sum()) if allowed is not None else len(self)))
+        return best.astype(np.int64), scores[best].astype(np.float32)
+
+    def search(self, query: str, limit: int = 10, category: Optional[str] = None,
+               mode: str = "lexical", query_vector: Optional[np.ndarray] = None,
+               rrf_k: int = 60) -> List[Dict[str, Any]]:
+        """Ranked catalog entries, each with a ``score``; semantic and hybrid
+        modes need ``query_vector`` and ``ensure_embeddings`` to have run."""
+        if mode not in TEMPLATE_SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if limit <= 0 or not len(self):
+            return []
+        allowed = self._allowed(category)
+        depth = limit if mode != "hybrid" else max(limit * 4, 20)
+
+        if mode == "semantic":
+            rows, scores = self._semantic_hits(query_vector, allowed, depth)
+        else:
+            rows, scores = self._lexical_hits(query, allowed, depth)
+            if mode == "lexical":
+                # Scale BM25 so the best hit scores 1.0, like cosine results
+                if len(scores):
+                    scores = scores / max(float(scores[0]), 1e-12)
+            else:
+                rows, scores = reciprocal_rank_fusion(
+                    [self._semantic_hits(query_vector, allowed, depth), (rows, scores)], depth, k=rrf_k
+                )
+
+        return [
+            dict(self.entries[int(row)], score=round(float(score), 6))
+            for row, score in zip(rows[:limit], scores[:limit])
+        ]
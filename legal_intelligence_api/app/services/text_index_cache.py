@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+import numpy as np
+
+from app.services.lexical_index import LexicalIndex
+from app.services.suggest_index import SuggestIndex
+
+# Bump whenever the saved layout or the way postings/groups are built changes
+TEXT_INDEX_FORMAT_VERSION = 1
+# Older entries are pruned (a partial publish on a cold start writes its own);
+# typeahead indexes are kept per dataset
+TEXT_INDEXES_KEPT = 4
+
+Groups = Optional[Dict[str, List[np.ndarray]]]
+T = TypeVar("T")
+
+
+def text_index_key(entry_hashes: Dict[str, str], dedup_threshold: Optional[float]) -> str:
+    """Identity of the postings and groups built from some datasets.
+
+    ``entry_hashes`` cover questions and answers (see dataset_store.entries_hash);
+    the groups also depend on the question vectors, so entries live under
+    the embedding cache's per-model directory.
+    """
+    payload = json.dumps({
+        "version": TEXT_INDEX_FORMAT_VERSION,
+        "dedup": dedup_threshold,
+        "datasets": list(entry_hashes.items()),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def save_groups(path: Path, groups: Groups):
+    """Duplicate groups per dataset as CSR offsets + members"""
+    names = list(groups or {})
+    with open(path / "groups.json", "w", encoding="utf-8") as f:
+        json.dump({"datasets": names, "dedup": groups is not None}, f)
+    for i, name in enumerate(names):
+        members = groups[name]
+        sizes = [len(m) for m in members]
+        np.save(path / f"groups_{i}_offsets.npy", np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64))
+        np.save(path / f"groups_{i}_members.npy",
+                np.concatenate(members).astype(np.int64) if members else np.empty(0, dtype=np.int64))
+
+
+def load_groups(path: Path) -> Groups:
+    with open(path / "groups.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if not meta["dedup"]:
+        return None
+    groups = {}
+    for i, name in enumerate(meta["datasets"]):
+        offsets = np.load(path / f"groups_{i}_offsets.npy")
+        members = np.load(path / f"groups_{i}_members.npy")
+        groups[name] = np.split(members, offsets[1:-1]) if len(offsets) > 1 else []
+    return groups
+
+
+def _prune(root: Path, keep: Path, dataset: Optional[str] = None):
+    """Drop all but the newest entries (of one dataset's, when given)"""
+    entries = sorted(
+        (p for p in root.iterdir()
+         if p.is_dir() and (p / "DONE").exists() and p != keep
+         and (dataset is None or p.name.rsplit("-", 1)[0] == dataset)),
+        key=lambda p: (p / "DONE").stat().st_mtime,
+        reverse=True
+    )
+    for old in entries[TEXT_INDEXES_KEPT - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _load_or_build(path: Optional[Path], load: Callable[[Path], T], build: Callable[[], T],
+                   save: Callable[[T, Path], None], dataset: Optional[str] = None) -> Tuple[T, bool]:
+    """Reuse what is saved at ``path`` (when not None), else build and save it.
+
+    A cache problem never fails the build. Returns (value, whether it was built).
+    """
+    if path is not None and (path / "DONE").exists():
+        try:
+            return load(path), False
+        except Exception as e:
+            print(f"Could not load {path}, rebuilding: {e}")
+
+    value = build()
+    if path is not None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            save(value, tmp)
+            # Marker written last so a half-written entry is never reused
+            (tmp / "DONE").write_text(str(os.getpid()))
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+            _prune(path.parent, path, dataset)
+        except OSError as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            print(f"Could not persist {path}: {e}")
+    return value, True
+
+
+def _save_text_index(value: Tuple[Groups, LexicalIndex], path: Path):
+    save_groups(path, value[0])
+    value[1].save(path)
+
+
+def load_or_build_text_index(cache_dir: Optional[Path], key: str,
+                             build: Callable[[], Tuple[Groups, LexicalIndex]]) -> Tuple[Groups, LexicalIndex, bool]:
+    """Reuse persisted duplicate groups and BM25 postings, else build and save them.
+
+    Postings are opened memory-mapped. Returns (groups, lexical index,
+    whether this call built them).
+    """
+    path = Path(cache_dir) / "text" / key if cache_dir is not None else None
+    (groups, lexical), built = _load_or_build(
+        path, lambda p: (load_groups(p), LexicalIndex.load(p)), build, _save_text_index
+    )
+    return groups, lexical, built
+
+
+def load_or_build_suggest(cache_dir: Optional[Path], dataset: str, entries_hash: str,
+                          build: Callable[[], SuggestIndex]) -> Tuple[SuggestIndex, bool]:
+    """Reuse a dataset's persisted typeahead index, else build and save it"""
+    key = f"{dataset}-{text_index_key({dataset: entries_hash}, None)}"
+    path = Path(cache_dir) / "suggest" / key if cache_dir is not None else None
+    return _load_or_build(
+        path, SuggestIndex.load, build, lambda index, p: index.save(p), dataset=dataset
+    )
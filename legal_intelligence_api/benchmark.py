@@ -0,0 +1,237 @@
+"""
+Benchmark SearchService on the bundled data/ files and record the results.
+
+Usage:
+    python benchmark.py --output bench/HEAD.json
+    python benchmark.py --output bench/new.json --baseline bench/HEAD.json
+
+Measures cold and warm startup, single-query latency percentiles per search
+mode, batch throughput, peak RSS, and recall@k of approximate/quantized
+index variants against exact float32 brute force, on the fixed queries in
+evaluation/recall_queries.json. Every measurement runs in a fresh
+subprocess so startup and RSS figures are not polluted by earlier runs.
+Query caches are disabled so latencies reflect real work. Results are
+written as JSON (with the git commit) for comparison between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+QUERIES = [
+    "What is the punishment for murder?",
+    "What are the fundamental rights under the Constitution?",
+    "When can a police officer arrest without warrant?",
+    "What is anticipatory bail?",
+    "What is the punishment for theft?",
+    "What does Article 21 guarantee?",
+    "Who appoints the Chief Justice of India?",
+    "What is the procedure for filing an FIR?",
+    "What is criminal breach of trust?",
+    "Can a magistrate take cognizance of an offence on a complaint?",
+]
+
+# name -> settings overrides; each is compared against exact float32
+VARIANTS = {
+    "ivf": {"SEARCH_INDEX_TYPE": "ivf"},
+    "hnsw": {"SEARCH_INDEX_TYPE": "hnsw"},
+    "float16": {"SEARCH_INDEX_DTYPE": "float16"},
+    "int8": {"SEARCH_INDEX_DTYPE": "int8"},
+    "pca128_int8": {"SEARCH_INDEX_DTYPE": "int8", "SEARCH_PCA_DIM": "128"},
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+    }
+
+
+def _start_service():
+    from app.services.search_service import SearchService
+    service = SearchService()
+    start = time.perf_counter()
+    service._initialize_sync()
+    if not service.is_ready:
+        raise RuntimeError("Search service failed to initialize")
+    return service, time.perf_counter() - start
+
+
+def _query_set(service, size: int, seed: int = 0):
+    """Fixed queries plus a seeded sample of dataset questions"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    sampled = []
+    for name in sorted(service.datasets):
+        data = service.datasets[name]
+        for i in rng.choice(len(data), size=min(len(data), size), replace=False):
+            sampled.append(data[int(i)].get("question", ""))
+    rng.shuffle(sampled)
+    return QUERIES + sampled[:max(size - len(QUERIES), 0)]
+
+
+def child_startup(args):
+    _, seconds = _start_service()
+    return {"startup_seconds": seconds, "peak_rss_mb": _peak_rss_mb()}
+
+
+def child_queries(args):
+    service, seconds = _start_service()
+    queries = _query_set(service, args.queries)
+    result = {"startup_seconds": seconds, "queries": len(queries), "latency": {}, "batch": {}}
+
+    for mode in ("semantic", "lexical", "hybrid"):
+        service.search(queries[0], limit=args.k, mode=mode)  # warm-up
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            service.search(query, limit=args.k, mode=mode)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        result["latency"][mode] = _percentiles(samples)
+
+    for batch_size in (8, 32):
+        start = time.perf_counter()
+        for i in range(0, len(queries), batch_size):
+            chunk = queries[i:i + batch_size]
+            service.search_batch(chunk, ["all"] * len(chunk), [args.k] * len(chunk), ["hybrid"] * len(chunk))
+        elapsed = time.perf_counter() - start
+        result["batch"][str(batch_size)] = {"queries_per_second": len(queries) / elapsed}
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def child_recall(args):
+    service, seconds = _start_service()
+    report = service.evaluate_recall(k=args.k, sample_size=args.recall_sample)
+    report.update({"startup_seconds": seconds, "peak_rss_mb": _peak_rss_mb()})
+    return report
+
+
+CHILDREN = {"startup": child_startup, "queries": child_queries, "recall": child_recall}
+
+
+def run_child(task, env_overrides, args):
+    env = dict(os.environ, **env_overrides)
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", task,
+           "--queries", str(args.queries), "--k", str(args.k), "--recall-sample", str(args.recall_sample)]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+    return {"error": f"exit code {proc.returncode}", "output": tail}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, path=""):
+    """Print numeric changes against a previous run"""
+    for key, value in current.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict) and isinstance(old, dict):
+            compare(value, old, name)
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and not isinstance(value, bool) and old:
+            change = 100.0 * (value - old) / abs(old)
+            if abs(change) >= 5.0:
+                print(f"  {name}: {old:.4g} -> {value:.4g} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search latency, throughput, memory and recall")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--queries", type=int, default=200, help="Size of the fixed query set")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--recall-sample", type=int, default=200,
+                        help="Queries taken from the recall query list")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Comma-separated recall variants")
+    parser.add_argument("--child", choices=sorted(CHILDREN), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        print(RESULT_MARKER + json.dumps(CHILDREN[args.child](args)))
+        return
+
+    cache_root = tempfile.mkdtemp(prefix="search-bench-")
+    base_env = {
+        "EMBEDDING_CACHE_DIR": os.path.join(cache_root, "embeddings"),
+        "DATASET_STORE_DIR": os.path.join(cache_root, "datasets"),
+        "SEARCH_SNAPSHOT_DIR": os.path.join(cache_root, "index"),
+        "QUERY_EMBEDDING_CACHE_MB": "0",
+        "QUERY_RESULT_CACHE_MB": "0",
+        "SEARCH_ARTIFACT_DIR": "",
+        "DATA_WATCH_INTERVAL": "0",
+    }
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "settings": {"queries": args.queries, "k": args.k, "recall_sample": args.recall_sample},
+    }
+    try:
+        print("Cold startup (empty caches)...")
+        results["startup_cold"] = run_child("startup", base_env, args)
+        print("Warm startup...")
+        results["startup_warm"] = run_child("startup", base_env, args)
+        print("Query latency and batch throughput...")
+        results["exact"] = run_child("queries", base_env, args)
+
+        results["recall"] = {}
+        for name in [v for v in args.variants.split(",") if v]:
+            if name not in VARIANTS:
+                print(f"Unknown variant {name}, skipping")
+                continue
+            print(f"Recall for {name}...")
+            results["recall"][name] = run_child("recall", dict(base_env, **VARIANTS[name]), args)
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Changes of 5% or more vs {args.baseline} (commit {baseline.get('commit')}):")
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
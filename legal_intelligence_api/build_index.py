@@ -0,0 +1,57 @@
+"""
+Build the complete search artifact ahead of time (CI / Docker build stage).
+
+Usage:
+    python build_index.py --output build/search-artifact
+    SEARCH_ARTIFACT_DIR=build/search-artifact uvicorn app.main:app
+
+Embeds every dataset in DATA_DIR with the configured model and writes the
+compiled datasets, normalized embeddings, the dense and lexical indexes and
+a manifest with model name, dimensions and checksums. Storage format and
+ANN type follow the usual SEARCH_* settings.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to sys.path to import app
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.services.encoder import create_encoder
+from app.services.search_service import SearchService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a versioned search artifact")
+    parser.add_argument("--output", required=True, help="Artifact directory (replaced if it exists)")
+    parser.add_argument("--data-dir", default=str(settings.DATA_DIR))
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the embedding cache")
+    args = parser.parse_args()
+
+    settings.DATA_DIR = Path(args.data_dir)
+    # Build from the data itself, never from another artifact
+    settings.SEARCH_ARTIFACT_DIR = None
+
+    start = time.time()
+    service = SearchService()
+    print(f"Loading model: {settings.EMBEDDING_MODEL}")
+    service.encoder = create_encoder(settings)
+    if not args.no_cache and settings.EMBEDDING_CACHE_ENABLED:
+        from app.services.embedding_cache import EmbeddingCache
+        service.embedding_cache = EmbeddingCache(
+            settings.EMBEDDING_CACHE_DIR,
+            settings.EMBEDDING_MODEL,
+            normalize=settings.NORMALIZE_EMBEDDINGS
+        )
+
+    manifest = service.build_artifact(Path(args.output))
+    rows = sum(meta["count"] for meta in manifest["datasets"].values())
+    print(f"Wrote {args.output}: {len(manifest['datasets'])} datasets, {rows} rows, "
+          f"dim {manifest['dim']}, {len(manifest['files'])} files in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
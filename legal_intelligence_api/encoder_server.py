@@ -0,0 +1,35 @@
+"""
+Encoder sidecar: owns the embedding model and serves every API worker.
+
+Usage:
+    python encoder_server.py --socket .cache/encoder.sock
+    ENCODER_BACKEND=socket uvicorn app.main:app --workers 4
+
+API processes started with ENCODER_BACKEND=socket never load torch; they
+send texts over the Unix socket and the sidecar batches them together.
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.services.encoder import EncoderServer, LocalEncoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve embeddings over a Unix socket")
+    parser.add_argument("--socket", default=str(settings.ENCODER_SOCKET))
+    parser.add_argument("--window-ms", type=float, default=settings.SEARCH_BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=256, help="Most texts encoded in one forward pass")
+    args = parser.parse_args()
+
+    print(f"Loading model: {settings.EMBEDDING_MODEL}")
+    encoder = LocalEncoder(settings.EMBEDDING_MODEL, normalize=settings.NORMALIZE_EMBEDDINGS)
+    server = EncoderServer(encoder, args.socket, window_ms=args.window_ms, max_batch_texts=args.max_batch)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Saturate /search and watch /health latency against a running API.
+
+Usage:
+    python load_test.py --url http://localhost:8000 --concurrency 32 --duration 20
+
+/health is probed on its own before and during the /search load; with
+inference running off the event loop its latency should stay flat.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+QUERIES = [
+    "What is the punishment for murder?",
+    "What are the fundamental rights under the Constitution?",
+    "When can a police officer arrest without warrant?",
+    "What is anticipatory bail?",
+    "What is the punishment for theft?",
+    "What does Article 21 guarantee?",
+]
+
+
+def _request(url, payload=None, timeout=30):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+        status = resp.status
+    return status, (time.perf_counter() - start) * 1000.0
+
+
+def probe_health(base_url, stop, samples, interval=0.05):
+    while not stop.is_set():
+        try:
+            samples.append(_request(f"{base_url}/health")[1])
+        except Exception as e:
+            print(f"/health failed: {e}")
+        time.sleep(interval)
+
+
+def search_worker(base_url, stop, latencies, errors, worker_id):
+    i = worker_id
+    while not stop.is_set():
+        query = QUERIES[i % len(QUERIES)]
+        i += 1
+        try:
+            latencies.append(_request(f"{base_url}/search", {"query": query, "dataset": "all", "limit": 5})[1])
+        except Exception:
+            errors.append(1)
+
+
+def summarize(label, samples):
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(f"{label}: n={len(samples)} p50={statistics.median(ordered):.1f}ms "
+          f"p95={p95:.1f}ms max={ordered[-1]:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /search while probing /health")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print("Measuring idle /health latency...")
+    stop = threading.Event()
+    idle = []
+    prober = threading.Thread(target=probe_health, args=(args.url, stop, idle))
+    prober.start()
+    time.sleep(min(5.0, args.duration / 4))
+    stop.set()
+    prober.join()
+
+    print(f"Saturating /search with {args.concurrency} clients for {args.duration:.0f}s...")
+    stop = threading.Event()
+    loaded, search_latencies, errors = [], [], []
+    prober = threading.Thread(target=probe_health, args=(args.url, stop, loaded))
+    prober.start()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for worker_id in range(args.concurrency):
+            pool.submit(search_worker, args.url, stop, search_latencies, errors, worker_id)
+        time.sleep(args.duration)
+        stop.set()
+    prober.join()
+
+    summarize("/health idle", idle)
+    summarize("/health under load", loaded)
+    summarize("/search", search_latencies)
+    print(f"/search throughput: {len(search_latencies) / args.duration:.1f} req/s, errors: {len(errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measure concurrent template fetches with HTML cleaning in worker processes.
+
+Usage:
+    python template_benchmark.py --workers 1,2,4 --concurrency 32 --rounds 2
+
+Every fetch misses the caches, so each one reads and cleans its file. The
+"inline" row cleans on the event loop, as GET /templates/{filename} used to;
+the other rows use TemplateExecutor with that many processes. Throughput
+should grow with workers up to the number of cores, and event-loop lag
+(how late a 10 ms timer fires while fetches run) should stay near zero.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.template_cache import TemplateCache, load_cleaned
+from app.services.template_executor import TemplateExecutor
+
+
+class _Inline:
+    """Executor stand-in that runs jobs on the event loop thread"""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+async def _ticker(stop: asyncio.Event, lags):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - start - 0.01) * 1000.0)
+
+
+async def _measure(executor, filenames, concurrency):
+    # No memory budget and no persisted copies: every fetch parses
+    cache = TemplateCache(settings.TEMPLATE_DIR, 0, None)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def fetch(name):
+        async with semaphore:
+            start = time.perf_counter()
+            await cache.fetch(name, executor)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(name) for name in filenames))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    latencies.sort()
+    return {
+        "fetches": len(filenames),
+        "seconds": elapsed,
+        "fetches_per_second": len(filenames) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "loop_lag_max_ms": max(lags, default=0.0),
+        "loop_lag_mean_ms": statistics.fmean(lags) if lags else 0.0,
+    }
+
+
+async def run(args):
+    filenames = sorted(f for f in os.listdir(settings.TEMPLATE_DIR) if f.endswith(".html")) * args.rounds
+    results = {"cpus": os.cpu_count(), "concurrency": args.concurrency, "runs": {}}
+
+    print(f"{len(filenames)} fetches, concurrency {args.concurrency}, {os.cpu_count()} CPUs")
+    print(f"{'mode':>8} {'fetch/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'lag max ms':>11}")
+    modes = [("inline", None)] + [(f"{w} proc", w) for w in args.workers]
+    for label, workers in modes:
+        if workers is None:
+            executor = _Inline()
+        else:
+            executor = TemplateExecutor(max_workers=workers, max_pending=len(filenames), timeout=120)
+            # Spawn the workers (and import bs4 in each) before timing
+            executor.map(load_cleaned, [settings.TEMPLATE_DIR / filenames[0]] * workers, [None] * workers)
+        try:
+            stats = await _measure(executor, filenames, args.concurrency)
+        finally:
+            if workers is not None:
+                executor.shutdown()
+        results["runs"][label] = stats
+        print(f"{label:>8} {stats['fetches_per_second']:>9.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['loop_lag_max_ms']:>11.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template fetches on the process pool")
+    parser.add_argument("--workers", default=",".join(str(w) for w in sorted({1, 2, os.cpu_count() or 1})),
+                        help="Comma-separated pool sizes to compare")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=1, help="Fetches of every template per run")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(",") if w]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the app as ``app.*``, like the scripts next to seed_data.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from app.services.ann_index import IVFIndex, HNSWIndex, load_or_build_ann
+from app.services.search_index import top_k
+
+
+def _data(n=2000, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    matrix = centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    queries = centers[rng.integers(clusters, size=50)] + 0.3 * rng.normal(size=(50, dim))
+    normalize = lambda m: (m / np.linalg.norm(m, axis=1, keepdims=True)).astype(np.float32)
+    return normalize(matrix), normalize(queries)
+
+
+def _recall(ann, matrix, queries, span, k=10):
+    hits = ann.search_batch(matrix, queries, [span] * len(queries), [k] * len(queries))
+    found = 0
+    for query, (rows, scores) in zip(queries, hits):
+        exact = set((top_k(matrix[span[0]:span[1]] @ query, k) + span[0]).tolist())
+        assert len(rows) == k
+        assert np.all((rows >= span[0]) & (rows < span[1]))
+        np.testing.assert_allclose(scores, matrix[rows] @ query, rtol=1e-4, atol=1e-5)
+        found += len(exact & set(rows.tolist()))
+    return found / (k * len(queries))
+
+
+def test_ivf_recall_against_exact_search():
+    matrix, queries = _data()
+    ranges = {"a": (0, 1500), "b": (1500, 2000)}
+    ann = IVFIndex(nprobe=16)
+    ann.build(matrix, ranges)
+    assert ann.list_offsets[-1] == len(matrix)
+    assert _recall(ann, matrix, queries, (0, 2000)) >= 0.9
+    assert _recall(ann, matrix, queries, ranges["b"]) >= 0.9
+
+
+def test_ivf_probing_every_cell_is_exact():
+    matrix, queries = _data(n=500)
+    ann = IVFIndex(nlist=8, nprobe=8)
+    ann.build(matrix, {"a": (0, 500)})
+    assert _recall(ann, matrix, queries, (0, 500)) == 1.0
+
+
+def test_ivf_falls_back_to_exact_for_small_spans():
+    matrix, queries = _data(n=500)
+    ann = IVFIndex(nlist=50, nprobe=1)
+    ann.build(matrix, {"a": (0, 490), "b": (490, 500)})
+    assert _recall(ann, matrix, queries, (490, 500), k=5) == 1.0
+    rows, scores = ann.search_batch(matrix, queries[:1], [None], [5])[0]
+    assert len(rows) == len(scores) == 0
+
+
+def test_hnsw_recall_against_exact_search():
+    pytest.importorskip("hnswlib")
+    matrix, queries = _data()
+    ranges = {"a": (0, 1500), "b": (1500, 2000)}
+    ann = HNSWIndex(m=16, ef_construction=100, ef_search=64)
+    ann.build(matrix, ranges)
+    assert _recall(ann, matrix, queries, (0, 2000)) >= 0.9
+    assert _recall(ann, matrix, queries, ranges["a"]) >= 0.9
+
+
+def test_persisted_index_is_reused(tmp_path):
+    matrix, queries = _data(n=500)
+    ranges = {"a": (0, 500)}
+    built = load_or_build_ann(IVFIndex(nlist=8, nprobe=2), matrix, ranges, tmp_path, "f1")
+    loaded = load_or_build_ann(IVFIndex(nlist=8, nprobe=2), matrix, ranges, tmp_path, "f1")
+    np.testing.assert_array_equal(loaded.centroids, built.centroids)
+    for (a, _), (b, _) in zip(
+        built.search_batch(matrix, queries, [(0, 500)] * 50, [10] * 50),
+        loaded.search_batch(matrix, queries, [(0, 500)] * 50, [10] * 50),
+    ):
+        np.testing.assert_array_equal(a, b)
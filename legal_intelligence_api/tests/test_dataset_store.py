@@ -0,0 +1,70 @@
+import json
+import os
+import pytest
+from app.services.dataset_store import CompiledDataset, DatasetStore, iter_json_array, write_compiled
+from app.services.embedding_cache import EmbeddingCache
+
+ENTRIES = [
+    {"question": "What is bail?", "answer": "Release pending trial."},
+    {"question": "Qu'est-ce que la caution ? ₹", "answer": ""},
+    {"question": "Is privacy a right?", "answer": "Yes, under Article 21."},
+]
+
+
+def _write(path, entries):
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def test_iter_json_array_across_chunk_boundaries(tmp_path):
+    source = tmp_path / "qa.json"
+    _write(source, ENTRIES)
+    assert list(iter_json_array(source, chunk_size=7)) == ENTRIES
+    (tmp_path / "empty.json").write_text(" [ ] ", encoding="utf-8")
+    assert list(iter_json_array(tmp_path / "empty.json")) == []
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[{\"question\": 1}"])
+def test_iter_json_array_rejects_bad_files(tmp_path, text):
+    source = tmp_path / "bad.json"
+    source.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(source))
+
+
+def test_compiled_dataset_reads_back_the_entries(tmp_path):
+    target = tmp_path / "qa.qads"
+    assert write_compiled(ENTRIES, target) == 3
+    dataset = CompiledDataset(target)
+    assert len(dataset) == 3
+    assert list(dataset) == ENTRIES
+    assert dataset[-1] == ENTRIES[2]
+    assert dataset.question(1) == ENTRIES[1]["question"]
+    with pytest.raises(IndexError):
+        dataset[3]
+    # Same hash the embedding cache keys the dataset's vectors by
+    assert dataset.content_hash == EmbeddingCache.content_hash(e["question"] for e in ENTRIES)
+
+
+def test_store_recompiles_only_when_the_source_changes(tmp_path):
+    source = tmp_path / "qa.json"
+    signature = _write(source, ENTRIES)
+    store = DatasetStore(tmp_path / "store")
+    assert list(store.open("qa", source, signature)) == ENTRIES
+    compiled_at = os.stat(store.path_for("qa")).st_mtime_ns
+
+    assert len(store.open("qa", source, signature)) == 3
+    assert os.stat(store.path_for("qa")).st_mtime_ns == compiled_at
+
+    signature = _write(source, ENTRIES[:1])
+    assert list(store.open("qa", source, signature)) == ENTRIES[:1]
+
+
+def test_store_recompiles_a_corrupt_file(tmp_path):
+    source = tmp_path / "qa.json"
+    signature = _write(source, ENTRIES)
+    store = DatasetStore(tmp_path / "store")
+    store.store_dir.mkdir()
+    store.path_for("qa").write_bytes(b"garbage")
+    assert list(store.open("qa", source, signature)) == ENTRIES
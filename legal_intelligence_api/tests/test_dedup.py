@@ -0,0 +1,53 @@
+import numpy as np
+from app.services.dedup import group_duplicates
+from app.services.search_index import SearchIndex
+
+
+def _groups(data, vectors, threshold=0.85):
+    return [members.tolist() for members in group_duplicates(data, np.asarray(vectors, dtype=np.float32), threshold)]
+
+
+def test_paraphrases_with_one_answer_are_merged():
+    data = [
+        {"question": "What is bail?", "answer": "Release pending trial."},
+        {"question": "Define bail", "answer": "release  pending TRIAL."},
+        {"question": "What is parole?", "answer": "Early release."},
+    ]
+    vectors = [[1, 0.1], [1, 0.2], [1, 0.15]]
+    assert _groups(data, vectors) == [[0, 1], [2]]
+
+
+def test_short_shared_answers_need_similar_questions():
+    data = [
+        {"question": "Is bail a right?", "answer": "Yes"},
+        {"question": "Can a minor marry?", "answer": "Yes"},
+    ]
+    assert _groups(data, [[1, 0], [0, 1]]) == [[0], [1]]
+
+
+def test_groups_are_connected_components():
+    data = [{"question": f"q{i}", "answer": "same"} for i in range(4)]
+    # 0~1 and 1~2 are similar, 0 and 2 are not; 3 is on its own
+    angles = np.radians([0, 25, 50, 120])
+    vectors = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    assert _groups(data, vectors, threshold=0.85) == [[0, 1, 2], [3]]
+
+
+def test_empty_answers_are_never_merged():
+    data = [{"question": "a", "answer": " "}, {"question": "a", "answer": ""}]
+    assert _groups(data, [[1, 0], [1, 0]]) == [[0], [1]]
+
+
+def test_index_rows_stand_for_their_groups():
+    data = [
+        {"question": "What is bail?", "answer": "Release."},
+        {"question": "Define bail", "answer": "Release."},
+        {"question": "What is parole?", "answer": "Early release."},
+    ]
+    vectors = np.array([[1, 0.1], [1, 0.2], [0, 1]], dtype=np.float32)
+    index = SearchIndex({"qa": vectors}, {"qa": group_duplicates(data, vectors)})
+    assert len(index) == 2
+    assert index.members(0).tolist() == [0, 1]
+    assert index.locate(1) == ("qa", 2)
+    rows, _ = index.search(np.array([1, 0.15], dtype=np.float32), "qa", 5)
+    assert rows.tolist() == [0, 1]
@@ -0,0 +1,56 @@
+import numpy as np
+from app.services.embedding_builder import EmbeddingBuilder
+from app.services.embedding_cache import EmbeddingCache
+
+
+class _Encoder:
+    dim = 4
+
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(t), 1.0, 0.0, 0.0] for t in texts], dtype=np.float32).reshape(-1, self.dim)
+
+
+def _matrix(rows=3, dim=4):
+    return np.arange(rows * dim, dtype=np.float32).reshape(rows, dim)
+
+
+def test_roundtrip_is_memory_mapped(tmp_path):
+    cache = EmbeddingCache(tmp_path, "org/model")
+    digest = EmbeddingCache.content_hash(["a", "b", "c"])
+    cache.save("ipc_qa", digest, _matrix())
+
+    loaded = cache.load("ipc_qa", digest)
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, _matrix())
+
+
+def test_changed_content_model_or_normalization_misses(tmp_path):
+    digest = EmbeddingCache.content_hash(["a", "b", "c"])
+    EmbeddingCache(tmp_path, "org/model").save("ipc_qa", digest, _matrix())
+
+    assert EmbeddingCache(tmp_path, "org/model").load("ipc_qa", EmbeddingCache.content_hash(["a", "b"])) is None
+    assert EmbeddingCache(tmp_path, "org/other-model").load("ipc_qa", digest) is None
+    assert EmbeddingCache(tmp_path, "org/model", normalize=False).load("ipc_qa", digest) is None
+
+
+def test_content_hash_separates_texts():
+    assert EmbeddingCache.content_hash(["ab", "c"]) != EmbeddingCache.content_hash(["a", "bc"])
+
+
+def test_corrupt_sidecar_is_a_miss(tmp_path):
+    cache = EmbeddingCache(tmp_path, "org/model")
+    digest = EmbeddingCache.content_hash(["a"])
+    cache.save("ipc_qa", digest, _matrix(1))
+    (cache.cache_dir / "ipc_qa.json").write_text("{not json")
+    assert cache.load("ipc_qa", digest) is None
+
+
+def test_empty_dataset_encodes_and_caches(tmp_path):
+    builder = EmbeddingBuilder(_Encoder(), "org/model")
+    matrix, _ = builder.encode([])
+    assert matrix.shape == (0, 4)
+
+    cache = EmbeddingCache(tmp_path, "org/model")
+    digest = EmbeddingCache.content_hash([])
+    cache.save("empty_qa", digest, matrix)
+    assert cache.load("empty_qa", digest).shape == (0, 4)
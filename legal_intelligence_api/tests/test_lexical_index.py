@@ -0,0 +1,116 @@
+import numpy as np
+from app.services.lexical_index import LexicalIndex, is_reference_lookup, reciprocal_rank_fusion, tokenize
+from app.services.search_service import SearchService
+
+
+def _index():
+    return LexicalIndex({
+        "ipc_qa": [
+            {"question": "What is Section 302 IPC?", "answer": "Punishment for murder."},
+            {"question": "What is theft?", "answer": "Section 378 defines theft."},
+        ],
+        "constitution_qa": [
+            {"question": "What does Article 21 protect?", "answer": "Life and personal liberty."},
+        ],
+    })
+
+
+def test_tokenize_adds_reference_tokens():
+    tokens = tokenize("What is Section 438 CrPC and Art. 21?")
+    assert "sec_438" in tokens and "art_21" in tokens
+    assert "438" in tokens and "section" not in tokens and "what" not in tokens
+
+
+def test_reference_lookup_detection():
+    assert is_reference_lookup("What is Section 302 IPC?")
+    assert is_reference_lookup("Article 21")
+    assert not is_reference_lookup("Section 302 punishment for murder")
+    assert not is_reference_lookup("what is bail")
+
+
+def test_bm25_finds_section_and_respects_dataset_filter():
+    index = _index()
+    rows, scores = index.search("section 302", "all", 5)
+    assert rows[0] == 0 and scores[0] > 0
+
+    rows, _ = index.search("article 21", "ipc_qa", 5)
+    assert len(rows) == 0
+    rows, _ = index.search("article 21", "constitution_qa", 5)
+    assert list(rows) == [2]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    index = _index()
+    index.save(tmp_path)
+    loaded = LexicalIndex.load(tmp_path)
+    for query in ("section 302", "theft", "liberty"):
+        expected, loaded_hits = index.search(query), loaded.search(query)
+        np.testing.assert_array_equal(expected[0], loaded_hits[0])
+        np.testing.assert_allclose(expected[1], loaded_hits[1])
+
+
+def test_reciprocal_rank_fusion():
+    dense = (np.array([1, 2, 3]), np.array([0.9, 0.8, 0.7], dtype=np.float32))
+    lexical = (np.array([2, 4]), np.array([5.0, 1.0], dtype=np.float32))
+    rows, scores = reciprocal_rank_fusion([dense, lexical], limit=4, k=60)
+
+    # Row 2 is in both lists, so it wins; scores are best first
+    assert rows[0] == 2
+    assert sorted(rows.tolist()) == [1, 2, 3, 4]
+    assert np.all(np.diff(scores) <= 0)
+
+    # First in every list scores exactly 1.0
+    rows, scores = reciprocal_rank_fusion([dense, dense], limit=1, k=60)
+    assert rows[0] == 1 and np.isclose(scores[0], 1.0)
+
+
+def test_reciprocal_rank_fusion_of_nothing():
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+    rows, scores = reciprocal_rank_fusion([empty, empty], limit=5)
+    assert len(rows) == 0 and len(scores) == 0
+
+
+def test_term_frequencies_do_not_wrap():
+    index = LexicalIndex({"qa": [{"question": "bail " * 70000, "answer": ""}]})
+    assert int(index.freqs[index.offsets[index.vocabulary["bail"]]]) == 70000
+
+
+class _CountingEncoder:
+    dim = 4
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32):
+        self.calls += 1
+        return np.ones((len(texts), self.dim), dtype=np.float32)
+
+
+def _service():
+    service = SearchService()
+    service.encoder = _CountingEncoder()
+    datasets = {
+        "ipc_qa": [
+            {"question": "What is Section 302 IPC?", "answer": "Punishment for murder."},
+            {"question": "What is theft?", "answer": "Section 378 defines theft."},
+        ],
+    }
+    service._publish_partial(datasets, {"ipc_qa": np.eye(2, 4, dtype=np.float32)})
+    return service
+
+
+def test_reference_lookups_skip_the_model_under_the_default_mode():
+    service = _service()
+    for query, mode in (("Section 302", None), ("section 302 IPC", "hybrid"), ("Sec. 302", "lexical")):
+        assert not service.needs_model(query, mode)
+        results = service.search(query, "all", 1, mode)
+        assert results[0].question == "What is Section 302 IPC?"
+    assert service.encoder.calls == 0
+
+
+def test_explicit_semantic_and_free_text_use_the_model():
+    service = _service()
+    assert service.resolve_mode("Section 302", "semantic") == "semantic"
+    service.search("Section 302", "all", 1, "semantic")
+    service.search("punishment for murder", "all", 1)
+    assert service.encoder.calls == 2
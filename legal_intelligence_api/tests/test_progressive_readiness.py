@@ -0,0 +1,44 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache
+from app.services.search_service import SearchService
+
+
+class _Encoder:
+    dim = 4
+
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(t), 1.0, 0.0, 0.0] for t in texts], dtype=np.float32).reshape(-1, self.dim)
+
+
+def _datasets():
+    return {
+        "small_qa": [{"question": "What is bail?", "answer": "Release."}],
+        "large_qa": [{"question": f"Question {i}?", "answer": f"Answer {i}."} for i in range(5)],
+    }
+
+
+def _service(tmp_path):
+    service = SearchService()
+    service.encoder = _Encoder()
+    service.embedding_cache = EmbeddingCache(tmp_path, "org/model")
+    return service
+
+
+def test_cold_start_publishes_before_each_encode(tmp_path):
+    calls = []
+    _service(tmp_path)._generate_embeddings(
+        _datasets(), before_encode=lambda datasets, embeddings: calls.append(sorted(embeddings))
+    )
+    # Smallest first: nothing is ready before small_qa, small_qa is before large_qa
+    assert calls == [[], ["small_qa"]]
+
+
+def test_warm_start_never_publishes_partials(tmp_path):
+    _service(tmp_path)._generate_embeddings(_datasets())
+    calls = []
+    embeddings, _, encoded = _service(tmp_path)._generate_embeddings(
+        _datasets(), before_encode=lambda datasets, embeddings: calls.append(sorted(embeddings))
+    )
+    assert calls == []
+    assert encoded == 0
+    assert {name: m.shape for name, m in embeddings.items()} == {"small_qa": (1, 4), "large_qa": (5, 4)}
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from app.services.quantization import PCAProjection, QuantizedMatrix, recall_at_k
+from app.services.search_index import SearchIndex
+
+
+def _embeddings(n=1000, dim=64, rank=16, seed=0):
+    # Most of the variance in a few directions, like sentence embeddings
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dim))
+    matrix = rng.normal(size=(n, rank)) @ basis + 0.1 * rng.normal(size=(n, dim))
+    queries = rng.normal(size=(30, rank)) @ basis + 0.1 * rng.normal(size=(30, dim))
+    return {"a": matrix[:700].astype(np.float32), "b": matrix[700:].astype(np.float32)}, queries.astype(np.float32)
+
+
+def _recall(dtype, pca_dim=0, k=10):
+    embeddings, queries = _embeddings()
+    baseline = SearchIndex(embeddings)
+    index = SearchIndex(embeddings)
+    index.compress(dtype, pca_dim)
+    found = [index.search(q, "all", k)[0] for q in queries]
+    expected = [baseline.search(q, "all", k)[0] for q in queries]
+    return recall_at_k(found, expected, k), index
+
+
+@pytest.mark.parametrize("dtype, minimum", [("float16", 0.99), ("int8", 0.95)])
+def test_quantized_recall(dtype, minimum):
+    recall, index = _recall(dtype)
+    assert recall >= minimum
+    assert index.storage == dtype
+    assert index.nbytes < SearchIndex(_embeddings()[0]).nbytes
+
+
+def test_pca_recall_and_scores_stay_cosine():
+    recall, index = _recall("float32", pca_dim=16)
+    assert recall >= 0.9
+    assert index.dim == 16
+    _, scores = index.search(_embeddings()[1][0], "b", 5)
+    assert np.all(scores <= 1.0 + 1e-5) and np.all(np.diff(scores) <= 0)
+
+
+def test_int8_rows_decode_close_to_the_original():
+    matrix = np.random.default_rng(1).normal(size=(50, 8)).astype(np.float32)
+    quantized = QuantizedMatrix.from_float(matrix, "int8")
+    assert quantized.codes.dtype == np.int8
+    np.testing.assert_allclose(quantized[:], matrix, atol=np.abs(matrix).max() / 127)
+    np.testing.assert_allclose(quantized[3], matrix[3], atol=np.abs(matrix[3]).max() / 127)
+    queries = matrix[:2]
+    np.testing.assert_allclose(quantized.dot(queries, 10, 40, block_rows=7), queries @ quantized[10:40].T, rtol=1e-5)
+
+
+def test_pca_projection_is_normalized():
+    matrix = _embeddings()[0]["a"]
+    projected = PCAProjection.fit(matrix, 8).transform(matrix)
+    assert projected.shape == (700, 8)
+    np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, rtol=1e-5)
+
+
+def test_unknown_storage_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedMatrix.from_float(np.zeros((2, 2), dtype=np.float32), "int4")
+
+
+def test_recall_at_k():
+    assert recall_at_k([[1, 2, 3]], [[3, 2, 9]], 2) == 0.5
+    assert recall_at_k([[1]], [[]], 5) == 1.0
+
+
+class _QueryEncoder:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32):
+        self.calls += 1
+        return self.vectors[:len(texts)]
+
+
+def test_service_recall_uses_the_fixed_query_list(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.services.search_service import SearchService
+
+    queries_file = tmp_path / "recall_queries.json"
+    queries_file.write_text('["murder", "theft", "  ", "bail"]')
+    monkeypatch.setattr(settings, "SEARCH_RECALL_QUERIES", queries_file)
+    monkeypatch.setattr(settings, "SEARCH_INDEX_DTYPE", "int8")
+    monkeypatch.setattr(settings, "SEARCH_INDEX_TYPE", "exact")
+    monkeypatch.setattr(settings, "SEARCH_DEDUP", False)
+
+    embeddings, queries = _embeddings()
+    datasets = {name: [{"question": f"{name}{i}", "answer": ""} for i in range(len(m))]
+                for name, m in embeddings.items()}
+    service = SearchService()
+    service.encoder = _QueryEncoder(queries)
+    service._publish_partial(datasets, embeddings)
+    service.is_ready = True
+    assert service.index.storage == "int8"
+
+    report = service.evaluate_recall(k=10, sample_size=200)
+    assert report["queries"] == 3 and report["query_set"] == "recall_queries.json"
+    baseline = SearchIndex(embeddings)
+    expected = recall_at_k([service.index.search(q, "all", 10)[0] for q in queries[:3]],
+                           [baseline.search(q, "all", 10)[0] for q in queries[:3]], 10)
+    assert report["recall"] == pytest.approx(expected)
+
+    # Encoded once, then reused until the file changes
+    assert service.evaluate_recall(k=10, sample_size=2, dataset="b")["queries"] == 2
+    assert service.encoder.calls == 1
@@ -0,0 +1,58 @@
+import sys
+from app.services import query_cache
+from app.services.query_cache import LRUCache, normalize_query
+
+
+def _cache(max_bytes=1000, ttl=60.0):
+    # Keys are all two characters long, so every entry costs 100 bytes
+    return LRUCache(max_bytes, ttl, sizeof=lambda value: 100 - sys.getsizeof("k0"))
+
+
+def test_normalize_query_folds_case_and_spaces():
+    assert normalize_query("  What IS\tbail? ") == "what is bail?"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = _cache(max_bytes=300)
+    for key in ("k0", "k1", "k2"):
+        cache.put(key, key)
+    assert cache.get("k0") == "k0"  # k1 is now the oldest
+    cache.put("k3", "k3")
+    assert cache.get("k1") is None
+    assert [cache.get(key) for key in ("k0", "k2", "k3")] == ["k0", "k2", "k3"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 300
+
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = _cache()
+    cache.put("k0", "a")
+    cache.put("k0", "b")
+    assert len(cache) == 1
+    assert cache.get("k0") == "b"
+    assert cache.stats()["bytes"] == 100
+
+
+def test_values_larger_than_the_budget_are_not_stored():
+    cache = _cache(max_bytes=50)
+    cache.put("k0", "a")
+    assert len(cache) == 0
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = _cache(ttl=10.0)
+    cache.put("k0", "a")
+    now[0] += 9.0
+    assert cache.get("k0") == "a"
+    now[0] += 2.0
+    assert cache.get("k0") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["bytes"]) == (1, 1, 1, 0)
+
+
+def test_uncounted_misses_leave_the_hit_rate_alone():
+    cache = _cache()
+    assert cache.get("k0", count_miss=False) is None
+    assert cache.stats()["misses"] == 0
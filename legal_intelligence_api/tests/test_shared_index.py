@@ -0,0 +1,80 @@
+import json
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services import search_service as search_service_module
+from app.services.dataset_store import CompiledDataset, DatasetStore, entries_hash, write_compiled
+from app.services.embedding_cache import EmbeddingCache
+from app.services.search_service import SearchService
+
+ENTRIES = [
+    {"question": "What is bail?", "answer": "Release pending trial."},
+    {"question": "What is parole?", "answer": "Early conditional release."},
+]
+
+
+class _Encoder:
+    dim = 4
+
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(t), 1.0, 0.0, 0.0] for t in texts], dtype=np.float32).reshape(-1, self.dim)
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    monkeypatch.setattr(settings, "DATA_DIR", data_dir)
+    monkeypatch.setattr(settings, "SEARCH_SHARED_INDEX", True)
+    monkeypatch.setattr(settings, "SEARCH_SNAPSHOT_DIR", tmp_path / "index")
+    return tmp_path
+
+
+def _service(tmp_path, compiled):
+    service = SearchService()
+    service.encoder = _Encoder()
+    service.embedding_cache = EmbeddingCache(tmp_path / "embeddings", "org/model")
+    service.dataset_store = DatasetStore(tmp_path / "store") if compiled else None
+    return service
+
+
+def _write(tmp_path, entries):
+    (tmp_path / "data" / "qa.json").write_text(json.dumps(entries), encoding="utf-8")
+
+
+def test_entries_hash_is_recorded_by_compiled_datasets(tmp_path):
+    write_compiled(ENTRIES, tmp_path / "qa.qads")
+    assert CompiledDataset(tmp_path / "qa.qads").entries_hash == entries_hash(ENTRIES)
+    edited = [ENTRIES[0], dict(ENTRIES[1], answer="Something else.")]
+    assert entries_hash(edited) != entries_hash(ENTRIES)
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_editing_only_an_answer_rebuilds_the_snapshot(shared, compiled, capsys):
+    _write(shared, ENTRIES)
+    _service(shared, compiled).reload()
+    assert "Built shared index snapshot" in capsys.readouterr().out
+
+    # Another worker opens the snapshot the first one built
+    _service(shared, compiled).reload()
+    assert "Opened shared index snapshot" in capsys.readouterr().out
+
+    _write(shared, [ENTRIES[0], dict(ENTRIES[1], answer="Supervised release after serving time.")])
+    service = _service(shared, compiled)
+    service.reload()
+    assert "Built shared index snapshot" in capsys.readouterr().out
+    assert [r.question for r in service.search("supervised", mode="lexical")] == ["What is parole?"]
+    assert service.search("conditional", mode="lexical") == []
+
+
+def test_answer_edits_change_the_ann_fingerprint(shared, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_SHARED_INDEX", False)
+    fingerprints = []
+    real = search_service_module.ann_fingerprint
+    monkeypatch.setattr(search_service_module, "ann_fingerprint",
+                        lambda *args: fingerprints.append(real(*args)) or fingerprints[-1])
+    monkeypatch.setattr(settings, "SEARCH_INDEX_TYPE", "ivf")
+    for answer in ("Early conditional release.", "Supervised release."):
+        _write(shared, [ENTRIES[0], dict(ENTRIES[1], answer=answer)])
+        _service(shared, True).reload()
+    assert len(fingerprints) == 2 and fingerprints[0] != fingerprints[1]
@@ -0,0 +1,114 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache
+from app.services.search_service import SearchService
+from app.services.suggest_index import SuggestIndex, normalize_prefix
+
+DATA = [
+    {"question": "What is anticipatory bail?", "answer": "Bail under Section 438 CrPC."},
+    {"question": "What is anticipatory bail?", "answer": "See sec. 438."},
+    {"question": "What is regular bail?", "answer": "Bail after arrest, Section 437."},
+    {"question": "Is privacy a fundamental right?", "answer": "Yes, under Article 21."},
+]
+
+
+def _texts(index, prefix, limit=8):
+    return [index.describe(slot)["text"] for slot, _ in index.suggest(prefix, limit)]
+
+
+def test_normalize_prefix_spells_out_references():
+    assert normalize_prefix("Sec. 438 ") == "section 438"
+    assert normalize_prefix("  What IS  Bail?") == "what is bail"
+
+
+def test_popular_questions_rank_first():
+    index = SuggestIndex(DATA)
+    assert _texts(index, "what is") == ["What is anticipatory bail?", "What is regular bail?"]
+    assert index.describe(index.suggest("what is a", 1)[0][0])["popularity"] == 2
+
+
+def test_questions_match_from_later_content_words():
+    assert _texts(SuggestIndex(DATA), "anticipatory b") == ["What is anticipatory bail?"]
+
+
+def test_citations_match_by_name_and_number():
+    index = SuggestIndex(DATA)
+    assert _texts(index, "section 43") == ["Section 438", "Section 437"]
+    assert _texts(index, "21") == ["Article 21"]
+
+
+def test_trailing_space_completes_the_word():
+    index = SuggestIndex(DATA)
+    assert _texts(index, "section 43 ") == []
+    assert _texts(index, "section 438 ") == ["Section 438"]
+    assert _texts(index, "article 21  ") == ["Article 21"]
+    assert _texts(index, "what is ") == ["What is anticipatory bail?", "What is regular bail?"]
+
+
+def test_recorded_searches_raise_popularity():
+    index = SuggestIndex(DATA)
+    # Entry 2 asks "What is regular bail?"
+    for _ in range(3):
+        index.record(2)
+    assert _texts(index, "what is") == ["What is regular bail?", "What is anticipatory bail?"]
+    assert index.describe(index.suggest("regular", 1)[0][0])["popularity"] == 4
+    # Short prefixes take the wide-range path and see the counts too
+    assert _texts(index, "w", 1) == ["What is regular bail?"]
+    index.record(99)
+
+    rebuilt = SuggestIndex(DATA[1:])
+    rebuilt.inherit(index)
+    assert _texts(rebuilt, "what is", 1) == ["What is regular bail?"]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    index = SuggestIndex(DATA)
+    index.save(tmp_path)
+    loaded = SuggestIndex.load(tmp_path)
+    for prefix in ("what", "anticipatory b", "section 43", "21"):
+        assert _texts(loaded, prefix) == _texts(index, prefix)
+    loaded.record(3)
+    assert _texts(loaded, "is privacy") == ["Is privacy a fundamental right?"]
+
+
+def test_no_match_and_empty_prefix():
+    index = SuggestIndex(DATA)
+    assert index.suggest("habeas", 8) == []
+    assert index.suggest("?!", 8) == []
+    assert SuggestIndex([]).suggest("what", 8) == []
+
+
+def _service(tmp_path):
+    service = SearchService()
+    service.embedding_cache = EmbeddingCache(tmp_path, "org/model")
+    return service
+
+
+def test_service_builds_suggestions_with_the_index(tmp_path, capsys):
+    service = _service(tmp_path)
+    embeddings = {"qa": np.eye(len(DATA), 4, dtype=np.float32)}
+    service._publish_partial({"qa": DATA}, embeddings)
+    built = service.index.suggest["qa"]
+
+    suggestions = service.suggest("anticipatory", "all", 5)
+    assert [s.text for s in suggestions] == ["What is anticipatory bail?"]
+    assert suggestions[0].dataset == "qa"
+
+    # A reload of unchanged entries reuses the built index
+    service._publish_partial({"qa": DATA, "other": DATA}, dict(embeddings, other=embeddings["qa"]))
+    assert service.index.suggest["qa"] is built
+
+    # A restart loads it from the cache directory
+    restarted = _service(tmp_path)
+    restarted._publish_partial({"qa": DATA}, embeddings)
+    assert "Loaded suggestions for qa" in capsys.readouterr().out
+    assert [s.text for s in restarted.suggest("anticipatory", "all", 5)] == ["What is anticipatory bail?"]
+
+
+def test_searches_and_selections_count_towards_popularity(tmp_path):
+    service = _service(tmp_path)
+    service._publish_partial({"qa": DATA}, {"qa": np.eye(len(DATA), 4, dtype=np.float32)})
+    regular = service.search("regular bail", mode="lexical", limit=1)[0]
+    service.search("regular bail", mode="lexical", limit=1)  # served from the result cache
+    service.search_similar("qa", regular.id, 1)
+    top = service.suggest("what is", "all", 1)[0]
+    assert (top.text, top.popularity) == ("What is regular bail?", 4)
@@ -0,0 +1,87 @@
+import os
+from app.services.template_cache import TemplateCache
+from app.services.template_catalog import TemplateCatalog, infer_category
+
+PAGE = """<html><body>
+<div id="app" v-init-json='{{"title": "{title} | LegalZoom"}}'></div>
+<div class="sample-form"><p>{body} <field-source fid="name" label="Name" type="text"></field-source></p></div>
+</body></html>"""
+
+
+def _write(directory, template_id, title, body="This agreement is made by"):
+    (directory / f"{template_id}.html").write_text(PAGE.format(title=title, body=body), encoding="utf-8")
+
+
+def _catalog(tmp_path):
+    templates = tmp_path / "t_forms"
+    templates.mkdir()
+    _write(templates, "rent-receipt", "Rent Receipt Template")
+    _write(templates, "general-affidavit", "General Affidavit")
+    _write(templates, "mutual-non-disclosure-agreement", "Legal Form")
+    return templates, TemplateCatalog(TemplateCache(templates, 1 << 20, None), check_interval=0)
+
+
+def test_infer_category_matches_whole_words():
+    assert infer_category("Artwork Release Form", "artwork-release-form") == "Releases & Waivers"
+    assert infer_category("Notice to Pay Rent or Quit", "ohio-notice-to-pay-rent-or-quit") == "Landlord & Tenant"
+    assert infer_category("Certificate", "certificate") == "General"
+
+
+def test_build_titles_categories_and_pages(tmp_path):
+    _, catalog = _catalog(tmp_path)
+    assert catalog.build() == 3
+
+    by_id = catalog.by_id
+    # " Template" is dropped unless the id says so; placeholder titles fall back to the id
+    assert by_id["rent-receipt"]["name"] == "Rent Receipt"
+    assert by_id["mutual-non-disclosure-agreement"]["name"] == "Mutual Non Disclosure Agreement"
+    assert by_id["general-affidavit"]["category"] == "Affidavits"
+    assert by_id["rent-receipt"]["field_count"] == 1
+
+    items, total = catalog.page(None, 1, 1)
+    assert total == 3 and [e["id"] for e in items] == ["mutual-non-disclosure-agreement"]
+    items, total = catalog.page("Non-Disclosure")
+    assert total == 1 and items[0]["id"] == "mutual-non-disclosure-agreement"
+    assert catalog.page("No Such Category") == ([], 0)
+
+
+def test_edit_in_place_is_noticed(tmp_path):
+    templates, catalog = _catalog(tmp_path)
+    catalog.build()
+    before = dict(catalog.by_id["general-affidavit"])
+    dir_mtime = os.stat(templates).st_mtime_ns
+    assert not catalog.is_stale()
+
+    _write(templates, "general-affidavit", "Affidavit of Residence", body="I, the undersigned, residing at")
+    # Rewriting an existing file leaves the directory mtime alone
+    os.utime(templates, ns=(dir_mtime, dir_mtime))
+    assert not catalog.is_stale()
+
+    catalog.check_in_background().join()
+    after = catalog.by_id["general-affidavit"]
+    assert after["name"] == "Affidavit of Residence"
+    assert after["content_hash"] != before["content_hash"]
+    assert catalog.search_index.search("residing", 1)[0]["id"] == "general-affidavit"
+    assert not catalog.is_stale()
+
+
+def test_background_checks_are_rate_limited(tmp_path):
+    templates, catalog = _catalog(tmp_path)
+    catalog.check_interval = 60
+    catalog.build()
+    # A build counts as a check
+    assert catalog.check_in_background() is None
+    catalog._checked_at -= 60
+    thread = catalog.check_in_background()
+    assert thread is not None and catalog.check_in_background() is None
+    thread.join()
+
+
+def test_added_and_removed_files_are_noticed(tmp_path):
+    templates, catalog = _catalog(tmp_path)
+    catalog.build()
+    _write(templates, "vehicle-bill-of-sale", "Vehicle Bill of Sale")
+    os.remove(templates / "rent-receipt.html")
+    assert catalog.is_stale()
+    catalog.build()
+    assert sorted(catalog.by_id) == ["general-affidavit", "mutual-non-disclosure-agreement", "vehicle-bill-of-sale"]
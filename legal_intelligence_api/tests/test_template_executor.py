@@ -0,0 +1,60 @@
+import asyncio
+import os
+import time
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from app.services.template_executor import TemplateExecutor, TemplatesOverloaded
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _die(_):
+    os._exit(1)
+
+
+def _square(x):
+    return x * x
+
+
+@pytest.fixture
+def executor():
+    executor = TemplateExecutor(max_workers=1, max_pending=2, timeout=0.2)
+    yield executor
+    executor.shutdown()
+
+
+def test_timed_out_jobs_keep_their_slot(executor):
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(_sleep, 1.5)
+        # The worker is still busy with the timed-out job
+        assert executor.pending == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(_sleep, 0.0)
+        with pytest.raises(TemplatesOverloaded):
+            await executor.run(_sleep, 0.0)
+        while executor.pending:
+            await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+
+def test_map_recovers_from_a_broken_pool(executor):
+    executor.start()
+    with pytest.raises(BrokenProcessPool):
+        executor.map(_die, [0])
+    assert executor.map(_square, [1, 2, 3]) == [1, 4, 9]
+
+
+def test_run_recovers_after_a_worker_dies(executor):
+    executor.timeout = 30
+
+    async def scenario():
+        with pytest.raises(BrokenProcessPool):
+            await executor.run(_die, 0)
+        assert await executor.run(_square, 4) == 16
+
+    asyncio.run(scenario())
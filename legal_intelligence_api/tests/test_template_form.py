@@ -0,0 +1,79 @@
+import json
+from bs4 import BeautifulSoup
+from app.services.template_form import compile_form, parse_field_dep, parse_section_condition, render_form
+
+HTML = """
+<div class="sample-form">
+  <p>Dear <field-source fid="name" label="Recipient Name"></field-source>,</p>
+  <field-source fid="kind" type="radio" options="refund,replacement" title="What do you want?"></field-source>
+  <section-dep secid="kind" secval="refund">
+    <p>Please refund <field-source fid="amount" label="Amount"></field-source>.</p>
+  </section-dep>
+  <section-dep secid="kind" secval="replacement"><p>Please replace the item.</p></section-dep>
+  <section-dep secid="kind+urgent" secval="refund+yes">I need it within a week.</section-dep> Thank you.
+  <script>ignored()</script>
+  <p>Regards, <field-source fid="name" type="prefill"></field-source></p>
+</div>
+"""
+
+
+def _form():
+    return compile_form(BeautifulSoup(HTML, "html.parser").find("div"))
+
+
+def test_parse_section_condition():
+    assert parse_section_condition("a", "Yes") == [[["a", "yes"]]]
+    # "," separates alternatives, "+" joins conditions
+    assert parse_section_condition("a,b", "yes,no") == [[["a", "yes"]], [["b", "no"]]]
+    assert parse_section_condition("a+b", "yes+no") == [[["a", "yes"], ["b", "no"]]]
+    assert parse_section_condition("a,b", "no+yes") == [[["a", "no"], ["b", "yes"]]]
+    # One id listed for several values
+    assert parse_section_condition("n", "2,3,3") == [[["n", "2"]], [["n", "3"]]]
+    assert parse_section_condition("", "") == []
+
+
+def test_parse_field_dep():
+    assert parse_field_dep(None) == []
+    assert parse_field_dep("kind=Refund; urgent = yes") == [["kind", "refund"], ["urgent", "yes"]]
+
+
+def test_field_schema():
+    fields = {field["fid"]: field for field in _form()["fields"]}
+    assert list(fields) == ["name", "kind", "amount"]
+    assert fields["name"]["label"] == "Recipient Name"
+    assert fields["name"]["type"] == "text"
+    assert fields["kind"]["options"] == ["refund", "replacement"]
+    assert fields["amount"]["depends_on"] == [[["kind", "refund"]]]
+    # Shown outside any section too, so always asked
+    assert fields["name"]["depends_on"] == []
+
+
+def test_render_fills_fields_and_drops_failed_sections():
+    program = _form()["program"]
+    assert render_form(program, {"name": "Asha", "kind": "Refund", "amount": 100}) == (
+        "Dear Asha,\nPlease refund 100.\nThank you.\nRegards, Asha"
+    )
+    assert render_form(program, {"name": "Asha", "kind": "replacement"}) == (
+        "Dear Asha,\nPlease replace the item.\nThank you.\nRegards, Asha"
+    )
+
+
+def test_render_keeps_placeholders_and_all_conditions_must_hold():
+    # Each occurrence keeps its own placeholder, as in the cleaned text
+    program = _form()["program"]
+    text = render_form(program, {"kind": ["refund"], "urgent": True})
+    assert text == (
+        "Dear **[Recipient Name]**,\nPlease refund **[Amount]**.\n"
+        "I need it within a week. Thank you.\nRegards, **[name]**"
+    )
+
+
+def test_section_text_does_not_leak_into_the_following_text():
+    # "Thank you." follows a skipped section; it must still be rendered
+    assert "Thank you." in render_form(_form()["program"], {})
+
+
+def test_compiled_form_survives_json():
+    form = _form()
+    values = {"name": "Asha", "kind": "refund", "amount": "50", "urgent": "yes"}
+    assert render_form(json.loads(json.dumps(form))["program"], values) == render_form(form["program"], values)
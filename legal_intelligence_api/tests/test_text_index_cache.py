@@ -0,0 +1,59 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache
+from app.services.lexical_index import LexicalIndex
+from app.services.search_service import SearchService
+from app.services.text_index_cache import load_groups, load_or_build_text_index, save_groups, text_index_key
+
+DATASETS = {
+    "qa": [
+        {"question": "What is bail?", "answer": "Release pending trial."},
+        {"question": "Define bail", "answer": "Release pending trial."},
+        {"question": "What is parole?", "answer": "Early release."},
+    ],
+    "empty": [],
+}
+VECTORS = {"qa": np.array([[1, 0.1], [1, 0.2], [0, 1]], dtype=np.float32), "empty": np.empty((0, 2), np.float32)}
+
+
+def test_groups_roundtrip(tmp_path):
+    groups = {"qa": [np.array([0, 1]), np.array([2])], "empty": []}
+    save_groups(tmp_path, groups)
+    loaded = load_groups(tmp_path)
+    assert {name: [m.tolist() for m in g] for name, g in loaded.items()} == {"qa": [[0, 1], [2]], "empty": []}
+    save_groups(tmp_path, None)
+    assert load_groups(tmp_path) is None
+
+
+def test_key_depends_on_entries_and_dedup():
+    assert text_index_key({"qa": "a"}, 0.85) == text_index_key({"qa": "a"}, 0.85)
+    assert text_index_key({"qa": "a"}, 0.85) != text_index_key({"qa": "b"}, 0.85)
+    assert text_index_key({"qa": "a"}, 0.85) != text_index_key({"qa": "a"}, None)
+
+
+def test_built_once_then_loaded(tmp_path):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return None, LexicalIndex(DATASETS)
+
+    _, first, built = load_or_build_text_index(tmp_path, "k", build)
+    _, second, reused = load_or_build_text_index(tmp_path, "k", build)
+    assert (built, reused, len(calls)) == (True, False, 1)
+    np.testing.assert_array_equal(first.search("parole")[0], second.search("parole")[0])
+    # Without a cache directory nothing is persisted
+    assert load_or_build_text_index(None, "k", build)[2] is True
+
+
+def test_warm_start_loads_groups_and_postings(tmp_path, monkeypatch):
+    def service():
+        s = SearchService()
+        s.embedding_cache = EmbeddingCache(tmp_path, "org/model")
+        return s
+
+    cold = service()._build_index(DATASETS, VECTORS)
+    monkeypatch.setattr(SearchService, "_build_text_index", lambda *args: (_ for _ in ()).throw(AssertionError))
+    warm = service()._build_index(DATASETS, VECTORS)
+    assert len(warm) == len(cold) == 2
+    assert warm.members(0).tolist() == [0, 1]
+    np.testing.assert_array_equal(warm.lexical.search("pending")[0], cold.lexical.search("pending")[0])